@@ -1,42 +1,114 @@
 #!/usr/bin/env python3
 """
-CPU-only ResNet50 benchmark using OpenCV DNN
+CPU-only ResNet50 benchmark using OpenCV DNN or ONNX Runtime
 Minimal, lightweight CPU baseline for comparison with Hailo
 """
 
-import cv2
+import argparse
+import multiprocessing as mp
 import numpy as np
+import os
+from pathlib import Path
+import queue
 import time
 
-def benchmark_resnet50_cpu(num_frames=100):
-    """Run ResNet50 inference on CPU using OpenCV DNN"""
+from src.benchmarking.latency import LatencyHistogram
+from src.benchmarking.results_store import DEFAULT_RESULTS, ResultStore, hailo_baseline
+from src.benchmarking.soak import SoakMonitor
+from src.inference.backends import BACKENDS, load_backend
+from src.inference.model_store import DEFAULT_STORE, ModelRegistry, ModelStore
+
+MODEL_URL = "https://github.com/onnx/models/raw/main/validated/vision/classification/resnet/model/resnet50-v1-7.onnx"
+MODEL_NAME = "resnet50"
+MODEL_VERSION = "v1-7"
+LEGACY_MODEL_PATH = "/tmp/resnet50_cpu.onnx"
+# Next to the local (gitignored) result store, not in the working directory
+DEFAULT_TRACE = DEFAULT_RESULTS.parent / 'resnet50_cpu_trace.json'
+# SHA-256 of resnet50-v1-7.onnx as published by the ONNX model zoo. Unset until it is copied from a
+# trusted download: the store then trusts the first file it sees (with a warning) and verifies
+# every later run against that digest, or against --model-sha256 when given.
+MODEL_SHA256 = None
+
+
+def record_result(store, engine, mode, fps, latency_ms, **metrics):
+    """Append one CPU ResNet50 run to the result store (no-op when store is None)"""
+    if store is None:
+        return None
+    return store.record(MODEL_NAME, engine.name, 'cpu', fps, latency_ms=latency_ms,
+                        task='classification', mode=mode, source='benchmark_cpu_resnet50.py',
+                        backend_options=engine.options, **metrics)
+
+
+def resolve_resnet50(model_path=None, offline=False, store_root=None, expected_sha256=None):
+    """Path to a verified ResNet50 ONNX model from the content-addressed store
+
+    An explicit model_path is used as-is. Otherwise the model comes from the
+    store, importing the legacy /tmp download or fetching it once if needed.
+    Imports, downloads and existing store entries must match the
+    resnet50-v1-7 digest (expected_sha256, else MODEL_SHA256). With no
+    digest known, the first file stored is trusted and its digest pinned
+    (trust on first use); a warning says so. Raises ValueError on a
+    mismatch.
+    """
+    if model_path:
+        print(f"   ✅ Using model file: {model_path}")
+        return str(model_path)
+
+    expected_sha256 = expected_sha256 or MODEL_SHA256
+    store = ModelStore(store_root or DEFAULT_STORE, offline=offline)
+    start = time.perf_counter()
+    try:
+        path = store.resolve(MODEL_NAME, MODEL_VERSION)
+        stored = store.entry(MODEL_NAME, MODEL_VERSION)[1]['sha256']
+        if expected_sha256 and stored != expected_sha256:
+            raise ValueError(f"Stored {MODEL_NAME}:{MODEL_VERSION} is not resnet50-v1-7.onnx "
+                             f"(expected {expected_sha256}, got {stored})")
+        print(f"   ✅ Using stored model: {MODEL_NAME}:{MODEL_VERSION} "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms to resolve/verify)")
+        if not expected_sha256:
+            print(f"   ⚠️  Verified against the digest pinned on first use ({stored[:12]}…), not a "
+                  f"published one; pass --model-sha256 to check it")
+    except FileNotFoundError:
+        if os.path.exists(LEGACY_MODEL_PATH):
+            print(f"   Importing cached model {LEGACY_MODEL_PATH} into {store.root}")
+            path = store.add(LEGACY_MODEL_PATH, MODEL_NAME, MODEL_VERSION, source=MODEL_URL,
+                             expected_sha256=expected_sha256)
+        else:
+            print(f"   Downloading model from {MODEL_URL}")
+            print("   (This is a one-time download, ~100MB)")
+            path = store.fetch(MODEL_URL, MODEL_NAME, MODEL_VERSION, expected_sha256=expected_sha256)
+            print("   ✅ Download complete")
+        if not expected_sha256:
+            stored = store.entry(MODEL_NAME, MODEL_VERSION)[1]['sha256']
+            print(f"   ⚠️  No published digest to check against: pinned {stored} on first use. "
+                  f"Later runs must match it; pass --model-sha256 to verify against a known digest")
+    return str(path)
+
+
+def load_resnet50_cpu(model_path=None, backend='opencv', **backend_options):
+    """Resolve and load ResNet50 into a CPU inference backend"""
+    
+    # Load ResNet50 from the ONNX model zoo
+    print("📥 Loading ResNet50 model...")
+    model_path = resolve_resnet50(model_path)
+    
+    start = time.perf_counter()
+    engine = load_backend(backend, model_path, **backend_options)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"✅ Model loaded ({engine.describe()}) in {load_ms:.1f} ms\n")
+    return engine
+
+
+def benchmark_resnet50_cpu(num_frames=100, backend='opencv', show_histogram=False,
+                           model_path=None, store=None, **backend_options):
+    """Run ResNet50 inference on CPU using the selected backend"""
     
     print("=" * 70)
     print("CPU Baseline Benchmark: ResNet50 Image Classification")
     print("=" * 70)
     print()
     
-    # Load ResNet50 from OpenCV's model zoo
-    print("📥 Loading ResNet50 model...")
-    model_url = "https://github.com/onnx/models/raw/main/validated/vision/classification/resnet/model/resnet50-v1-7.onnx"
-    model_path = "/tmp/resnet50_cpu.onnx"
-    
-    # Download if needed
-    import urllib.request
-    import os
-    if not os.path.exists(model_path):
-        print(f"   Downloading model from {model_url}")
-        print("   (This is a one-time download, ~100MB)")
-        urllib.request.urlretrieve(model_url, model_path)
-        print("   ✅ Download complete")
-    else:
-        print(f"   ✅ Using cached model: {model_path}")
-    
-    # Load with OpenCV DNN
-    net = cv2.dnn.readNetFromONNX(model_path)
-    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-    print("✅ Model loaded\n")
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
     
     # Prepare synthetic input (224x224x3, standard ImageNet size)
     print(f"🎯 Running {num_frames} inference iterations...")
@@ -47,21 +119,19 @@ def benchmark_resnet50_cpu(num_frames=100):
     
     # Warmup (first run is always slower)
     for _ in range(3):
-        net.setInput(input_blob)
-        _ = net.forward()
+        _ = engine.infer(input_blob)
     
-    # Benchmark
-    latencies = []
+    # Benchmark (fixed-memory histogram, no per-frame list)
+    latencies = LatencyHistogram()
     start_total = time.perf_counter()
     
     for i in range(num_frames):
         start = time.perf_counter()
-        net.setInput(input_blob)
-        _ = net.forward()
+        _ = engine.infer(input_blob)
         end = time.perf_counter()
         
         latency_ms = (end - start) * 1000
-        latencies.append(latency_ms)
+        latencies.record(latency_ms)
         
         if (i + 1) % 10 == 0:
             print(f"   Progress: {i+1}/{num_frames} frames...")
@@ -71,9 +141,9 @@ def benchmark_resnet50_cpu(num_frames=100):
     
     # Results
     fps = num_frames / total_time
-    avg_latency = np.mean(latencies)
-    min_latency = np.min(latencies)
-    max_latency = np.max(latencies)
+    avg_latency = latencies.mean
+    min_latency = latencies.min
+    max_latency = latencies.max
     
     print()
     print("=" * 70)
@@ -81,24 +151,1227 @@ def benchmark_resnet50_cpu(num_frames=100):
     print("=" * 70)
     print(f"Total frames:        {num_frames}")
     print(f"Total time:          {total_time:.2f} seconds")
+    print(f"Backend:             {engine.describe()}")
     print(f"FPS (CPU-only):      {fps:.2f} frames/second")
     print(f"Avg Latency:         {avg_latency:.2f} ms")
     print(f"Min Latency:         {min_latency:.2f} ms")
     print(f"Max Latency:         {max_latency:.2f} ms")
+    latencies.print_report()
     print()
     
+    if show_histogram:
+        print("Latency histogram:")
+        latencies.print_histogram()
+        print()
+    
+    record_result(store, engine, 'single', fps, avg_latency, frames=num_frames,
+                  **{k: v for k, v in latencies.summary().items() if k not in ('count', 'mean_ms')})
+    
     print("=" * 70)
     print("COMPARISON WITH HAILO")
     print("=" * 70)
-    hailo_fps = 47.33  # From previous benchmark
-    speedup = hailo_fps / fps
-    print(f"Hailo-8L FPS:        {hailo_fps:.2f}")
-    print(f"CPU FPS:             {fps:.2f}")
-    print(f"Speedup:             {speedup:.1f}×")
+    hailo = hailo_baseline(MODEL_NAME)
+    if hailo:
+        hailo_fps = hailo['fps']
+        speedup = hailo_fps / fps
+        print(f"Hailo-8L FPS:        {hailo_fps:.2f}  (recorded {hailo['timestamp']})")
+        print(f"CPU FPS:             {fps:.2f}")
+        print(f"Speedup:             {speedup:.1f}×")
+    else:
+        print("Hailo-8L FPS:        no published hailo8l result for resnet50")
     print("=" * 70)
     
     return fps, avg_latency
 
+
+def benchmark_resnet50_cpu_soak(duration_s=600, window_s=10.0, backend='opencv', model_path=None,
+                                store=None, log_path=None, temp_limit_c=80.0, **backend_options):
+    """Run ResNet50 continuously, reporting FPS, latency and throttling per time window"""
+
+    print("=" * 70)
+    print("CPU Soak Benchmark: ResNet50 Image Classification")
+    print("=" * 70)
+    print()
+
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
+    monitor = SoakMonitor(window_s=window_s, temp_limit_c=temp_limit_c, log_path=log_path)
+    available = monitor.sensors.available()
+
+    print(f"🎯 Running for {duration_s / 60:.1f} min in {window_s:.0f} s windows")
+    print(f"   Sensors: " + ', '.join(f"{name} {'✓' if ok else 'unavailable'}"
+                                      for name, ok in available.items()))
+    if log_path:
+        print(f"   Window log: {log_path}")
+    print()
+
+    input_blob = np.random.randint(0, 255, (1, 3, 224, 224)).astype(np.float32)
+    for _ in range(3):
+        engine.infer(input_blob)
+
+    monitor.start()
+    deadline = time.perf_counter() + duration_s
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            engine.infer(input_blob)
+            window = monitor.record((time.perf_counter() - start) * 1000)
+            if window:
+                temp = f"{window['temp_c']:.1f} °C" if window['temp_c'] is not None else 'n/a'
+                flags = f"  ⚠️  {' '.join(window['flags'])}" if window['flags'] else ''
+                print(f"   {window['t_s']:7.0f}s  {window['fps']:7.2f} FPS  "
+                      f"p99 {window['p99_ms']:7.2f} ms  {temp}{flags}")
+    except KeyboardInterrupt:
+        print("\n   Interrupted - reporting the windows completed so far")
+    summary = monitor.finish()
+
+    print()
+    print("=" * 70)
+    print("SOAK RESULTS")
+    print("=" * 70)
+    print(f"Backend:             {engine.describe()}")
+    monitor.print_report()
+    print("=" * 70)
+
+    overall_fps = summary['frames'] / summary['duration_s'] if summary['duration_s'] else 0.0
+    record_result(store, engine, 'soak', overall_fps, monitor.total.mean,
+                  **{k: v for k, v in summary.items() if k != 'frames'}, frames=summary['frames'],
+                  window_s=window_s)
+    return summary
+
+
+def benchmark_resnet50_cpu_batched(batch_sizes=(1, 2, 4, 8), num_images=64, warmup=2,
+                                   backend='opencv', model_path=None, store=None,
+                                   **backend_options):
+    """Sweep batch sizes, running N images per forward() call
+
+    Every batch size processes the same number of images (rounded up to a
+    whole number of batches) so the images/sec figures are comparable.
+    Returns a list of dicts, one per batch size.
+    """
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 Batch-Size Sweep")
+    print("=" * 70)
+    print()
+
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
+
+    print(f"🎯 Sweeping batch sizes {list(batch_sizes)} over ~{num_images} images each...")
+    print(f"   Input size: Nx224x224x3 (RGB)")
+    print()
+
+    results = []
+    for batch_size in batch_sizes:
+        num_batches = max(1, -(-num_images // batch_size))
+        input_blob = np.random.randint(0, 255, (batch_size, 3, 224, 224)).astype(np.float32)
+
+        # Warmup (each new input shape re-allocates layer buffers)
+        for _ in range(warmup):
+            _ = engine.infer(input_blob)
+
+        batch_latencies = LatencyHistogram()
+        start_total = time.perf_counter()
+
+        for i in range(num_batches):
+            start = time.perf_counter()
+            _ = engine.infer(input_blob)
+            batch_latencies.record((time.perf_counter() - start) * 1000)
+
+        total_time = time.perf_counter() - start_total
+        images = num_batches * batch_size
+
+        result = {
+            'batch_size': batch_size,
+            'images': images,
+            'total_time': total_time,
+            'images_per_sec': images / total_time,
+            'batch_latency_ms': batch_latencies.mean,
+            'batch_p99_ms': batch_latencies.percentile(99),
+            'per_image_latency_ms': batch_latencies.mean / batch_size,
+        }
+        results.append(result)
+        record_result(store, engine, 'batch', result['images_per_sec'],
+                      result['per_image_latency_ms'], batch_size=batch_size, images=images,
+                      batch_latency_ms=result['batch_latency_ms'],
+                      batch_p99_ms=result['batch_p99_ms'])
+        print(f"   Batch {batch_size:>3}: {result['images_per_sec']:6.2f} img/s, "
+              f"{result['per_image_latency_ms']:7.2f} ms/image")
+
+    baseline = results[0]['images_per_sec']
+
+    print()
+    print("=" * 70)
+    print("BATCH SWEEP RESULTS")
+    print("=" * 70)
+    print(f"{'Batch':>6} {'Images':>7} {'Batch ms':>10} {'p99 ms':>9} {'ms/image':>10} "
+          f"{'img/s':>8} {'vs first':>9}")
+    for r in results:
+        print(f"{r['batch_size']:>6} {r['images']:>7} {r['batch_latency_ms']:>10.2f} "
+              f"{r['batch_p99_ms']:>9.2f} {r['per_image_latency_ms']:>10.2f} {r['images_per_sec']:>8.2f} "
+              f"{r['images_per_sec'] / baseline:>8.2f}×")
+    best = max(results, key=lambda r: r['images_per_sec'])
+    print()
+    print(f"Best throughput:     batch {best['batch_size']} at {best['images_per_sec']:.2f} img/s")
+    print("=" * 70)
+
+    return results
+
+
+def benchmark_resnet50_cpu_end_to_end(image_dir, batch_size=1, num_images=None, decode_workers=2,
+                                      method='numpy', backend='opencv', model_path=None,
+                                      store=None, **backend_options):
+    """Decode -> preprocess -> infer on a local directory of real images
+
+    Images are decoded on a background thread pool while the main thread
+    builds normalized NCHW batches into a preallocated buffer and runs
+    inference. Decode, preprocess and inference time are reported
+    separately. num_images cycles the directory if larger than it.
+    """
+    from itertools import cycle, islice
+    from src.preprocessing.images import BackgroundDecoder, BatchBlobBuilder, list_images
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 End-to-End (real images)")
+    print("=" * 70)
+    print()
+
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
+
+    paths = list_images(image_dir)
+    num_images = num_images or len(paths)
+    paths = list(islice(cycle(paths), num_images))
+    builder = BatchBlobBuilder(max_batch=batch_size, method=method)
+
+    print(f"🎯 Processing {num_images} images from {image_dir}")
+    print(f"   Batch size: {batch_size}, decode workers: {decode_workers}, preprocess: {method}")
+    print()
+
+    # Warmup on the first batch so lazy allocations stay out of the timings
+    warm_images, _ = next(iter(BackgroundDecoder(paths[:batch_size], batch_size, workers=1)))
+    _ = engine.infer(builder.build(warm_images))
+
+    decode_hist = LatencyHistogram()     # worker time per image
+    wait_hist = LatencyHistogram()       # main thread blocked on decode, per batch
+    preprocess_hist = LatencyHistogram()  # per batch
+    infer_hist = LatencyHistogram()       # per batch
+
+    processed = 0
+    start_total = time.perf_counter()
+    wait_start = start_total
+
+    for images, decode_ms in BackgroundDecoder(paths, batch_size, workers=decode_workers):
+        t0 = time.perf_counter()
+        wait_hist.record((t0 - wait_start) * 1000)
+        for ms in decode_ms:
+            decode_hist.record(ms)
+
+        blob = builder.build(images)
+        t1 = time.perf_counter()
+        _ = engine.infer(blob)
+        t2 = time.perf_counter()
+
+        preprocess_hist.record((t1 - t0) * 1000)
+        infer_hist.record((t2 - t1) * 1000)
+        processed += len(images)
+        if infer_hist.count % 10 == 0:
+            print(f"   Progress: {processed}/{num_images} images...")
+        wait_start = time.perf_counter()
+
+    total_time = time.perf_counter() - start_total
+    fps = processed / total_time
+    batches = infer_hist.count
+
+    print()
+    print("=" * 70)
+    print("END-TO-END RESULTS")
+    print("=" * 70)
+    print(f"Total images:        {processed} ({batches} batches of up to {batch_size})")
+    print(f"Total time:          {total_time:.2f} seconds")
+    print(f"Backend:             {engine.describe()}")
+    print(f"End-to-end FPS:      {fps:.2f} images/second")
+    print()
+    print(f"{'Stage':<22} {'ms/batch':>10} {'ms/image':>10} {'p99 ms':>9} {'share':>7}")
+    stage_total = (wait_hist.mean + preprocess_hist.mean + infer_hist.mean) * batches
+    for label, hist in (('Decode wait (main)', wait_hist),
+                        ('Preprocess', preprocess_hist),
+                        ('Inference', infer_hist)):
+        per_batch = hist.mean
+        print(f"{label:<22} {per_batch:>10.2f} {per_batch * batches / processed:>10.2f} "
+              f"{hist.percentile(99):>9.2f} {per_batch * batches / stage_total * 100:>6.1f}%")
+    print(f"{'Decode (worker)':<22} {'':>10} {decode_hist.mean:>10.2f} "
+          f"{decode_hist.percentile(99):>9.2f} {'(bg)':>7}")
+    print("=" * 70)
+
+    result = {
+        'fps': fps,
+        'decode_ms_per_image': decode_hist.mean,
+        'decode_wait_ms_per_batch': wait_hist.mean,
+        'preprocess_ms_per_batch': preprocess_hist.mean,
+        'inference_ms_per_batch': infer_hist.mean,
+    }
+    record_result(store, engine, 'e2e', fps, 1000.0 / fps, batch_size=batch_size, images=processed,
+                  decode_workers=decode_workers, preprocess=method,
+                  **{k: v for k, v in result.items() if k != 'fps'})
+    return result
+
+
+def _top5(scores):
+    """Softmax + top-5 classes for a (1, 1000) score row"""
+    row = scores.reshape(-1)
+    exp = np.exp(row - row.max())
+    probs = exp / exp.sum()
+    top = np.argpartition(probs, -5)[-5:]
+    top = top[np.argsort(probs[top])[::-1]]
+    return list(zip(top.tolist(), probs[top].tolist()))
+
+
+def benchmark_resnet50_cpu_pipeline(num_frames=100, image_dir=None, queue_size=4,
+                                    policy='block', infer_workers=1, source_fps=None,
+                                    backend='opencv', model_path=None, store=None,
+                                    metrics_port=None, **backend_options):
+    """Run capture -> preprocess -> infer -> postprocess as a threaded pipeline
+
+    Frames come from image_dir (decoded, cycled) or are synthetic 640x480
+    camera-sized frames. The same stages are first run sequentially so the
+    report shows what overlapping the stages buys. Set source_fps to pace
+    capture like a camera, typically with policy='drop_oldest'. With
+    metrics_port the pipelined run is served as Prometheus metrics.
+    """
+    from itertools import cycle, islice
+    import cv2
+    from src.pipeline.runner import PipelineRunner, Stage
+    from src.preprocessing.images import BatchBlobBuilder, list_images
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 Pipelined Runner")
+    print("=" * 70)
+    print()
+
+    model_path = resolve_resnet50(model_path)
+    engines = [load_resnet50_cpu(model_path, backend=backend, **backend_options)
+               for _ in range(infer_workers)]
+
+    if image_dir:
+        frames = [cv2.imread(str(p)) for p in list_images(image_dir)]
+    else:
+        frames = [np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(4)]
+
+    # One blob buffer per frame that can be in flight between preprocess and infer
+    builders = [BatchBlobBuilder(max_batch=1) for _ in range(queue_size + infer_workers + 2)]
+    builder_index = [0]
+
+    def preprocess(frame):
+        builder = builders[builder_index[0] % len(builders)]
+        builder_index[0] += 1
+        return builder.build([frame])
+
+    # Each inference worker borrows an engine of its own
+    engine_pool = queue.Queue()
+    for engine in engines:
+        engine_pool.put(engine)
+
+    def infer(blob):
+        engine = engine_pool.get()
+        try:
+            return engine.infer(blob)
+        finally:
+            engine_pool.put(engine)
+
+    stages = [Stage('preprocess', preprocess), Stage('infer', infer, workers=infer_workers),
+              Stage('postprocess', _top5)]
+
+    # Warmup
+    for _ in range(3):
+        _top5(infer(preprocess(frames[0])))
+
+    print(f"🎯 Sequential reference: {num_frames} frames...")
+    start = time.perf_counter()
+    for frame in islice(cycle(frames), num_frames):
+        _top5(infer(preprocess(frame)))
+    sequential_fps = num_frames / (time.perf_counter() - start)
+
+    pacing = f"{source_fps} FPS source" if source_fps else "unpaced source"
+    print(f"🎯 Pipelined: {num_frames} frames, queue size {queue_size}, policy {policy}, "
+          f"{infer_workers} inference worker(s), {pacing}...")
+    print()
+    registry = server = None
+    if metrics_port is not None:
+        from src.pipeline.metrics import MetricsRegistry, MetricsServer
+        registry = MetricsRegistry(prefix='resnet50_')
+        server = MetricsServer(registry, port=metrics_port).start()
+        print(f"📈 Metrics at {server.url}")
+        print()
+    runner = PipelineRunner(islice(cycle(frames), num_frames), stages,
+                            queue_size=queue_size, policy=policy, source_fps=source_fps,
+                            metrics=registry, name='cpu')
+    stats = runner.run()
+    if server is not None:
+        server.stop()
+
+    print("=" * 70)
+    print("PIPELINE RESULTS")
+    print("=" * 70)
+    runner.print_report()
+    print(f"Measured sequential: {sequential_fps:.2f} FPS")
+    print(f"Pipeline speedup:    {stats['fps'] / sequential_fps:.2f}×")
+    print("=" * 70)
+
+    stats['measured_sequential_fps'] = sequential_fps
+    record_result(store, engines[0], 'pipeline', stats['fps'], stats['latency']['mean_ms'],
+                  frames=num_frames, queue_size=queue_size, policy=policy,
+                  infer_workers=infer_workers, source_fps=source_fps, dropped=stats['dropped'],
+                  sequential_fps=sequential_fps, e2e_p99_ms=stats['latency']['p99_ms'],
+                  stages={st['name']: st['service_ms'] for st in stats['stages']})
+    return stats
+
+
+def benchmark_resnet50_cpu_multistream(stream_counts=(4,), sources=None, policy='round_robin',
+                                       weights=None, max_batch=4, batch_window_ms=0.0,
+                                       stream_fps=None, duration_s=20.0, queue_size=2,
+                                       serve_threshold=0.95, backend='opencv', model_path=None,
+                                       store=None, **backend_options):
+    """Serve N camera streams from one shared ResNet50 engine
+
+    sources are video files, image directories or 'synthetic', assigned to
+    streams in turn (video files stand in for cameras and loop). Captures
+    are staggered across one frame interval like unsynchronised cameras.
+    Each entry of stream_counts is run for duration_s; the largest count
+    whose worst stream still gets serve_threshold of its target FPS is
+    reported as the per-node camera capacity.
+    """
+    from itertools import cycle, islice
+    from src.pipeline.multistream import MultiStreamScheduler, Stream, open_source
+    from src.preprocessing.images import BatchBlobBuilder
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 Multi-Stream Scheduler")
+    print("=" * 70)
+    print()
+
+    model_path = resolve_resnet50(model_path)
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
+    builder = BatchBlobBuilder(max_batch=max_batch)
+
+    def infer_batch(frames):
+        scores = engine.infer(builder.build(frames))
+        return [_top5(row) for row in scores.reshape(len(frames), -1)]
+
+    # Warm every batch size the scheduler can produce
+    warm = [np.zeros((480, 640, 3), dtype=np.uint8)] * max_batch
+    for n in range(1, max_batch + 1):
+        infer_batch(warm[:n])
+
+    sources = sources or ['synthetic']
+    weights = weights or [1.0]
+    results = []
+    for count in stream_counts:
+        streams = []
+        for i, spec in enumerate(islice(cycle(sources), count)):
+            frames, native_fps = open_source(spec, seed=i)
+            fps = stream_fps or native_fps or 30.0
+            streams.append(Stream(f"cam{i}", frames, fps=fps, weight=weights[i % len(weights)],
+                                  queue_size=queue_size, phase=i / count / fps))
+
+        print(f"🎯 {count} stream(s) at {streams[0].fps:g} FPS, policy {policy}, max batch {max_batch}, "
+              f"batch window {batch_window_ms:g} ms, {duration_s:g}s...")
+        print()
+        scheduler = MultiStreamScheduler(streams, infer_batch, policy=policy, max_batch=max_batch,
+                                         batch_window_ms=batch_window_ms)
+        stats = scheduler.run(duration_s)
+        scheduler.print_report()
+        print()
+        stats['streams_count'] = count
+        results.append(stats)
+
+        latency = stats['latency'] or {'mean_ms': 0.0, 'p99_ms': 0.0}
+        record_result(store, engine, 'multistream', stats['fps'], latency['mean_ms'],
+                      streams=count, policy=policy, max_batch=max_batch,
+                      batch_window_ms=batch_window_ms, stream_fps=streams[0].fps,
+                      mean_batch=stats['mean_batch'], fairness=stats['fairness'],
+                      min_served=stats['min_served'], late_pct=stats['late_pct'],
+                      capacity_fps=stats['capacity_fps'], e2e_p99_ms=latency['p99_ms'],
+                      per_stream_fps={s['name']: s['fps'] for s in stats['streams']})
+
+    print("=" * 70)
+    print("MULTI-STREAM SUMMARY")
+    print("=" * 70)
+    print(f"{'Streams':>7} {'Agg FPS':>8} {'Worst':>7} {'Fair':>6} {'Batch':>6} {'Util':>5} {'p99 ms':>8}")
+    for r in results:
+        p99 = r['latency']['p99_ms'] if r['latency'] else 0.0
+        print(f"{r['streams_count']:>7} {r['fps']:>8.2f} {r['min_served'] * 100:>6.1f}% "
+              f"{r['fairness']:>6.3f} {r['mean_batch']:>6.2f} {r['utilization'] * 100:>4.0f}% {p99:>8.2f}")
+    served = [r['streams_count'] for r in results if r['min_served'] >= serve_threshold]
+    print()
+    if served:
+        print(f"💡 One node serves {max(served)} stream(s) with every stream at "
+              f"≥{serve_threshold * 100:.0f}% of its target FPS")
+    else:
+        print(f"⚠️  No tested stream count kept every stream at ≥{serve_threshold * 100:.0f}% of its target FPS")
+    print("=" * 70)
+    return results
+
+
+def benchmark_resnet50_cpu_int8(num_frames=100, image_dir=None, calib_dir=None, calib_images=32,
+                                method='minmax', per_channel=True, model_path=None, store=None,
+                                store_root=None, offline=False, **backend_options):
+    """Compare FP32 and static INT8 ResNet50 on ONNX Runtime
+
+    The INT8 model is calibrated on calib_dir and cached in the model
+    store, so repeat and offline runs skip quantization. Without a separate
+    calib_dir, image_dir is split: the first calib_images images calibrate,
+    the rest evaluate, so agreement is never measured on calibration
+    images. Both models see the same preprocessed inputs; top-1 and top-5
+    agreement are measured against the FP32 predictions.
+    """
+    from src.inference.quantize import calibration_blobs, quantized_model
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 FP32 vs Static INT8")
+    print("=" * 70)
+    print()
+
+    model_path = resolve_resnet50(model_path, offline=offline, store_root=store_root)
+    shared = image_dir and (not calib_dir or os.path.realpath(calib_dir) == os.path.realpath(image_dir))
+    calib_dir = calib_dir or image_dir
+    eval_skip = 0
+    if shared:
+        # One directory: calibrate on its first images, evaluate on the remainder
+        from src.preprocessing.images import list_images
+        available = len(list_images(image_dir))
+        if available <= calib_images:
+            raise SystemExit(f"❌ {image_dir} has {available} images, all needed for calibration "
+                             f"(--calib-images {calib_images}); pass a separate --calib-dir or more "
+                             f"images so agreement is not measured on the calibration set")
+        eval_skip = calib_images
+        print(f"   Splitting {image_dir}: first {calib_images} images calibrate, "
+              f"{available - calib_images} evaluate")
+    if not calib_dir:
+        print("⚠️  No --calib-dir/--image-dir: calibrating on synthetic frames, "
+              "agreement figures will not reflect real images")
+    blobs = calibration_blobs(calib_dir, count=calib_images)
+    model_store = ModelStore(store_root or DEFAULT_STORE, offline=offline)
+    start = time.perf_counter()
+    int8_path, built = quantized_model(model_store, model_path, MODEL_NAME, MODEL_VERSION, blobs,
+                                       method=method, per_channel=per_channel)
+    action = "Quantized" if built else "Reused cached"
+    print(f"   {action} INT8 model ({len(blobs)} calibration images, {method}, "
+          f"{'per-channel' if per_channel else 'per-tensor'}) in {time.perf_counter() - start:.1f} s")
+    print()
+
+    # ONNX Runtime on both sides so the only difference is precision
+    engines = {'fp32': load_resnet50_cpu(model_path, backend='onnxruntime', **backend_options),
+               'int8': load_resnet50_cpu(str(int8_path), backend='onnxruntime', **backend_options)}
+
+    inputs = calibration_blobs(image_dir, count=num_frames, seed=1, skip=eval_skip)
+    print(f"🎯 {len(inputs)} {'images from ' + str(image_dir) if image_dir else 'synthetic frames'}, batch 1")
+    print()
+
+    results, predictions = {}, {}
+    for precision, engine in engines.items():
+        for blob in inputs[:3]:
+            engine.infer(blob)
+        latencies = LatencyHistogram()
+        top5 = []
+        start_total = time.perf_counter()
+        for blob in inputs:
+            start = time.perf_counter()
+            scores = engine.infer(blob)
+            latencies.record((time.perf_counter() - start) * 1000)
+            top5.append(np.argsort(scores.reshape(-1))[-5:][::-1])
+        total = time.perf_counter() - start_total
+        predictions[precision] = np.array(top5)
+        results[precision] = {'fps': len(inputs) / total, 'mean_ms': latencies.mean,
+                              'p99_ms': latencies.percentile(99)}
+
+    fp32, int8 = predictions['fp32'], predictions['int8']
+    top1 = float(np.mean(fp32[:, 0] == int8[:, 0]))
+    top5 = float(np.mean([a in b for a, b in zip(fp32[:, 0], int8)]))
+    overlap = float(np.mean([len(set(a) & set(b)) / 5 for a, b in zip(fp32, int8)]))
+    size_mb = {'fp32': os.path.getsize(model_path) / 1e6, 'int8': os.path.getsize(int8_path) / 1e6}
+
+    print("=" * 70)
+    print("RESULTS")
+    print("=" * 70)
+    print(f"{'Precision':<10} {'FPS':>8} {'Mean ms':>9} {'p99 ms':>8} {'Size MB':>8}")
+    for precision, r in results.items():
+        print(f"{precision:<10} {r['fps']:>8.2f} {r['mean_ms']:>9.2f} {r['p99_ms']:>8.2f} {size_mb[precision]:>8.1f}")
+    print()
+    print(f"INT8 speedup:        {results['int8']['fps'] / results['fp32']['fps']:.2f}×")
+    print(f"Top-1 agreement:     {top1 * 100:.1f}%  (INT8 top-1 == FP32 top-1)")
+    print(f"Top-5 agreement:     {top5 * 100:.1f}%  (FP32 top-1 within INT8 top-5)")
+    print(f"Top-5 overlap:       {overlap * 100:.1f}%")
+    hailo = hailo_baseline(MODEL_NAME)
+    if hailo:
+        print(f"Hailo-8L vs CPU:     {hailo['fps'] / results['fp32']['fps']:.1f}× over FP32, "
+              f"{hailo['fps'] / results['int8']['fps']:.1f}× over INT8 (both quantized)")
+    print("=" * 70)
+
+    for precision, r in results.items():
+        record_result(store, engines[precision], 'int8', r['fps'], r['mean_ms'], precision=precision,
+                      frames=len(inputs), p99_ms=r['p99_ms'], calibration=method,
+                      calibration_images=len(blobs), per_channel=per_channel,
+                      top1_agreement=top1, top5_agreement=top5)
+    results.update({'top1_agreement': top1, 'top5_agreement': top5, 'top5_overlap': overlap})
+    return results
+
+
+def benchmark_resnet50_cpu_profile(num_frames=20, image_dir=None, trace_path=DEFAULT_TRACE,
+                                   top=15, method='numpy', backend='opencv', model_path=None, store=None,
+                                   **backend_options):
+    """Per-layer profile of preprocess -> infer -> postprocess, exported as a Chrome trace
+
+    Layer timings come from the backend itself (OpenCV getPerfProfile or
+    the ONNX Runtime profiler) and are nested inside our own 'infer' spans,
+    so the trace shows stage and layer cost on one timeline. Open the file
+    in chrome://tracing or https://ui.perfetto.dev.
+    """
+    import cv2
+    from src.benchmarking.trace import ChromeTrace
+    from src.inference.profiling import LayerProfiler
+    from src.preprocessing.images import BatchBlobBuilder, list_images
+
+    print("=" * 70)
+    print("CPU Baseline Profile: ResNet50 Per-Layer Timings")
+    print("=" * 70)
+    print()
+
+    if backend == 'onnxruntime':
+        backend_options = dict(backend_options, profile=True)
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
+    profiler = LayerProfiler(engine)
+    builder = BatchBlobBuilder(max_batch=1, method=method)
+    if image_dir:
+        frames = [cv2.imread(str(p)) for p in list_images(image_dir)[:num_frames]]
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            raise SystemExit(f"No images found in {image_dir}")
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(min(num_frames, 8))]
+    print(f"🎯 {num_frames} frames ({'images from ' + str(image_dir) if image_dir else 'synthetic 640x480'}), "
+          f"batch 1, {method} preprocessing")
+    print()
+
+    for frame in frames[:3]:
+        profiler.infer(builder.build([frame]), record=False)
+
+    trace = ChromeTrace(process_name=f"resnet50 {engine.describe()}")
+    trace.thread_name(0, 'main')
+    infer_spans = []
+    start_total = time.perf_counter()
+    for i in range(num_frames):
+        frame = frames[i % len(frames)]
+        with trace.span('frame', cat='frame', index=i):
+            with trace.span('preprocess'):
+                blob = builder.build([frame])
+            with trace.span('infer') as infer_span:
+                scores = profiler.infer(blob)
+            with trace.span('postprocess'):
+                _top5(scores)
+        infer_spans.append(infer_span)
+    total = time.perf_counter() - start_total
+
+    for span, layers in zip(infer_spans, profiler.finish()):
+        for name, op, offset_ms, ms in layers:
+            trace.complete(name, span['ts'] + offset_ms * 1000, ms * 1000, cat='layer', op=op)
+    Path(trace_path).parent.mkdir(parents=True, exist_ok=True)
+    trace.save(trace_path, model=MODEL_NAME, backend=engine.describe(), frames=num_frames)
+
+    stages = {stage: np.mean([e['dur'] for e in trace.spans('stage') if e['name'] == stage]) / 1000
+              for stage in ('preprocess', 'infer', 'postprocess')}
+    frame_ms = sum(stages.values())
+    layer_rows, op_rows = profiler.summary()
+    layer_ms = sum(r['mean_ms'] for r in layer_rows)
+
+    print("=" * 70)
+    print("RESULTS")
+    print("=" * 70)
+    print(f"Backend:             {engine.describe()}")
+    print(f"FPS (profiled):      {num_frames / total:.2f} frames/second")
+    print()
+    print(f"{'Stage':<14} {'Mean ms':>9} {'Share':>7}")
+    for stage, ms in stages.items():
+        print(f"{stage:<14} {ms:>9.3f} {ms / frame_ms * 100:>6.1f}%")
+    print()
+    print(f"Top {min(top, len(layer_rows))} of {len(layer_rows)} layers (share of summed layer time):")
+    print(f"{'Layer':<32} {'Op':<20} {'Mean ms':>9} {'Share':>7} {'Cum':>7}")
+    cumulative = 0.0
+    for r in layer_rows[:top]:
+        cumulative += r['share']
+        print(f"{r['layer'][:32]:<32} {r['op'][:20]:<20} {r['mean_ms']:>9.3f} "
+              f"{r['share'] * 100:>6.1f}% {cumulative * 100:>6.1f}%")
+    print()
+    print(f"{'Op type':<20} {'Layers':>7} {'Mean ms':>9} {'Share':>7}")
+    for r in op_rows:
+        print(f"{r['op'][:20]:<20} {r['layers']:>7} {r['mean_ms']:>9.3f} {r['share'] * 100:>6.1f}%")
+    print()
+    overhead = stages['infer'] - layer_ms
+    print(f"Layers sum to {layer_ms:.3f} ms of {stages['infer']:.3f} ms infer "
+          f"({overhead:.3f} ms input copy, scheduling and profiler overhead)")
+    print(f"💾 Chrome trace: {trace_path} (open in chrome://tracing or https://ui.perfetto.dev)")
+    print("=" * 70)
+
+    record_result(store, engine, 'profile', num_frames / total, stages['infer'], frames=num_frames,
+                  preprocess_ms=stages['preprocess'], postprocess_ms=stages['postprocess'],
+                  top_layers=[{k: r[k] for k in ('layer', 'op', 'mean_ms')} for r in layer_rows[:top]])
+    return {'stages': stages, 'layers': layer_rows, 'ops': op_rows, 'trace': trace_path}
+
+
+def _surveillance_clip(num_frames, size=(640, 480), seed=0):
+    """Static camera view with sensor noise and a person-sized block crossing now and then"""
+    import cv2
+    rng = np.random.default_rng(seed)
+    w, h = size
+    background = cv2.resize(rng.integers(0, 255, (12, 16, 3), dtype=np.uint8), size,
+                            interpolation=cv2.INTER_CUBIC)
+    noise = [rng.integers(-3, 4, (h, w, 3), dtype=np.int16) for _ in range(4)]
+    for i in range(num_frames):
+        frame = np.clip(background + noise[i % len(noise)], 0, 255).astype(np.uint8)
+        # Someone walks through during one of every three 60-frame periods
+        period, t = divmod(i, 60)
+        if period % 3 == 1:
+            x = int(t / 60 * (w - 80))
+            frame[h // 3:h // 3 + 200, x:x + 80] = (40, 60, 200)
+        yield frame
+
+
+def benchmark_resnet50_cpu_gated(thresholds=(0.0, 0.01, 0.02, 0.05, 0.1), num_frames=600,
+                                 source=None, max_skip=30, backend='opencv', model_path=None,
+                                 store=None, **backend_options):
+    """Trade inferences for accuracy with a motion gate in front of the model
+
+    Each threshold replays the same clip (a video file, image directory or
+    a synthetic static-camera scene). Threshold 0 infers every frame and is
+    the reference: accuracy is the share of frames whose top-1 class
+    matches it. CPU time is process time spent in gating plus inference.
+    """
+    from itertools import islice
+    from src.pipeline.motion_gate import GatedInference, MotionGate
+    from src.pipeline.multistream import open_source
+    from src.preprocessing.images import BatchBlobBuilder
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 Motion-Gated Inference")
+    print("=" * 70)
+    print()
+
+    engine = load_resnet50_cpu(model_path, backend=backend, **backend_options)
+    builder = BatchBlobBuilder(max_batch=1)
+
+    def infer(frame):
+        return _top5(engine.infer(builder.build([frame])))[0][0]
+
+    def clip():
+        if source:
+            return islice(open_source(source)[0], num_frames)
+        return _surveillance_clip(num_frames)
+
+    for frame in islice(clip(), 3):
+        infer(frame)
+
+    thresholds = sorted(set(thresholds) | {0.0})
+    print(f"🎯 {num_frames} frames of {source or 'synthetic static-camera scene'}, "
+          f"thresholds {thresholds}, refresh every {max_skip} skipped frames")
+    print()
+
+    results, reference = [], None
+    for threshold in thresholds:
+        gated = GatedInference(infer, MotionGate(threshold=threshold, max_skip=max_skip))
+        latencies = LatencyHistogram()
+        labels = []
+        cpu_s = 0.0
+        for frame in clip():
+            cpu, start = time.process_time(), time.perf_counter()
+            label, _ = gated(frame)
+            latencies.record((time.perf_counter() - start) * 1000)
+            cpu_s += time.process_time() - cpu
+            labels.append(label)
+        if reference is None:
+            reference = labels
+        results.append({
+            'threshold': threshold,
+            'frames': gated.frames,
+            'inferences': gated.inferred,
+            'saved': gated.saved,
+            'cpu_s': cpu_s,
+            'accuracy': float(np.mean([a == b for a, b in zip(labels, reference)])),
+            'mean_ms': latencies.mean,
+            'p99_ms': latencies.percentile(99),
+        })
+
+    baseline = results[0]
+    print(f"{'Threshold':>9} {'Inferred':>9} {'Saved':>7} {'CPU s':>7} {'CPU saved':>9} "
+          f"{'Agree':>7} {'Mean ms':>8} {'p99 ms':>8}")
+    for r in results:
+        r['cpu_saved'] = 1.0 - r['cpu_s'] / baseline['cpu_s'] if baseline['cpu_s'] else 0.0
+        print(f"{r['threshold']:>9.3f} {r['inferences']:>9} {r['saved'] * 100:>6.1f}% {r['cpu_s']:>7.2f} "
+              f"{r['cpu_saved'] * 100:>8.1f}% {r['accuracy'] * 100:>6.1f}% {r['mean_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f}")
+        record_result(store, engine, 'gated', 1000.0 / r['mean_ms'] if r['mean_ms'] else 0.0,
+                      r['mean_ms'], frames=r['frames'], gate_threshold=r['threshold'],
+                      max_skip=max_skip, inferences=r['inferences'], saved=r['saved'],
+                      cpu_saved=r['cpu_saved'], agreement=r['accuracy'], p99_ms=r['p99_ms'],
+                      clip=str(source or 'synthetic'))
+    print()
+    good = [r for r in results[1:] if r['accuracy'] >= 0.99]
+    if good:
+        best = max(good, key=lambda r: r['saved'])
+        print(f"💡 Threshold {best['threshold']:g} skips {best['saved'] * 100:.0f}% of inferences "
+              f"with {best['accuracy'] * 100:.1f}% agreement")
+    print("=" * 70)
+    return results
+
+
+def benchmark_model_startup(models=None, switches=20, backend='opencv', store_root=None,
+                            offline=False, expected_sha256=None, **backend_options):
+    """Measure cold start, warm registry hits and model-switch latency
+
+    models are "name[:version]" entries already in the model store
+    (ResNet50 is added on first use). Requests alternate between the models
+    `switches` times through a ModelRegistry; an uncached reload of each
+    model is timed for comparison.
+    """
+    print("=" * 70)
+    print("Model Startup & Switching Benchmark")
+    print("=" * 70)
+    print()
+
+    store = ModelStore(store_root or DEFAULT_STORE, offline=offline)
+    print("📥 Preparing model store...")
+    if not models:
+        resolve_resnet50(offline=offline, store_root=store_root, expected_sha256=expected_sha256)
+        models = [f"{MODEL_NAME}:{MODEL_VERSION}"]
+    print(f"   Store: {store.root}")
+    print()
+
+    specs = [tuple(m.split(':', 1)) if ':' in m else (m, None) for m in models]
+    registry = ModelRegistry(store)
+
+    print(f"🎯 Cold-loading {len(specs)} model(s), then {switches} switches...")
+    for name, version in specs:
+        registry.get(name, version, backend=backend, **backend_options)
+    for i in range(switches):
+        name, version = specs[i % len(specs)]
+        registry.get(name, version, backend=backend, **backend_options)
+
+    reload_ms = {}
+    for name, version in specs:
+        version, _ = store.entry(name, version)
+        start = time.perf_counter()
+        engine = load_backend(backend, store.resolve(name, version), **backend_options)
+        reload_ms[f"{name}:{version}"] = (time.perf_counter() - start) * 1000
+        engine.close()
+
+    print()
+    print("=" * 70)
+    print("STARTUP RESULTS")
+    print("=" * 70)
+    print(f"{'Model':<28} {'Cold ms':>9} {'Warm ms':>9} {'Reload ms':>10} {'Switches':>9}")
+    for model in reload_ms:
+        events = [e for e in registry.events if e['model'] == model]
+        cold = [e['total_ms'] for e in events if not e['warm']]
+        warm = [e['total_ms'] for e in events if e['warm']]
+        print(f"{model:<28} {np.mean(cold):>9.2f} {np.mean(warm) if warm else float('nan'):>9.3f} "
+              f"{reload_ms[model]:>10.2f} {len(warm):>9}")
+    print()
+    print("Cold = resolve + verify + load; Warm = registry hit; Reload = uncached load")
+    print("=" * 70)
+
+    return registry.events
+
+
+def _parallel_worker(worker_id, model_path, backend, backend_options, frame_queue, result_queue):
+    """Worker process: own loaded backend, pulls frames until a None sentinel"""
+    engine = load_backend(backend, model_path, **backend_options)
+
+    # Warmup before reporting ready so load time stays out of the measurement
+    warmup_blob = np.zeros((1, 3, 224, 224), dtype=np.float32)
+    for _ in range(2):
+        _ = engine.infer(warmup_blob)
+    result_queue.put(('ready', worker_id))
+
+    frames = 0
+    busy_time = 0.0
+    start = None
+    while True:
+        frame = frame_queue.get()
+        if frame is None:
+            break
+        if start is None:
+            start = time.perf_counter()
+        t0 = time.perf_counter()
+        blob = frame.transpose(2, 0, 1)[np.newaxis].astype(np.float32)
+        _ = engine.infer(blob)
+        busy_time += time.perf_counter() - t0
+        frames += 1
+
+    active_time = time.perf_counter() - start if start is not None else 0.0
+    result_queue.put(('done', worker_id, frames, busy_time, active_time))
+
+
+def _run_worker_pool(num_workers, num_frames, model_path, backend, backend_options):
+    """Run one pool size to completion, return its aggregate measurements"""
+    ctx = mp.get_context('spawn')
+    frame_queue = ctx.Queue(maxsize=num_workers * 2)
+    result_queue = ctx.Queue()
+
+    workers = [
+        ctx.Process(target=_parallel_worker,
+                    args=(i, model_path, backend, backend_options, frame_queue, result_queue),
+                    daemon=True)
+        for i in range(num_workers)
+    ]
+    for w in workers:
+        w.start()
+    for _ in range(num_workers):
+        result_queue.get()  # ('ready', worker_id)
+
+    # A few distinct synthetic frames, cycled, so the producer is never the bottleneck
+    frames = [np.random.randint(0, 255, (224, 224, 3), dtype=np.uint8) for _ in range(4)]
+
+    start_total = time.perf_counter()
+    for i in range(num_frames):
+        frame_queue.put(frames[i % len(frames)])
+    for _ in range(num_workers):
+        frame_queue.put(None)
+
+    per_worker = []
+    for _ in range(num_workers):
+        _, worker_id, done, busy_time, active_time = result_queue.get()
+        per_worker.append({
+            'worker_id': worker_id,
+            'frames': done,
+            'fps': done / active_time if active_time > 0 else 0.0,
+            'utilization': busy_time / active_time if active_time > 0 else 0.0,
+            'busy_time': busy_time,
+        })
+    total_time = time.perf_counter() - start_total
+
+    for w in workers:
+        w.join()
+
+    per_worker.sort(key=lambda r: r['worker_id'])
+    done = sum(w['frames'] for w in per_worker)
+    return {
+        'workers': num_workers,
+        'frames': num_frames,
+        'total_time': total_time,
+        'aggregate_fps': num_frames / total_time,
+        # Mean per-frame inference time inside the workers
+        'latency_ms': sum(w['busy_time'] for w in per_worker) / done * 1000 if done else None,
+        'per_worker': per_worker,
+    }
+
+
+def benchmark_resnet50_cpu_parallel(max_workers=4, num_frames=100, threads_per_worker=1,
+                                    model_path=None, backend='opencv', store=None):
+    """Measure aggregate CPU throughput with 1..max_workers DNN worker processes
+
+    Each worker process holds its own loaded backend and pulls frames from a
+    shared bounded queue. Scaling efficiency is aggregate FPS divided by
+    (workers × single-worker FPS).
+    """
+
+    print("=" * 70)
+    print("CPU Baseline Benchmark: ResNet50 Parallel Worker Scaling")
+    print("=" * 70)
+    print()
+
+    # Make sure the model is on disk before the workers try to load it
+    print("📥 Loading ResNet50 model...")
+    model_path = resolve_resnet50(model_path)
+    print()
+    backend_options = worker_backend_options(backend, threads_per_worker)
+
+    print(f"🎯 Running {num_frames} frames with 1..{max_workers} worker processes "
+          f"({threads_per_worker} thread(s) each)...")
+    print()
+
+    results = []
+    for num_workers in range(1, max_workers + 1):
+        result = _run_worker_pool(num_workers, num_frames, model_path, backend, backend_options)
+        result['scaling_efficiency'] = (
+            result['aggregate_fps'] / (num_workers * results[0]['aggregate_fps'])
+            if results else 1.0
+        )
+        results.append(result)
+        per_worker_fps = ", ".join(f"{w['fps']:.2f}" for w in result['per_worker'])
+        print(f"   {num_workers} worker(s): {result['aggregate_fps']:6.2f} FPS aggregate "
+              f"[per worker: {per_worker_fps}]")
+
+    print()
+    print("=" * 70)
+    print("PARALLEL SCALING RESULTS")
+    print("=" * 70)
+    print(f"{'Workers':>8} {'Agg FPS':>9} {'Mean/worker':>12} {'Speedup':>8} {'Efficiency':>11}")
+    for r in results:
+        mean_worker_fps = np.mean([w['fps'] for w in r['per_worker']])
+        print(f"{r['workers']:>8} {r['aggregate_fps']:>9.2f} {mean_worker_fps:>12.2f} "
+              f"{r['aggregate_fps'] / results[0]['aggregate_fps']:>7.2f}× "
+              f"{r['scaling_efficiency'] * 100:>10.1f}%")
+    # Unloaded engine: same name and options as the ones the workers load
+    engine = BACKENDS[backend](**backend_options)
+    for r in results:
+        record_result(store, engine, 'parallel', r['aggregate_fps'], r['latency_ms'],
+                      workers=r['workers'], frames=r['frames'], threads_per_worker=threads_per_worker,
+                      scaling_efficiency=r['scaling_efficiency'],
+                      per_worker_fps=[w['fps'] for w in r['per_worker']])
+    best = max(results, key=lambda r: r['aggregate_fps'])
+    print()
+    print(f"Peak throughput:     {best['aggregate_fps']:.2f} FPS with {best['workers']} worker(s)")
+    print("=" * 70)
+
+    return results
+
+
+def worker_backend_options(backend, threads):
+    """Backend options that pin each engine to `threads` intra-op threads"""
+    if backend == 'onnxruntime':
+        return {'intra_op_threads': threads, 'inter_op_threads': 1}
+    if backend == 'opencv':
+        return {'num_threads': threads}
+    return {}
+
+
+def compare_backends(backends=('opencv', 'onnxruntime'), num_frames=100, backend_options=None,
+                     model_path=None, store=None):
+    """Run the same single-frame benchmark loop against each backend
+
+    backend_options maps a backend name to its keyword options.
+    Returns {backend: (fps, avg_latency)}.
+    """
+    backend_options = backend_options or {}
+    results = {}
+    for backend in backends:
+        results[backend] = benchmark_resnet50_cpu(num_frames=num_frames, backend=backend,
+                                                  model_path=model_path, store=store,
+                                                  **backend_options.get(backend, {}))
+        print()
+
+    baseline_fps = results[backends[0]][0]
+
+    print("=" * 70)
+    print("BACKEND COMPARISON")
+    print("=" * 70)
+    print(f"{'Backend':<14} {'FPS':>8} {'Avg ms':>9} {'vs ' + backends[0]:>14}")
+    for backend in backends:
+        fps, avg_latency = results[backend]
+        print(f"{backend:<14} {fps:>8.2f} {avg_latency:>9.2f} {fps / baseline_fps:>13.2f}×")
+    print("=" * 70)
+
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='CPU-only ResNet50 baseline benchmark')
+    parser.add_argument('--mode', choices=['single', 'batch', 'parallel', 'compare', 'e2e',
+                                           'pipeline', 'startup', 'soak', 'multistream', 'gated', 'int8',
+                                           'profile'],
+                        default='single',
+                        help='single: batch-1 loop, batch: batch-size sweep, '
+                             'parallel: worker-process scaling, compare: every --backends engine, '
+                             'e2e: decode + preprocess + infer on --image-dir, '
+                             'pipeline: threaded stages joined by bounded queues, '
+                             'startup: cold/warm model load and switch latency, '
+                             'soak: long run with per-window FPS, thermal and cpufreq sampling, '
+                             'multistream: many camera streams sharing one engine, '
+                             'gated: motion-gated inference threshold sweep, '
+                             'int8: FP32 vs static INT8 quantized model, '
+                             'profile: per-layer timings and a Chrome trace')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='opencv',
+                        help='Inference engine (default: opencv)')
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS),
+                        default=['opencv', 'onnxruntime'],
+                        help='Engines to run in compare mode (default: opencv onnxruntime)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='OpenCV threads / ONNX Runtime intra-op threads (default: library default)')
+    parser.add_argument('--inter-op-threads', type=int, default=None,
+                        help='ONNX Runtime inter-op threads (default: library default)')
+    parser.add_argument('--histogram', action='store_true',
+                        help='Print the full latency histogram in single mode')
+    parser.add_argument('--iterations', type=int, default=100,
+                        help='Frames to run in single mode (default: 100)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Batch sizes to sweep in batch mode (default: 1 2 4 8)')
+    parser.add_argument('--images', type=int, default=64,
+                        help='Images per batch size in batch mode, or total images in e2e mode '
+                             '(default: 64)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Maximum worker processes in parallel mode (default: 4)')
+    parser.add_argument('--threads-per-worker', type=int, default=1,
+                        help='Engine threads per worker in parallel mode (default: 1)')
+    parser.add_argument('--image-dir', default=None,
+                        help='Directory of images for e2e mode (optional in pipeline mode)')
+    parser.add_argument('--queue-size', type=int, default=4,
+                        help='Bounded queue size between pipeline stages (default: 4)')
+    parser.add_argument('--queue-policy', choices=['drop_oldest', 'block'], default='block',
+                        help='Pipeline queue policy when full (default: block)')
+    parser.add_argument('--source-fps', type=float, default=None,
+                        help='Pace pipeline capture like a camera at this rate (default: unpaced)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Pipeline mode: serve Prometheus metrics on this localhost port')
+    parser.add_argument('--infer-workers', type=int, default=1,
+                        help='Inference threads (each with its own engine) in pipeline mode')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Batch size in e2e mode (default: 1)')
+    parser.add_argument('--decode-workers', type=int, default=2,
+                        help='Background decode threads in e2e mode (default: 2)')
+    parser.add_argument('--preprocess', choices=['numpy', 'opencv'], default='numpy',
+                        help='e2e blob builder: vectorized numpy or cv2.dnn.blobFromImages')
+    parser.add_argument('--model', default=None,
+                        help='Explicit ONNX model file (bypasses the model store)')
+    parser.add_argument('--model-store', default=None,
+                        help=f'Model store directory (default: {DEFAULT_STORE})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Never download; fail if the model is not already stored')
+    parser.add_argument('--model-sha256', default=None,
+                        help='Expected SHA-256 of resnet50-v1-7.onnx (default: MODEL_SHA256 if set, otherwise '
+                             'the digest the store pinned on first use)')
+    parser.add_argument('--store-add', nargs=2, metavar=('PATH', 'NAME:VERSION'), action='append',
+                        help='Import a local model file into the store (repeatable)')
+    parser.add_argument('--models', nargs='+', default=None,
+                        help='Stored models (name[:version]) to switch between in startup mode')
+    parser.add_argument('--switches', type=int, default=20,
+                        help='Model switches in startup mode (default: 20)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Run time in seconds: soak mode (default: 600), '
+                             'multistream mode per stream count (default: 20)')
+    parser.add_argument('--window', type=float, default=10,
+                        help='Soak mode reporting window in seconds (default: 10)')
+    parser.add_argument('--temp-limit', type=float, default=80,
+                        help='Flag soak windows at or above this temperature in °C (default: 80)')
+    parser.add_argument('--soak-log', default=None,
+                        help='Append every soak window as a JSON line to this file')
+    parser.add_argument('--streams', type=int, nargs='+', default=[4],
+                        help='Multistream mode: stream counts to run (default: 4)')
+    parser.add_argument('--sources', nargs='+', default=None,
+                        help="Multistream mode: video files, image directories or 'synthetic', "
+                             "assigned to streams in turn (default: synthetic)")
+    parser.add_argument('--policy', choices=['round_robin', 'weighted', 'deadline'],
+                        default='round_robin', help='Multistream mode: scheduling policy')
+    parser.add_argument('--weights', type=float, nargs='+', default=None,
+                        help='Multistream mode: per-stream weights for --policy weighted, cycled')
+    parser.add_argument('--max-batch', type=int, default=4,
+                        help='Multistream mode: most frames batched across streams (default: 4)')
+    parser.add_argument('--batch-window', type=float, default=0.0,
+                        help='Multistream mode: ms to wait for frames to line up (default: 0)')
+    parser.add_argument('--stream-fps', type=float, default=None,
+                        help='Multistream mode: per-stream FPS (default: video FPS or 30)')
+    parser.add_argument('--gate-thresholds', type=float, nargs='+', default=[0.0, 0.01, 0.02, 0.05, 0.1],
+                        help='Gated mode: changed-block fractions that trigger inference')
+    parser.add_argument('--max-skip', type=int, default=30,
+                        help='Gated mode: infer at least once per this many frames (default: 30)')
+    parser.add_argument('--clip', default=None,
+                        help='Gated mode: video file or image directory (default: synthetic scene)')
+    parser.add_argument('--calib-dir', default=None,
+                        help='INT8 mode: calibration image directory (default: --image-dir)')
+    parser.add_argument('--calib-images', type=int, default=32,
+                        help='INT8 mode: calibration images to use (default: 32)')
+    parser.add_argument('--calib-method', choices=['minmax', 'entropy', 'percentile'], default='minmax',
+                        help='INT8 mode: activation range calibration (default: minmax)')
+    parser.add_argument('--per-tensor', action='store_true',
+                        help='INT8 mode: per-tensor instead of per-channel weight scales')
+    parser.add_argument('--trace', default=str(DEFAULT_TRACE),
+                        help=f'Profile mode: Chrome trace output path (default: {DEFAULT_TRACE}, untracked)')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Profile mode: slowest layers to list (default: 15)')
+    parser.add_argument('--results', default=str(DEFAULT_RESULTS),
+                        help=f'Result store (JSONL) to append runs to (default: {DEFAULT_RESULTS}, untracked)')
+    parser.add_argument('--no-record', action='store_true',
+                        help='Do not append this run to the result store')
+    return parser.parse_args()
+
+
+def backend_options_from_args(args, backend):
+    """Translate the generic thread flags into one backend's keyword options"""
+    if backend == 'onnxruntime':
+        return {'intra_op_threads': args.threads, 'inter_op_threads': args.inter_op_threads}
+    if backend == 'opencv':
+        return {'num_threads': args.threads}
+    return {}
+
+
 if __name__ == "__main__":
-    fps, latency = benchmark_resnet50_cpu(num_frames=100)
+    args = parse_args()
+    options = backend_options_from_args(args, args.backend)
+    for path, spec in args.store_add or []:
+        name, _, version = spec.partition(':')
+        stored = ModelStore(args.model_store or DEFAULT_STORE).add(path, name, version or 'default')
+        print(f"📦 Stored {path} as {name}:{version or 'default'} -> {stored}")
+
+    if args.mode == 'startup':
+        try:
+            benchmark_model_startup(models=args.models, switches=args.switches, backend=args.backend,
+                                    store_root=args.model_store, offline=args.offline,
+                                    expected_sha256=args.model_sha256, **options)
+        except (FileNotFoundError, ValueError) as e:
+            raise SystemExit(f"❌ {e}")
+        raise SystemExit(0)
 
+    store = None if args.no_record else ResultStore(args.results)
+
+    print("📥 Resolving ResNet50 model...")
+    try:
+        model_path = resolve_resnet50(args.model, offline=args.offline, store_root=args.model_store,
+                                      expected_sha256=args.model_sha256)
+    except (FileNotFoundError, ValueError) as e:
+        raise SystemExit(f"❌ {e}")
+    print()
+
+    if args.mode == 'batch':
+        benchmark_resnet50_cpu_batched(batch_sizes=args.batch_sizes, num_images=args.images,
+                                       backend=args.backend, model_path=model_path, store=store,
+                                       **options)
+    elif args.mode == 'parallel':
+        benchmark_resnet50_cpu_parallel(max_workers=args.workers, num_frames=args.iterations,
+                                        threads_per_worker=args.threads_per_worker,
+                                        model_path=model_path, backend=args.backend, store=store)
+    elif args.mode == 'e2e':
+        if not args.image_dir:
+            raise SystemExit("e2e mode requires --image-dir")
+        benchmark_resnet50_cpu_end_to_end(args.image_dir, batch_size=args.batch_size,
+                                          num_images=args.images, decode_workers=args.decode_workers,
+                                          method=args.preprocess, backend=args.backend,
+                                          model_path=model_path, store=store, **options)
+    elif args.mode == 'pipeline':
+        benchmark_resnet50_cpu_pipeline(num_frames=args.iterations, image_dir=args.image_dir,
+                                        queue_size=args.queue_size, policy=args.queue_policy,
+                                        infer_workers=args.infer_workers,
+                                        source_fps=args.source_fps, metrics_port=args.metrics_port,
+                                        backend=args.backend, model_path=model_path, store=store,
+                                        **options)
+    elif args.mode == 'soak':
+        benchmark_resnet50_cpu_soak(duration_s=args.duration or 600, window_s=args.window,
+                                    backend=args.backend, model_path=model_path, store=store,
+                                    log_path=args.soak_log, temp_limit_c=args.temp_limit, **options)
+    elif args.mode == 'multistream':
+        benchmark_resnet50_cpu_multistream(stream_counts=args.streams, sources=args.sources,
+                                           policy=args.policy, weights=args.weights,
+                                           max_batch=args.max_batch, batch_window_ms=args.batch_window,
+                                           stream_fps=args.stream_fps, duration_s=args.duration or 20,
+                                           backend=args.backend, model_path=model_path, store=store,
+                                           **options)
+    elif args.mode == 'gated':
+        benchmark_resnet50_cpu_gated(thresholds=args.gate_thresholds, num_frames=args.iterations,
+                                     source=args.clip, max_skip=args.max_skip, backend=args.backend,
+                                     model_path=model_path, store=store, **options)
+    elif args.mode == 'int8':
+        benchmark_resnet50_cpu_int8(num_frames=args.iterations, image_dir=args.image_dir,
+                                    calib_dir=args.calib_dir, calib_images=args.calib_images,
+                                    method=args.calib_method, per_channel=not args.per_tensor,
+                                    model_path=model_path, store=store, store_root=args.model_store,
+                                    offline=args.offline,
+                                    **backend_options_from_args(args, 'onnxruntime'))
+    elif args.mode == 'profile':
+        benchmark_resnet50_cpu_profile(num_frames=args.iterations, image_dir=args.image_dir,
+                                       trace_path=args.trace, top=args.top, method=args.preprocess,
+                                       backend=args.backend, model_path=model_path, store=store,
+                                       **options)
+    elif args.mode == 'compare':
+        compare_backends(backends=args.backends, num_frames=args.iterations,
+                         backend_options={b: backend_options_from_args(args, b) for b in args.backends},
+                         model_path=model_path, store=store)
+    else:
+        fps, latency = benchmark_resnet50_cpu(num_frames=args.iterations, backend=args.backend,
+                                              show_histogram=args.histogram, model_path=model_path,
+                                              store=store, **options)
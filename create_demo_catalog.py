@@ -12,13 +12,32 @@ from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from pathlib import Path
 from datetime import datetime
+import argparse
+import tempfile
+import time
 
-def create_demo_catalog():
-    """Generate a professional PDF catalog of demos and visualizations"""
+from src.reporting.image_cache import DEFAULT_CACHE, ImageCache
+
+OUTPUT_FILE = Path('/home/admin/Desktop/Najeeb/results/DEMO_CATALOG.pdf')
+GRAPHS_DIR = Path('/home/admin/Desktop/Najeeb/results/graphs')
+
+# Printed size of each gallery graph
+GRAPH_WIDTH_IN = 6.5
+GRAPH_HEIGHT_IN = 4
+DEFAULT_IMAGE_DPI = 200
+
+def create_demo_catalog(output_file=OUTPUT_FILE, graphs_dir=GRAPHS_DIR, image_dpi=DEFAULT_IMAGE_DPI,
+                        image_cache=None):
+    """Generate a professional PDF catalog of demos and visualizations
+    
+    Graphs are embedded at image_dpi for their printed size, using
+    derivatives from image_cache (an ImageCache). image_dpi=None embeds
+    the original full-resolution files.
+    """
     
     # Setup paths
-    output_file = Path('/home/admin/Desktop/Najeeb/results/DEMO_CATALOG.pdf')
-    graphs_dir = Path('/home/admin/Desktop/Najeeb/results/graphs')
+    output_file = Path(output_file)
+    graphs_dir = Path(graphs_dir)
     
     # Create PDF document
     doc = SimpleDocTemplate(str(output_file), pagesize=letter,
@@ -162,6 +181,13 @@ def create_demo_catalog():
          'Visualizes which models achieve real-time performance with and without Hailo acceleration.')
     ]
     
+    # Resample every graph to its printed size once; cached by content hash
+    prepared = {}
+    if image_dpi:
+        image_cache = image_cache or ImageCache()
+        prepared = image_cache.prepare([graphs_dir / f for f, _, _ in graph_files],
+                                       GRAPH_WIDTH_IN, GRAPH_HEIGHT_IN, image_dpi)
+    
     for graph_file, title, description in graph_files:
         graph_path = graphs_dir / graph_file
         
@@ -171,7 +197,8 @@ def create_demo_catalog():
             elements.append(Spacer(1, 0.1*inch))
             
             # Add image (scaled to fit page)
-            img = Image(str(graph_path), width=6.5*inch, height=4*inch)
+            img = Image(str(prepared.get(graph_path, graph_path)),
+                        width=GRAPH_WIDTH_IN*inch, height=GRAPH_HEIGHT_IN*inch)
             elements.append(img)
             elements.append(Spacer(1, 0.2*inch))
         else:
@@ -328,15 +355,77 @@ def create_demo_catalog():
     print(f"✅ Demo catalog created: {output_file}")
     return output_file
 
+def build_timed(**kwargs):
+    """Build the catalog; returns (path, seconds, bytes)"""
+    start = time.perf_counter()
+    path = create_demo_catalog(**kwargs)
+    return path, time.perf_counter() - start, path.stat().st_size
+
+
+def compare_builds(output_file, graphs_dir, image_dpi, cache_dir, workers):
+    """Report PDF size and build time: original images vs cold and warm derivative cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        runs = [('Original images', {'image_dpi': None}, tmp / 'original.pdf')]
+        cold_cache = ImageCache(tmp / 'cache', workers=workers)
+        runs.append((f'{image_dpi} dpi, cold cache', {'image_cache': cold_cache}, tmp / 'cold.pdf'))
+        warm_cache = ImageCache(cache_dir, workers=workers)
+        warm_cache.prepare([graphs_dir / p.name for p in sorted(graphs_dir.glob('*.png'))],
+                           GRAPH_WIDTH_IN, GRAPH_HEIGHT_IN, image_dpi)
+        runs.append((f'{image_dpi} dpi, warm cache', {'image_cache': warm_cache}, output_file))
+
+        results = []
+        for label, options, path in runs:
+            options.setdefault('image_dpi', image_dpi)
+            _, seconds, size = build_timed(output_file=path, graphs_dir=graphs_dir, **options)
+            results.append((label, seconds, size))
+
+    print()
+    print(f"{'Build':<24} {'Time s':>8} {'PDF MB':>8}")
+    for label, seconds, size in results:
+        print(f"{label:<24} {seconds:>8.2f} {size / 1e6:>8.2f}")
+    base = results[0]
+    best = results[-1]
+    print(f"\n📉 {base[2] / best[2]:.1f}× smaller, {base[1] / best[1]:.1f}× faster with a warm cache")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Create the demo catalog PDF')
+    parser.add_argument('--output', default=str(OUTPUT_FILE),
+                        help=f'PDF to write (default: {OUTPUT_FILE})')
+    parser.add_argument('--graphs-dir', default=str(GRAPHS_DIR),
+                        help=f'Directory with the graph PNGs (default: {GRAPHS_DIR})')
+    parser.add_argument('--image-dpi', type=int, default=DEFAULT_IMAGE_DPI,
+                        help=f'Print resolution for embedded graphs (default: {DEFAULT_IMAGE_DPI})')
+    parser.add_argument('--original-images', action='store_true',
+                        help='Embed the full-resolution graphs without resampling')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE),
+                        help='Derivative image cache (default: ~/.cache/hailo-bench/images)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for resampling (default: CPU count)')
+    parser.add_argument('--compare', action='store_true',
+                        help='Also build with original images and a cold cache, and report size and time')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
     try:
         print("\n" + "="*60)
         print("Creating Demo Catalog PDF...")
         print("="*60 + "\n")
-        output = create_demo_catalog()
+        if args.compare:
+            compare_builds(Path(args.output), Path(args.graphs_dir), args.image_dpi,
+                           args.cache_dir, args.workers)
+            output = Path(args.output)
+        else:
+            cache = ImageCache(args.cache_dir, workers=args.workers)
+            output, seconds, size = build_timed(
+                output_file=args.output, graphs_dir=args.graphs_dir,
+                image_dpi=None if args.original_images else args.image_dpi, image_cache=cache)
+            print(f"⏱  {seconds:.2f} s, {size / 1e6:.2f} MB "
+                  f"(images: {cache.hits} cached, {cache.misses} resampled)")
         print(f"\n✅ Success! PDF saved to:\n   {output}\n")
     except Exception as e:
         print(f"\n❌ Error creating PDF: {e}")
         print("\nNote: This requires reportlab package.")
         print("Install with: pip install reportlab --break-system-packages\n")
-
@@ -4,35 +4,83 @@ Hailo AI HAT Benchmark Visualization
 Generates professional graphs from benchmark results for final project documentation
 """
 
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import matplotlib
+matplotlib.use('Agg')  # files only; also safe in worker processes
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 from pathlib import Path
 
+from src.benchmarking.results_store import BASELINE_HOST, PUBLISHED_RESULTS, ResultStore
+
 # Set style for professional-looking graphs
-plt.style.use('seaborn-v0_8-darkgrid')
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 11
-plt.rcParams['axes.labelsize'] = 12
-plt.rcParams['axes.titlesize'] = 14
-plt.rcParams['legend.fontsize'] = 10
-
-# Create output directory
-output_dir = Path('/home/admin/Desktop/Najeeb/results/graphs')
-output_dir.mkdir(parents=True, exist_ok=True)
-
-# Benchmark data from BENCHMARK_RESULTS.md
-data = {
-    'models': ['Pose\nEstimation\n(YOLOv8s)', 'Segmentation\n(YOLOv5n)', 
-               'Object\nDetection\n(YOLOv8s)', 'Classification\n(ResNet50)', 
-               'Person/Face\nDetection\n(YOLOv5s)'],
-    'short_names': ['Pose', 'Segmentation', 'Detection', 'Classification', 'Person/Face'],
-    'cpu_fps': [1.5, 0.8, 2.0, 6.73, 2.0],
-    'hailo_fps': [49.5, 64.2, 57.8, 47.3, 63.4],
-    'hailo_latency': [19.1, 14.4, 13.3, 15.5, 13.2],
-    'cpu_latency': [667, 1250, 500, 148.6, 500],
-    'speedup': [33.0, 80.3, 28.9, 7.0, 31.8]
+STYLE = 'seaborn-v0_8-darkgrid'
+RC_PARAMS = {
+    'figure.figsize': (12, 8),
+    'font.size': 11,
+    'axes.labelsize': 12,
+    'axes.titlesize': 14,
+    'legend.fontsize': 10,
 }
+DPI = 300
+plt.style.use(STYLE)
+plt.rcParams.update(RC_PARAMS)
+
+# Output directory and formats (see --output-dir / --formats)
+output_dir = Path('/home/admin/Desktop/Najeeb/results/graphs')
+output_formats = ['png']
+MANIFEST_NAME = '.graph_manifest.json'
+
+# Chart order, labels and the backend of each model's CPU baseline; values come from the result store
+CHART_MODELS = [
+    ('yolov8s_pose', 'Pose\nEstimation\n(YOLOv8s)', 'Pose', 'literature'),
+    ('yolov5n_seg', 'Segmentation\n(YOLOv5n)', 'Segmentation', 'literature'),
+    ('yolov8s', 'Object\nDetection\n(YOLOv8s)', 'Detection', 'literature'),
+    ('resnet50', 'Classification\n(ResNet50)', 'Classification', 'opencv'),
+    ('yolov5s_personface', 'Person/Face\nDetection\n(YOLOv5s)', 'Person/Face', 'literature'),
+]
+
+
+def load_chart_data(store, accelerated='hailo8l', baseline='cpu', host=BASELINE_HOST):
+    """Accelerated and CPU results per model on one host, in chart order
+
+    Records are pinned by backend (HailoRT HW-only, and each model's CPU
+    baseline backend from CHART_MODELS) and by host fields, so a run with
+    another backend or on other hardware never stands in for the
+    published numbers. Models without both records are skipped. CPU
+    speedups are computed from the stored FPS values.
+    """
+    fast = store.latest_by('model', device=accelerated, backend='hailort', mode='hw_only', host=host)
+
+    chart = {'models': [], 'short_names': [], 'tasks': [], 'cpu_fps': [], 'hailo_fps': [],
+             'hailo_latency': [], 'cpu_latency': [], 'speedup': []}
+    for key, label, short_name, cpu_backend in CHART_MODELS:
+        slow = store.latest(model=key, device=baseline, mode='single', backend=cpu_backend, host=host)
+        if key not in fast or slow is None:
+            print(f"⚠️  Skipping {short_name}: no {accelerated} and {baseline} ({cpu_backend}) results "
+                  f"for '{key}' on {host}")
+            continue
+        chart['models'].append(label)
+        chart['short_names'].append(short_name)
+        chart['tasks'].append(fast[key].get('task'))
+        chart['cpu_fps'].append(slow['fps'])
+        chart['hailo_fps'].append(fast[key]['fps'])
+        chart['hailo_latency'].append(fast[key]['latency_ms'])
+        chart['cpu_latency'].append(slow['latency_ms'])
+        chart['speedup'].append(fast[key]['fps'] / slow['fps'])
+    return chart
+
+
+# Benchmark data from the published result store (results/benchmarks/results.jsonl)
+data = load_chart_data(ResultStore(PUBLISHED_RESULTS))
 
 # Color scheme
 hailo_color = '#00D9FF'  # Hailo brand cyan
@@ -40,6 +88,14 @@ cpu_color = '#FF6B6B'    # Warm red for CPU
 speedup_color = '#4ECDC4' # Teal for speedup
 realtime_color = '#95E1D3' # Light green for real-time threshold
 
+def save_chart(name):
+    """Save the current figure in every requested output format"""
+    for fmt in output_formats:
+        path = output_dir / f'{name}.{fmt}'
+        plt.savefig(path, dpi=DPI, bbox_inches='tight')
+        print(f"✓ Generated: {path}")
+
+
 def create_fps_comparison():
     """Create FPS comparison bar chart"""
     fig, ax = plt.subplots(figsize=(14, 8))
@@ -81,8 +137,7 @@ def create_fps_comparison():
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'fps_comparison.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Generated: {output_dir / 'fps_comparison.png'}")
+    save_chart('fps_comparison')
     plt.close()
 
 
@@ -126,8 +181,7 @@ def create_latency_comparison():
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'latency_comparison.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Generated: {output_dir / 'latency_comparison.png'}")
+    save_chart('latency_comparison')
     plt.close()
 
 
@@ -180,8 +234,7 @@ def create_speedup_chart():
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'speedup_comparison.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Generated: {output_dir / 'speedup_comparison.png'}")
+    save_chart('speedup_comparison')
     plt.close()
 
 
@@ -269,8 +322,7 @@ def create_comprehensive_dashboard():
     fig.suptitle('Hailo AI HAT Benchmark Dashboard\nRaspberry Pi 5 + Hailo-8L (13 TOPS)', 
                  fontweight='bold', fontsize=16, y=0.98)
     
-    plt.savefig(output_dir / 'benchmark_dashboard.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Generated: {output_dir / 'benchmark_dashboard.png'}")
+    save_chart('benchmark_dashboard')
     plt.close()
 
 
@@ -279,13 +331,16 @@ def create_task_category_analysis():
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
     # Categorize tasks
-    dense_tasks = ['Pose', 'Segmentation', 'Detection', 'Person/Face']
-    dense_speedup = [33.0, 80.3, 28.9, 31.8]
-    classification_speedup = [7.0]
+    dense_tasks = [name for name, task in zip(data['short_names'], data['tasks'])
+                   if task != 'classification']
+    dense_speedup = [s for s, task in zip(data['speedup'], data['tasks'])
+                     if task != 'classification']
+    classification_speedup = [s for s, task in zip(data['speedup'], data['tasks'])
+                              if task == 'classification']
     
     # Plot 1: Speedup by category
     categories = ['Dense\nPrediction\n(avg)', 'Classification']
-    avg_speedup = [np.mean(dense_speedup), classification_speedup[0]]
+    avg_speedup = [np.mean(dense_speedup), np.mean(classification_speedup)]
     
     bars = ax1.bar(categories, avg_speedup, color=[hailo_color, '#FFB74D'], 
                    alpha=0.8, edgecolor='black', linewidth=1.5)
@@ -318,8 +373,7 @@ def create_task_category_analysis():
     plt.suptitle('Hailo-8L Performance by Task Type\nDense Prediction Shows Highest Acceleration', 
                  fontweight='bold', fontsize=14, y=1.02)
     plt.tight_layout()
-    plt.savefig(output_dir / 'task_category_analysis.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Generated: {output_dir / 'task_category_analysis.png'}")
+    save_chart('task_category_analysis')
     plt.close()
 
 
@@ -369,13 +423,139 @@ def create_realtime_capability_chart():
                    ha='center', va='bottom', fontweight='bold', fontsize=9)
     
     plt.tight_layout()
-    plt.savefig(output_dir / 'realtime_capability.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Generated: {output_dir / 'realtime_capability.png'}")
+    save_chart('realtime_capability')
     plt.close()
 
 
+# key: (function, output file stem, description)
+CHARTS = {
+    'fps': (create_fps_comparison, 'fps_comparison', 'FPS comparison bar chart'),
+    'latency': (create_latency_comparison, 'latency_comparison', 'Latency comparison (log scale)'),
+    'speedup': (create_speedup_chart, 'speedup_comparison', 'Speedup factors chart'),
+    'dashboard': (create_comprehensive_dashboard, 'benchmark_dashboard', 'Comprehensive dashboard'),
+    'tasks': (create_task_category_analysis, 'task_category_analysis', 'Task category analysis'),
+    'realtime': (create_realtime_capability_chart, 'realtime_capability', 'Real-time capability chart'),
+}
+
+
+def chart_hash(key):
+    """Fingerprint of everything a chart's output depends on
+
+    Covers the chart data, the chart function's source and the shared
+    style (matplotlib style, rcParams, colors, DPI, matplotlib version).
+    Formats are tracked separately in the manifest, so asking for an extra
+    format does not invalidate files that are already current.
+    """
+    func = CHARTS[key][0]
+    fingerprint = {
+        'data': data,
+        'source': inspect.getsource(func),
+        'style': [STYLE, RC_PARAMS, DPI, matplotlib.__version__,
+                  hailo_color, cpu_color, speedup_color, realtime_color],
+    }
+    encoded = json.dumps(fingerprint, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_manifest():
+    path = output_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    path = output_dir / MANIFEST_NAME
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def is_current(key, digest, manifest):
+    """True when the last build of this chart used the same inputs and its files still exist"""
+    entry = manifest.get(key)
+    if not entry or entry.get('hash') != digest:
+        return False
+    if not set(output_formats) <= set(entry.get('formats', [])):
+        return False
+    stem = CHARTS[key][1]
+    return all((output_dir / f'{stem}.{fmt}').exists() for fmt in output_formats)
+
+
+def _init_worker(chart_data, out_dir, formats):
+    """Give a worker process the same data and settings as the parent"""
+    global data, output_dir, output_formats
+    data, output_dir, output_formats = chart_data, Path(out_dir), list(formats)
+
+
+def _render(key):
+    start = time.perf_counter()
+    CHARTS[key][0]()
+    return key, time.perf_counter() - start
+
+
+def render_charts(keys, jobs=None, force=False):
+    """Render the requested charts whose inputs changed; returns (built, skipped)"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest()
+    hashes = {key: chart_hash(key) for key in keys}
+    todo = [key for key in keys if force or not is_current(key, hashes[key], manifest)]
+    skipped = [key for key in keys if key not in todo]
+    for key in skipped:
+        print(f"⏭  Up to date: {CHARTS[key][1]}")
+
+    built = {}
+    jobs = min(jobs or os.cpu_count() or 1, len(todo))
+    if jobs <= 1:
+        for key in todo:
+            built.update([_render(key)])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(data, str(output_dir), output_formats)) as pool:
+            for future in as_completed([pool.submit(_render, key) for key in todo]):
+                key, seconds = future.result()
+                built[key] = seconds
+
+    for key in built:
+        formats = set(output_formats)
+        previous = manifest.get(key, {})
+        if previous.get('hash') == hashes[key]:
+            formats |= set(previous.get('formats', []))
+        manifest[key] = {'hash': hashes[key], 'formats': sorted(formats),
+                         'built': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    if built:
+        save_manifest(manifest)
+    return built, skipped
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate benchmark graphs from the result store')
+    parser.add_argument('--charts', nargs='+', choices=list(CHARTS), default=list(CHARTS),
+                        help='Charts to generate (default: all)')
+    parser.add_argument('--formats', nargs='+', default=['png'],
+                        help='Output formats, e.g. png svg pdf (default: png)')
+    parser.add_argument('--output-dir', default=str(output_dir),
+                        help=f'Output directory (default: {output_dir})')
+    parser.add_argument('--results', default=str(PUBLISHED_RESULTS),
+                        help='Result store to read (default: results/benchmarks/results.jsonl)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count; 1 renders in-process)')
+    parser.add_argument('--force', action='store_true',
+                        help='Rebuild charts even if their inputs are unchanged')
+    return parser.parse_args()
+
+
 def main():
-    """Generate all visualization graphs"""
+    """Generate the requested visualization graphs"""
+    global data, output_dir, output_formats
+    args = parse_args()
+    output_dir = Path(args.output_dir)
+    output_formats = args.formats
+    if Path(args.results) != PUBLISHED_RESULTS:
+        data = load_chart_data(ResultStore(args.results))
+
     print("\n" + "="*60)
     print("Hailo AI HAT Benchmark Visualization Generator")
     print("="*60 + "\n")
@@ -383,26 +563,20 @@ def main():
     print("Generating graphs...")
     print()
     
-    # Generate all graphs
-    create_fps_comparison()
-    create_latency_comparison()
-    create_speedup_chart()
-    create_comprehensive_dashboard()
-    create_task_category_analysis()
-    create_realtime_capability_chart()
+    start = time.perf_counter()
+    built, skipped = render_charts(args.charts, jobs=args.jobs, force=args.force)
+    elapsed = time.perf_counter() - start
     
     print()
     print("="*60)
-    print("✅ All graphs generated successfully!")
+    print(f"✅ {len(built)} graph(s) generated, {len(skipped)} up to date ({elapsed:.1f} s)")
     print(f"📁 Output directory: {output_dir}")
     print()
-    print("Generated files:")
-    print("  1. fps_comparison.png - FPS comparison bar chart")
-    print("  2. latency_comparison.png - Latency comparison (log scale)")
-    print("  3. speedup_comparison.png - Speedup factors chart")
-    print("  4. benchmark_dashboard.png - Comprehensive dashboard")
-    print("  5. task_category_analysis.png - Task category analysis")
-    print("  6. realtime_capability.png - Real-time capability chart")
+    print("Charts:")
+    for i, key in enumerate(args.charts, 1):
+        stem, description = CHARTS[key][1], CHARTS[key][2]
+        state = f"built in {built[key]:.1f} s" if key in built else "up to date"
+        print(f"  {i}. {stem}.{{{','.join(output_formats)}}} - {description} ({state})")
     print("="*60 + "\n")
 
 
@@ -0,0 +1 @@
+"""Benchmarking utilities module"""
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+HailoRT log analyzer
+Startup and pipeline-construction waterfall per session and per model from hailort.log
+
+Run from the repository root:
+    python -m src.benchmarking.hailort_log hailort.log --sessions
+"""
+
+import argparse
+from datetime import datetime
+import json
+import mmap
+import re
+import statistics
+
+# One pass over the mapped file: the header is matched at every line start and
+# only lines carrying one of the indexed events ever reach Python. The outer
+# named group of each alternative closes last, so match.lastgroup is the kind.
+HEADER = rb'^\[(?P<ts>[\d-]+ [\d:.]+)\] \[(?P<tid>\d+)\] \[HailoRT\] \[\w+\] \[[^\]]*\] \[[^\]]*\] '
+EVENTS = (
+    ('vdevice', rb'Creating vdevice'),
+    ('vdevice_ready', rb'VDevice Infos'),
+    ('configure', rb'Configuring HEF on VDevice took (?P<configure_ms>[\d.]+)'),
+    ('activate', rb'Activating (?P<model>\S+) took (?P<activate_ms>[\d.]+)'),
+    ('deactivate', rb'Deactivating took (?P<deactivate_ms>[\d.]+)'),
+    ('element', rb'Created \('),
+    ('vstream', rb'(?:Input|Output) pipeline'),
+    ('abort', rb'(?:Failed (?:read|write)|Reading from stream was aborted|Shutdown event)'),
+    ('destroy', rb'Queue element \S+ has \d+ frames in his Queue on destruction'),
+)
+EVENT_INDEX = re.compile(
+    HEADER + rb'(?:' + rb'|'.join(rb'(?P<%s>%s)' % (name.encode(), body) for name, body in EVENTS) + rb')',
+    re.MULTILINE)
+
+PHASES = ('vdevice', 'configure', 'activate', 'pipeline', 'run', 'teardown')
+
+
+class Session:
+    """One vdevice lifetime: create -> configure -> activate -> run -> deactivate"""
+
+    def __init__(self, tid, start):
+        self.tid = tid
+        self.start = start
+        self.model = None
+        self.marks = {'vdevice': start}
+        self.configure_ms = None
+        self.activate_ms = 0.0
+        self.elements = 0
+        self.vstreams = 0
+        self.end = start
+
+    def mark(self, name, t, first=True):
+        """Remember when an event first (or last) happened"""
+        if not first or name not in self.marks:
+            self.marks[name] = t
+        self.end = max(self.end, t)
+
+    def waterfall(self):
+        """Phase durations in ms, each ending where the next begins"""
+        m = self.marks
+        ready = m.get('pipeline_built', m.get('activated', m.get('configured', self.start)))
+        run_end = m.get('first_abort', m.get('deactivated', self.end))
+        edges = [
+            ('vdevice', self.start, m.get('vdevice_ready', self.start)),
+            ('configure', m.get('vdevice_ready', self.start), m.get('configured', self.start)),
+            ('activate', m.get('configured', self.start), m.get('activated', m.get('configured', self.start))),
+            ('pipeline', m.get('activated', ready), ready),
+            ('run', ready, run_end),
+            ('teardown', run_end, m.get('deactivated', self.end)),
+        ]
+        return {name: max(0.0, (b - a) * 1000) for name, a, b in edges}
+
+    def summary(self):
+        return {
+            'model': self.model or 'unknown',
+            'tid': self.tid,
+            'start': datetime.fromtimestamp(self.start).isoformat(timespec='milliseconds'),
+            'configure_reported_ms': self.configure_ms,
+            'activate_reported_ms': self.activate_ms,
+            'pipeline_elements': self.elements,
+            'vstreams': self.vstreams,
+            'ready_ms': (self.marks.get('pipeline_built', self.marks.get('activated', self.start))
+                         - self.start) * 1000,
+            'phases_ms': self.waterfall(),
+        }
+
+
+def _seconds(ts, _cache={}):
+    """'2025-11-24 23:15:18.512' -> epoch seconds, parsing each date only once"""
+    date, clock = ts[:10], ts[11:]
+    base = _cache.get(date)
+    if base is None:
+        base = _cache[date] = datetime.fromisoformat(date.decode()).timestamp()
+    h, m, s = clock.split(b':')
+    return base + int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def scan(path):
+    """Sessions found in a HailoRT log, in start order"""
+    sessions = []
+    open_by_tid = {}
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return sessions
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            times = {}  # events cluster within the same millisecond
+            for match in EVENT_INDEX.finditer(data):
+                kind = match.lastgroup
+                ts = match.group('ts')
+                t = times.get(ts)
+                if t is None:
+                    if len(times) > 4096:
+                        times.clear()
+                    t = times[ts] = _seconds(ts)
+                tid = int(match.group('tid'))
+
+                if kind == 'vdevice':
+                    session = open_by_tid[tid] = Session(tid, t)
+                    sessions.append(session)
+                    continue
+                # Control-thread events go to that thread's session; worker-thread
+                # events to the most recently started session
+                session = open_by_tid.get(tid) or (sessions[-1] if sessions else None)
+                if session is None:
+                    continue
+
+                if kind == 'vdevice_ready':
+                    session.mark('vdevice_ready', t)
+                elif kind == 'configure':
+                    session.configure_ms = float(match.group('configure_ms'))
+                    session.mark('configured', t)
+                elif kind == 'activate':
+                    session.model = match.group('model').decode()
+                    # Core-op and network-group activation are logged as nested spans
+                    session.activate_ms = max(session.activate_ms, float(match.group('activate_ms')))
+                    session.mark('activated', t, first=False)
+                elif kind == 'element':
+                    session.elements += 1
+                    session.mark('pipeline_built', t, first=False)
+                elif kind == 'vstream':
+                    session.vstreams += 1
+                    session.mark('pipeline_built', t, first=False)
+                elif kind == 'abort':
+                    session.mark('first_abort', t)
+                elif kind == 'destroy':
+                    session.mark('destroyed', t, first=False)
+                elif kind == 'deactivate':
+                    session.mark('deactivated', t, first=False)
+    return sessions
+
+
+def per_model(sessions):
+    """{model: {'sessions': n, phase: median ms, ...}} plus switch gaps between sessions"""
+    models = {}
+    previous = None
+    for session in sessions:
+        summary = session.summary()
+        entry = models.setdefault(summary['model'], {'phases': {p: [] for p in PHASES},
+                                                      'ready': [], 'gaps': [], 'configure': []})
+        for phase, ms in summary['phases_ms'].items():
+            entry['phases'][phase].append(ms)
+        entry['ready'].append(summary['ready_ms'])
+        if summary['configure_reported_ms'] is not None:
+            entry['configure'].append(summary['configure_reported_ms'])
+        if previous is not None and previous.tid == session.tid:
+            entry['gaps'].append((session.start - previous.end) * 1000)
+        previous = session
+
+    report = {}
+    for model, entry in models.items():
+        report[model] = {
+            'sessions': len(entry['ready']),
+            'phases_ms': {p: statistics.median(v) for p, v in entry['phases'].items() if v},
+            'ready_ms': statistics.median(entry['ready']),
+            'configure_reported_ms': statistics.median(entry['configure']) if entry['configure'] else None,
+            'gap_before_ms': statistics.median(entry['gaps']) if entry['gaps'] else None,
+        }
+    return report
+
+
+def print_sessions(sessions, width=40):
+    """Startup waterfall per session, scaled to the slowest startup"""
+    summaries = [s.summary() for s in sessions]
+    scale = max((s['ready_ms'] for s in summaries), default=0) or 1.0
+    symbols = {'vdevice': 'V', 'configure': 'C', 'activate': 'A', 'pipeline': 'P'}
+    print(f"{'#':>3} {'Model':<20} {'Start':<23} {'Ready ms':>9}  Waterfall (V=vdevice C=configure A=activate P=pipeline)")
+    for i, s in enumerate(summaries):
+        bar = ''.join(symbols[p] * int(round(s['phases_ms'][p] / scale * width)) for p in symbols)
+        print(f"{i:>3} {s['model']:<20} {s['start']:<23} {s['ready_ms']:>9.1f}  {bar}")
+
+
+def print_models(report):
+    """Median startup breakdown per model and the component worth keeping resident"""
+    print(f"{'Model':<20} {'Sess':>4} {'VDev':>7} {'Config':>7} {'Activ':>7} {'Pipe':>7} "
+          f"{'Ready':>7} {'Tear':>7} {'Gap':>7}   (ms, medians)")
+    for model, r in report.items():
+        p = r['phases_ms']
+        gap = f"{r['gap_before_ms']:>7.1f}" if r['gap_before_ms'] is not None else f"{'-':>7}"
+        print(f"{model:<20} {r['sessions']:>4} {p['vdevice']:>7.1f} {p['configure']:>7.1f} "
+              f"{p['activate']:>7.1f} {p['pipeline']:>7.1f} {r['ready_ms']:>7.1f} {p['teardown']:>7.1f} {gap}")
+    print()
+    for model, r in report.items():
+        setup = {k: r['phases_ms'][k] for k in ('vdevice', 'configure', 'activate', 'pipeline')}
+        worst = max(setup, key=setup.get)
+        share = setup[worst] / r['ready_ms'] * 100 if r['ready_ms'] else 0
+        print(f"💡 {model}: {worst} is {share:.0f}% of startup ({setup[worst]:.1f} ms); "
+              f"keeping it resident saves that on every switch")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='HailoRT log startup / teardown analyzer')
+    parser.add_argument('logs', nargs='+', help='hailort.log files')
+    parser.add_argument('--sessions', action='store_true', help='Print the waterfall of every session')
+    parser.add_argument('--json', help='Write per-session and per-model results to this path')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print("=" * 70)
+    print("HailoRT Startup Analysis")
+    print("=" * 70)
+    sessions = []
+    for log in args.logs:
+        sessions.extend(scan(log))
+    print(f"📄 {len(args.logs)} log(s), {len(sessions)} sessions\n")
+
+    if args.sessions:
+        print_sessions(sessions)
+        print()
+    report = per_model(sessions)
+    print_models(report)
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'sessions': [s.summary() for s in sessions], 'models': report}, f, indent=2)
+        print(f"💾 Saved to {args.json}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Streaming parser for `hailortcli benchmark` output
+Turns the ANSI progress stream into per-phase FPS/latency time series and summary stats
+
+Run from the repository root:
+    python -m src.benchmarking.hailortcli_log results/benchmarks/*_raw.log
+    hailortcli benchmark model.hef | python -m src.benchmarking.hailortcli_log - --live
+"""
+
+import argparse
+from collections import namedtuple
+import codecs
+import csv
+import os
+import re
+import sys
+import time
+
+from .latency import LatencyHistogram
+
+# Cursor movement / erase sequences used by the progress bar redraws
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+PROGRESS = re.compile(
+    r'Network (?P<network>\S+?): *(?P<percent>\d+)% \| *(?P<frames>\d+) \| *'
+    r'(?:FPS: *(?P<fps>[\d.]+)|HW Latency: *(?P<latency>[\d.]+) *ms)'
+    r'(?: *\| *ETA: *(?P<eta>\d+):(?P<eta_m>\d+):(?P<eta_s>\d+))?')
+SUMMARY = re.compile(r'^(?P<label>[A-Za-z][A-Za-z ]*?)?\s*\((?P<key>[^)]+)\)\s*=\s*(?P<value>[\d.]+)')
+PHASES = (
+    ('HW-only mode', 'hw_only'),
+    ('streaming mode', 'streaming'),
+    ('HW Latency', 'hw_latency'),
+)
+
+Sample = namedtuple('Sample', 'phase network percent frames value elapsed_s instant wall_time')
+Sample.__doc__ = """One progress update
+
+value is the running FPS (or HW latency in ms for hw_latency), elapsed_s
+is derived from frames / running FPS, and instant is the FPS over the
+interval since the previous update (None for the first update of a phase
+and for latency).
+"""
+
+
+class PhaseStats:
+    """Constant-memory summary of one phase"""
+
+    def __init__(self, name, settle_tolerance=0.01):
+        self.name = name
+        self.settle_tolerance = settle_tolerance
+        self.network = None
+        self.samples = 0
+        self.frames = 0
+        self.final = None
+        self.elapsed_s = 0.0
+        self.settled_s = 0.0
+        self.instant = LatencyHistogram(lowest_ms=0.01, highest_ms=1e6)
+
+    def add(self, sample):
+        first = self.samples == 0
+        self.network = sample.network
+        self.samples += 1
+        self.frames = sample.frames
+        self.final = sample.value
+        self.elapsed_s = sample.elapsed_s
+        current = sample.instant if sample.instant is not None else sample.value
+        if sample.instant is not None:
+            self.instant.record(sample.instant)
+        # Last moment the interval value strayed outside the band around the running value
+        if first or abs(current - sample.value) > self.settle_tolerance * sample.value:
+            self.settled_s = sample.elapsed_s
+
+    def summary(self):
+        hist = self.instant
+        return {
+            'phase': self.name,
+            'network': self.network,
+            'samples': self.samples,
+            'frames': self.frames,
+            'final': self.final,
+            'elapsed_s': self.elapsed_s,
+            'settled_s': self.settled_s,
+            'interval_mean': hist.mean if hist.count else None,
+            'interval_stddev': hist.stddev if hist.count else None,
+            'interval_min': hist.min if hist.count else None,
+            'interval_max': hist.max if hist.count else None,
+            'interval_p5': hist.percentile(5) if hist.count else None,
+        }
+
+
+class HailortcliLogParser:
+    """Incremental parser; feed() text chunks of any size, get samples back
+
+    Only the current partial line and a few counters per phase are kept, so
+    memory does not grow with log length. Lines are split on both \\n and
+    \\r because the progress bar redraws with carriage returns.
+    """
+
+    def __init__(self, settle_tolerance=0.01):
+        self.settle_tolerance = settle_tolerance
+        self.phase = None
+        self.phases = {}
+        self.summary = {}
+        self._label = None
+        self._pending = ''
+        self._last = None
+        self._duration = None
+
+    def feed(self, text):
+        """Parse a chunk of text; yields Sample for each completed progress line"""
+        lines = re.split(r'[\r\n]', self._pending + text)
+        self._pending = lines.pop()
+        for line in lines:
+            sample = self._line(line)
+            if sample is not None:
+                yield sample
+
+    def close(self):
+        """Parse whatever is left in the buffer"""
+        line, self._pending = self._pending, ''
+        sample = self._line(line)
+        return [sample] if sample is not None else []
+
+    def _line(self, line):
+        line = ANSI_ESCAPE.sub('', line).strip()
+        if not line:
+            return None
+        for marker, phase in PHASES:
+            if line.startswith('Measuring') and marker in line:
+                self.phase = phase
+                self.phases[phase] = PhaseStats(phase, self.settle_tolerance)
+                self._last = None
+                self._duration = None
+                return None
+
+        match = PROGRESS.search(line)
+        if match:
+            return self._progress(match)
+
+        match = SUMMARY.match(line)
+        if match:
+            if match.group('label'):
+                self._label = match.group('label').strip().lower()
+            self.summary[f"{self._label}_{match.group('key')}"] = float(match.group('value'))
+        return None
+
+    def _progress(self, match):
+        phase = self.phase or 'unknown'
+        stats = self.phases.setdefault(phase, PhaseStats(phase, self.settle_tolerance))
+        frames = int(match.group('frames'))
+        latency = match.group('latency')
+        value = float(latency) if latency else float(match.group('fps'))
+
+        if latency:
+            # No frame rate to go by: place the sample at percent of the duration implied by the ETA
+            percent = int(match.group('percent'))
+            if self._duration is None and match.group('eta') and percent < 100:
+                eta = (int(match.group('eta')) * 3600 + int(match.group('eta_m')) * 60
+                       + int(match.group('eta_s')))
+                self._duration = eta / (1 - percent / 100)
+            elapsed, instant = (self._duration or 0.0) * percent / 100, None
+        else:
+            elapsed = frames / value if value > 0 else 0.0
+            instant = None
+            if self._last is not None and elapsed > self._last[1]:
+                instant = (frames - self._last[0]) / (elapsed - self._last[1])
+        self._last = (frames, elapsed)
+
+        sample = Sample(phase, match.group('network'), int(match.group('percent')), frames,
+                        value, elapsed, instant, time.time())
+        stats.add(sample)
+        return sample
+
+    def results(self):
+        """Per-phase summaries plus the final summary block"""
+        return {
+            'phases': {name: stats.summary() for name, stats in self.phases.items()},
+            'summary': dict(self.summary),
+        }
+
+
+def read_chunks(source, chunk_size=65536, follow=False, poll_interval=0.25, idle_timeout=None):
+    """Decoded text chunks from a path or '-' (stdin), optionally tailing a growing file"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    fd = sys.stdin.fileno() if source == '-' else os.open(source, os.O_RDONLY)
+    try:
+        idle_since = time.monotonic()
+        while True:
+            data = os.read(fd, chunk_size)
+            if data:
+                idle_since = time.monotonic()
+                yield decoder.decode(data)
+                continue
+            if not follow or source == '-':
+                break
+            if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                break
+            time.sleep(poll_interval)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    finally:
+        if source != '-':
+            os.close(fd)
+
+
+def parse_stream(chunks, parser=None):
+    """Yield samples from an iterable of text chunks; the parser holds the summaries"""
+    parser = parser or HailortcliLogParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if 'latency_hw' in parser.summary:
+            break
+    yield from parser.close()
+
+
+def parse_log(path):
+    """Parse a complete log file; returns HailortcliLogParser.results()"""
+    parser = HailortcliLogParser()
+    for _ in parse_stream(read_chunks(path), parser):
+        pass
+    return parser.results()
+
+
+def print_report(name, results):
+    """Print per-phase statistics for one parsed log"""
+    print(f"\n📄 {name}")
+    phases = results['phases']
+    if not phases:
+        print("   (no progress lines found)")
+    for p in phases.values():
+        unit = 'ms' if p['phase'] == 'hw_latency' else 'FPS'
+        line = (f"   {p['phase']:<11} {p['network'] or '?':<28} final {p['final']:>8.2f} {unit:<3} "
+                f"{p['frames']:>6} frames {p['elapsed_s']:>6.1f}s")
+        if p['interval_mean'] is not None:
+            line += (f"  interval {p['interval_mean']:.2f} ± {p['interval_stddev']:.2f} "
+                     f"[{p['interval_min']:.2f}, {p['interval_max']:.2f}]  settled {p['settled_s']:.1f}s")
+        print(line)
+    if results['summary']:
+        print("   summary: " + ', '.join(f"{k}={v:g}" for k, v in results['summary'].items()))
+
+
+def print_live(sample, width=30):
+    """One line per progress update with a bar scaled to the running value"""
+    if sample.instant is None:
+        extra = ''
+    else:
+        drift = (sample.instant - sample.value) / sample.value * 100
+        extra = f" interval {sample.instant:8.2f} ({drift:+5.1f}%)"
+    unit = 'ms' if sample.phase == 'hw_latency' else 'FPS'
+    bar = '█' * int(sample.percent / 100 * width)
+    print(f"{sample.phase:<11} {sample.elapsed_s:6.1f}s {bar:<{width}} {sample.value:8.2f} {unit}{extra}",
+          flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Parse hailortcli benchmark progress logs')
+    parser.add_argument('logs', nargs='+', help="Log files, or '-' to read stdin")
+    parser.add_argument('--live', action='store_true',
+                        help='Print every progress update as it is parsed')
+    parser.add_argument('--follow', action='store_true',
+                        help='Keep reading a growing log file until its summary appears')
+    parser.add_argument('--idle-timeout', type=float, default=60.0,
+                        help='Stop following after this many seconds without new data (default: 60)')
+    parser.add_argument('--csv', help='Write every sample as a CSV row to this path')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    csv_file = open(args.csv, 'w', newline='') if args.csv else None
+    writer = csv.writer(csv_file) if csv_file else None
+    if writer:
+        writer.writerow(('log',) + Sample._fields)
+
+    print("=" * 70)
+    print("hailortcli Benchmark Log Analysis")
+    print("=" * 70)
+    for log in args.logs:
+        parser = HailortcliLogParser()
+        chunks = read_chunks(log, follow=args.follow, idle_timeout=args.idle_timeout)
+        for sample in parse_stream(chunks, parser):
+            if args.live:
+                print_live(sample)
+            if writer:
+                writer.writerow((log,) + tuple(sample))
+        print_report('stdin' if log == '-' else log, parser.results())
+    print("=" * 70)
+    if csv_file:
+        csv_file.close()
@@ -0,0 +1,182 @@
+"""
+Fixed-memory latency histogram
+Log-bucketed (HDR-style) recorder for tail-latency statistics over arbitrarily long runs
+"""
+
+import math
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant memory
+
+    Bucket i covers [lowest * growth**i, lowest * growth**(i+1)) where
+    growth = 1 + 2 * relative_error, so any reported percentile is within
+    `relative_error` of the true sample value. Values outside
+    [lowest_ms, highest_ms] are clamped into the first/last bucket; min and
+    max are still tracked exactly. Mean and standard deviation use Welford's
+    running update; jitter is the mean absolute difference between
+    consecutive samples (frame-to-frame variation).
+    """
+
+    def __init__(self, lowest_ms=0.001, highest_ms=600000.0, relative_error=0.005):
+        if lowest_ms <= 0 or highest_ms <= lowest_ms:
+            raise ValueError("Require 0 < lowest_ms < highest_ms")
+        self.lowest_ms = lowest_ms
+        self.highest_ms = highest_ms
+        self.relative_error = relative_error
+        self._log_growth = math.log1p(2 * relative_error)
+        self._log_lowest = math.log(lowest_ms)
+        num_buckets = int(math.ceil((math.log(highest_ms) - self._log_lowest) / self._log_growth)) + 1
+        self.counts = np.zeros(num_buckets, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded samples"""
+        self.counts[:] = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._last = None
+        self._jitter_sum = 0.0
+        self.max_jitter = 0.0
+
+    def _bucket(self, value_ms):
+        if value_ms <= self.lowest_ms:
+            return 0
+        index = int((math.log(value_ms) - self._log_lowest) / self._log_growth)
+        return min(index, len(self.counts) - 1)
+
+    def record(self, value_ms):
+        """Record one latency sample in milliseconds"""
+        self.counts[self._bucket(value_ms)] += 1
+        self.count += 1
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+        delta = value_ms - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value_ms - self._mean)
+
+        if self._last is not None:
+            jitter = abs(value_ms - self._last)
+            self._jitter_sum += jitter
+            if jitter > self.max_jitter:
+                self.max_jitter = jitter
+        self._last = value_ms
+
+    def merge(self, other):
+        """Fold another histogram with identical bucket layout into this one
+
+        Jitter is not merged: consecutive-sample differences only make sense
+        within a single stream.
+        """
+        if len(other.counts) != len(self.counts) or other.lowest_ms != self.lowest_ms:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self._mean += delta * other.count / total
+        self.counts += other.counts
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        return self._mean if self.count else float('nan')
+
+    @property
+    def stddev(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def jitter(self):
+        """Mean absolute difference between consecutive samples (ms)"""
+        return self._jitter_sum / (self.count - 1) if self.count > 1 else 0.0
+
+    def _bucket_value(self, index):
+        # Geometric midpoint of the bucket
+        return math.exp(self._log_lowest + (index + 0.5) * self._log_growth)
+
+    def percentile(self, q):
+        """Value at percentile q (0-100), accurate to relative_error"""
+        if self.count == 0:
+            return float('nan')
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(max(self._bucket_value(index), self.min), self.max)
+
+    def percentiles(self, qs=(50, 90, 95, 99, 99.9)):
+        """{q: value} for several percentiles with a single cumulative pass"""
+        if self.count == 0:
+            return {q: float('nan') for q in qs}
+        cumulative = np.cumsum(self.counts)
+        result = {}
+        for q in qs:
+            rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+            index = int(np.searchsorted(cumulative, rank))
+            result[q] = min(max(self._bucket_value(index), self.min), self.max)
+        return result
+
+    def buckets(self):
+        """Non-empty buckets as (lower_ms, upper_ms, count) tuples"""
+        result = []
+        for index in np.flatnonzero(self.counts):
+            lower = math.exp(self._log_lowest + index * self._log_growth)
+            upper = math.exp(self._log_lowest + (index + 1) * self._log_growth)
+            result.append((lower, upper, int(self.counts[index])))
+        return result
+
+    def summary(self):
+        """Plain dict of the headline statistics"""
+        pct = self.percentiles()
+        return {
+            'count': self.count,
+            'mean_ms': self.mean,
+            'stddev_ms': self.stddev,
+            'min_ms': self.min if self.count else float('nan'),
+            'max_ms': self.max if self.count else float('nan'),
+            'p50_ms': pct[50],
+            'p90_ms': pct[90],
+            'p95_ms': pct[95],
+            'p99_ms': pct[99],
+            'p999_ms': pct[99.9],
+            'jitter_ms': self.jitter,
+            'max_jitter_ms': self.max_jitter,
+        }
+
+    def print_report(self):
+        """Print percentile, spread and jitter lines in the benchmark results style"""
+        s = self.summary()
+        print(f"P50 Latency:         {s['p50_ms']:.2f} ms")
+        print(f"P90 Latency:         {s['p90_ms']:.2f} ms")
+        print(f"P95 Latency:         {s['p95_ms']:.2f} ms")
+        print(f"P99 Latency:         {s['p99_ms']:.2f} ms")
+        print(f"P99.9 Latency:       {s['p999_ms']:.2f} ms")
+        print(f"Std Dev:             {s['stddev_ms']:.2f} ms")
+        print(f"Jitter (mean/max):   {s['jitter_ms']:.2f} / {s['max_jitter_ms']:.2f} ms")
+
+    def print_histogram(self, width=40, max_rows=30):
+        """Print the histogram as text bars, coarsened to at most max_rows rows"""
+        rows = self.buckets()
+        if not rows:
+            print("   (no samples)")
+            return
+        if len(rows) > max_rows:
+            # Merge runs of adjacent non-empty buckets so at most max_rows rows remain
+            group = int(math.ceil(len(rows) / max_rows))
+            rows = [(chunk[0][0], chunk[-1][1], sum(c for _, _, c in chunk))
+                    for chunk in (rows[i:i + group] for i in range(0, len(rows), group))]
+        peak = max(c for _, _, c in rows)
+        for lower, upper, count in rows:
+            bar = '█' * max(1, int(round(count / peak * width)))
+            print(f"   {lower:9.2f} - {upper:9.2f} ms | {bar} {count}")
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark regression suite
+Repeated trials of the CPU hot paths, compared against a stored per-host baseline with bootstrap confidence intervals
+
+Run from the repository root:
+    python -m src.benchmarking.regression --update-baseline    # record this host's baseline
+    python -m src.benchmarking.regression                      # exit 1 on a significant regression
+
+A missing baseline, or a case that cannot run (e.g. no model offline), also
+exits 1 unless --update-baseline or --allow-skip says otherwise.
+"""
+
+import argparse
+from datetime import datetime
+import gc
+import hashlib
+import json
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+
+from .results_store import PUBLISHED_RESULTS, host_info
+
+DEFAULT_BASELINES = PUBLISHED_RESULTS.parent / 'baselines'
+
+
+def host_fingerprint(host=None):
+    """Hash of the hardware identity
+
+    Hostname, kernel and library versions are deliberately left out, so a
+    rename, reimage or upgrade is still compared against the old baseline.
+    """
+    host = host or host_info()
+    key = '|'.join(str(host.get(k)) for k in ('machine', 'cpu', 'cpu_count'))
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def library_versions():
+    versions = {'python': sys.version.split()[0], 'numpy': np.__version__}
+    for module in ('cv2', 'onnxruntime'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return versions
+
+
+# -- cases -----------------------------------------------------------------
+# Each factory does its setup and returns a zero-argument callable to time,
+# or raises FileNotFoundError/ImportError when the case cannot run here.
+# A model that fails its checksum raises ValueError: that is never a skip.
+
+def _case_cpu_inference(model_path=None, backend='opencv', model_sha256=None):
+    from benchmark_cpu_resnet50 import resolve_resnet50
+    from src.inference.backends import load_backend
+    from src.inference.model_store import sha256_file
+    if model_path and not Path(model_path).is_file():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+    if model_path and model_sha256:
+        actual = sha256_file(model_path)
+        if actual != model_sha256:
+            raise ValueError(f"{model_path} does not match --model-sha256 "
+                             f"(expected {model_sha256}, got {actual})")
+    # Same checksum-pinned resolution as the CPU benchmark, without downloading
+    model_path = resolve_resnet50(model_path, offline=True, expected_sha256=model_sha256)
+    engine = load_backend(backend, model_path)
+    blob = np.random.default_rng(0).standard_normal((1, 3, 224, 224)).astype(np.float32)
+    return lambda: engine.infer(blob)
+
+
+def _case_preprocess(method):
+    from src.preprocessing.images import BatchBlobBuilder
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(4)]
+    builder = BatchBlobBuilder(max_batch=4, method=method)
+    return lambda: builder.build(frames)
+
+
+def _case_pose_postprocess():
+    from src.pose_estimation.benchmark_postprocess import synthetic_outputs
+    from src.pose_estimation.postprocess import YOLOv8PosePostprocessor
+    outputs = synthetic_outputs(20)
+    post = YOLOv8PosePostprocessor()
+    return lambda: post(outputs)
+
+
+def _case_seg_postprocess():
+    from src.segmentation.benchmark_postprocess import synthetic_outputs
+    from src.segmentation.postprocess import YOLOv5SegPostprocessor
+    pred, protos = synthetic_outputs(20)
+    post = YOLOv5SegPostprocessor(mask_format='dense')
+    return lambda: post(pred, protos)
+
+
+def suite_cases(model_path=None, backend='opencv', model_sha256=None):
+    """{case name: factory}"""
+    return {
+        f'cpu_inference_{backend}': lambda: _case_cpu_inference(model_path, backend, model_sha256),
+        'preprocess_numpy': lambda: _case_preprocess('numpy'),
+        'preprocess_opencv': lambda: _case_preprocess('opencv'),
+        'pose_postprocess': _case_pose_postprocess,
+        'seg_postprocess': _case_seg_postprocess,
+    }
+
+
+# -- measurement -----------------------------------------------------------
+
+def _calibrate(fn, target_s):
+    """Calls per trial so one trial takes about target_s"""
+    fn()
+    start = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - start, 1e-6)
+    return max(1, int(target_s / once))
+
+
+def _trial(fn, iterations):
+    """Mean ms per call over one trial, with the garbage collector paused like timeit"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - start) * 1000 / iterations
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def run_suite(cases, trials=10, target_s=0.2, warmup=3):
+    """{name: {'trials_ms': [...], 'iterations': n}}, trials interleaved across cases
+
+    Cases that cannot run here are left out of the result. Interleaving spreads slow drifts (thermal, background load) over every
+    case instead of biasing whichever case happens to run last.
+    """
+    prepared = {}
+    for name, factory in cases.items():
+        try:
+            fn = factory()
+        except (FileNotFoundError, ImportError) as e:
+            print(f"   ⏭️  {name}: skipped ({e})")
+            continue
+        for _ in range(warmup):
+            fn()
+        prepared[name] = (fn, _calibrate(fn, target_s))
+
+    results = {name: {'trials_ms': [], 'iterations': n} for name, (_, n) in prepared.items()}
+    for t in range(trials):
+        for name, (fn, n) in prepared.items():
+            results[name]['trials_ms'].append(_trial(fn, n))
+        print(f"   trial {t + 1}/{trials}", end='\r', flush=True)
+    print(' ' * 30, end='\r')
+    return results
+
+
+# -- statistics ------------------------------------------------------------
+
+def compare_trials(baseline, current, confidence=0.95, tolerance=0.05, resamples=10000, seed=0):
+    """Ratio of mean time (current / baseline) with a bootstrap CI and a permutation p-value
+
+    verdict is 'regression' when the whole CI lies above 1 + tolerance,
+    'improvement' when it lies below 1 - tolerance, else 'unchanged':
+    a slowdown must be both statistically clear and larger than the
+    tolerance to fail.
+    """
+    rng = np.random.default_rng(seed)
+    base = np.asarray(baseline, dtype=np.float64)
+    cur = np.asarray(current, dtype=np.float64)
+    ratio = cur.mean() / base.mean()
+
+    boot_b = base[rng.integers(0, len(base), (resamples, len(base)))].mean(axis=1)
+    boot_c = cur[rng.integers(0, len(cur), (resamples, len(cur)))].mean(axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(boot_c / boot_b, [tail, 100 - tail])
+
+    # Two-sided permutation test on the difference of means
+    pooled = np.concatenate([base, cur])
+    observed = abs(cur.mean() - base.mean())
+    perms = np.argsort(rng.random((resamples, len(pooled))), axis=1)
+    shuffled = pooled[perms]
+    diffs = np.abs(shuffled[:, len(base):].mean(axis=1) - shuffled[:, :len(base)].mean(axis=1))
+    p_value = (np.count_nonzero(diffs >= observed) + 1) / (resamples + 1)
+
+    if low > 1 + tolerance:
+        verdict = 'regression'
+    elif high < 1 - tolerance:
+        verdict = 'improvement'
+    else:
+        verdict = 'unchanged'
+    return {'ratio': float(ratio), 'ci_low': float(low), 'ci_high': float(high),
+            'p_value': float(p_value), 'verdict': verdict,
+            'baseline_ms': float(base.mean()), 'current_ms': float(cur.mean()),
+            'cv': float(cur.std(ddof=1) / cur.mean()) if len(cur) > 1 else 0.0}
+
+
+# -- baselines -------------------------------------------------------------
+
+def baseline_path(baseline_dir=DEFAULT_BASELINES, fingerprint=None):
+    return Path(baseline_dir) / f"{fingerprint or host_fingerprint()}.json"
+
+
+def load_baseline(baseline_dir=DEFAULT_BASELINES):
+    path = baseline_path(baseline_dir)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, baseline_dir=DEFAULT_BASELINES):
+    path = baseline_path(baseline_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'host': host_info(),
+                   'versions': library_versions(), 'cases': results}, f, indent=2)
+    return path
+
+
+def print_comparison(comparisons, confidence):
+    print(f"{'Case':<24} {'Base ms':>9} {'Now ms':>9} {'Ratio':>7} {int(confidence * 100)}% CI{'':>9} "
+          f"{'p':>7} {'CV':>6}  Verdict")
+    icons = {'regression': '❌', 'improvement': '🚀', 'unchanged': '✅'}
+    for name, c in comparisons.items():
+        print(f"{name:<24} {c['baseline_ms']:>9.3f} {c['current_ms']:>9.3f} {c['ratio']:>7.3f} "
+              f"[{c['ci_low']:.3f}, {c['ci_high']:.3f}] {c['p_value']:>7.4f} {c['cv'] * 100:>5.1f}%  "
+              f"{icons[c['verdict']]} {c['verdict']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Statistical benchmark regression suite')
+    parser.add_argument('--cases', nargs='+', default=None, help='Run only these cases')
+    parser.add_argument('--trials', type=int, default=10, help='Trials per case (default: 10)')
+    parser.add_argument('--trial-time', type=float, default=0.2,
+                        help='Target seconds per trial (default: 0.2)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store this run as the host's baseline instead of comparing "
+                             "(required when the host has none yet)")
+    parser.add_argument('--baseline-dir', default=str(DEFAULT_BASELINES),
+                        help='Directory of per-host baseline files')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='Slowdown that counts as material, as a fraction (default: 0.05)')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='Confidence level of the intervals (default: 0.95)')
+    parser.add_argument('--model', default=None,
+                        help='ONNX model for the CPU inference case (default: the stored ResNet50, offline)')
+    parser.add_argument('--model-sha256', default=None,
+                        help='Expected SHA-256 of the model (default: as benchmark_cpu_resnet50.py)')
+    parser.add_argument('--allow-skip', action='store_true',
+                        help='Pass even when a case cannot run here (e.g. no model offline)')
+    parser.add_argument('--backend', default='opencv', help='Backend for the CPU inference case')
+    parser.add_argument('--json', help='Write the comparison to this path')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print("=" * 70)
+    print("Benchmark Regression Suite")
+    print("=" * 70)
+    host = host_info()
+    print(f"Host:                {host['cpu']} × {host['cpu_count']} ({host_fingerprint(host)})")
+    print(f"Versions:            " + ', '.join(f"{k} {v}" for k, v in library_versions().items()))
+
+    cases = suite_cases(args.model, args.backend, args.model_sha256)
+    if args.cases:
+        unknown = set(args.cases) - set(cases)
+        if unknown:
+            raise SystemExit(f"Unknown case(s): {', '.join(sorted(unknown))}. Available: {', '.join(cases)}")
+        cases = {name: cases[name] for name in args.cases}
+    print(f"🎯 {len(cases)} case(s) × {args.trials} trials of ~{args.trial_time:g}s")
+    print()
+    try:
+        results = run_suite(cases, trials=args.trials, target_s=args.trial_time)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    skipped = [name for name in cases if name not in results]
+    if skipped and not args.allow_skip:
+        print(f"❌ Could not run: {', '.join(skipped)} (pass --allow-skip to accept)")
+        print("=" * 70)
+        raise SystemExit(1)
+
+    baseline = None if args.update_baseline else load_baseline(args.baseline_dir)
+    if baseline is None and not args.update_baseline:
+        print(f"❌ No baseline for this host in {args.baseline_dir}; "
+              f"record one with --update-baseline")
+        print("=" * 70)
+        raise SystemExit(1)
+    if args.update_baseline:
+        path = save_baseline(results, args.baseline_dir)
+        for name, r in results.items():
+            trials = np.array(r['trials_ms'])
+            print(f"   {name:<24} {trials.mean():>9.3f} ms ± {trials.std(ddof=1):.3f} ({r['iterations']} calls/trial)")
+        print()
+        print(f"💾 Baseline saved to {path}")
+        print("=" * 70)
+        raise SystemExit(0)
+
+    changed = {k: (v, library_versions().get(k)) for k, v in baseline['versions'].items()
+               if library_versions().get(k) != v}
+    print(f"Baseline:            {baseline['created']}")
+    if changed:
+        print("Changed since:       " + ', '.join(f"{k} {old} → {new}" for k, (old, new) in changed.items()))
+    print()
+
+    comparisons = {name: compare_trials(baseline['cases'][name]['trials_ms'], r['trials_ms'],
+                                        confidence=args.confidence, tolerance=args.tolerance)
+                   for name, r in results.items() if name in baseline['cases']}
+    missing = [name for name in results if name not in baseline['cases']]
+    print_comparison(comparisons, args.confidence)
+    if missing:
+        print(f"⚠️  Not in baseline (run --update-baseline): {', '.join(missing)}")
+    print()
+    regressions = [name for name, c in comparisons.items() if c['verdict'] == 'regression']
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'host': host, 'versions': library_versions(), 'comparisons': comparisons}, f, indent=2)
+    if regressions:
+        print(f"❌ Significant regression (>{args.tolerance * 100:.0f}% slower at "
+              f"{args.confidence * 100:.0f}% confidence): {', '.join(regressions)}")
+        print("=" * 70)
+        raise SystemExit(1)
+    print(f"✅ No significant regression beyond {args.tolerance * 100:.0f}%")
+    print("=" * 70)
@@ -0,0 +1,167 @@
+"""
+Append-only benchmark result store
+One JSON record per line, keyed by model, backend, device, host and timestamp
+"""
+
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import platform
+import re
+import socket
+
+# Tracked: the reference runs behind the published charts, only changed by deliberate edits
+PUBLISHED_RESULTS = Path(__file__).resolve().parents[2] / 'results' / 'benchmarks' / 'results.jsonl'
+# Untracked (gitignored): where benchmark runs are appended by default
+DEFAULT_RESULTS = PUBLISHED_RESULTS.parent / 'local' / 'results.jsonl'
+
+# Hardware the published records were measured on; baselines are only taken from it.
+# Fields as host_info() reports them, so runs on the reference board match too.
+BASELINE_HOST = {'machine': 'aarch64', 'board': 'Raspberry Pi 5 Model B'}
+
+
+def host_info():
+    """Small fingerprint of the machine a benchmark ran on"""
+    fields = {}
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        pass
+    # 'Model' is the board name on Raspberry Pi; 'model name' the CPU on x86
+    cpu = (fields.get('Model') or fields.get('model name') or fields.get('Hardware')
+           or platform.processor() or platform.machine())
+    # Board without its revision ("Raspberry Pi 5 Model B Rev 1.0" -> "Raspberry Pi 5 Model B")
+    board = re.sub(r'\s+Rev\s+\S+$', '', fields['Model']) if fields.get('Model') else None
+    return {
+        'hostname': socket.gethostname(),
+        'machine': platform.machine(),
+        'board': board,
+        'system': f"{platform.system()} {platform.release()}",
+        'cpu': cpu,
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+def make_record(model, backend, device, fps, latency_ms=None, task=None, mode='single',
+                source='measured', host=None, timestamp=None, **metrics):
+    """Build a record dict; extra keyword arguments become metrics"""
+    return {
+        'timestamp': timestamp or datetime.now().isoformat(timespec='seconds'),
+        'model': model,
+        'task': task,
+        'backend': backend,
+        'device': device,
+        'mode': mode,
+        'host': host or host_info(),
+        'fps': fps,
+        'latency_ms': latency_ms,
+        'source': source,
+        'metrics': metrics,
+    }
+
+
+class ResultStore:
+    """Append-only JSONL store of benchmark runs
+
+    Each append is a single write() of one line on a file opened with
+    O_APPEND, so concurrent benchmarks on the same machine do not
+    interleave records. Queries stream the file line by line.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS):
+        self.path = Path(path)
+
+    def append(self, record):
+        """Append one record (see make_record) and return it"""
+        missing = [k for k in ('model', 'backend', 'device', 'fps') if record.get(k) is None]
+        if missing:
+            raise ValueError(f"Result record is missing {', '.join(missing)}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, sort_keys=True, default=float) + '\n'
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
+        return record
+
+    def record(self, model, backend, device, fps, **kwargs):
+        """make_record() + append()"""
+        return self.append(make_record(model, backend, device, fps, **kwargs))
+
+    def __iter__(self):
+        if not self.path.exists():
+            return
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def query(self, model=None, backend=None, device=None, mode=None, host=None, since=None,
+              source=None):
+        """Records matching every given field
+
+        host matches the hostname, or, as a dict, every given host field
+        (e.g. BASELINE_HOST).
+        """
+        for record in self:
+            if model is not None and record.get('model') != model:
+                continue
+            if backend is not None and record.get('backend') != backend:
+                continue
+            if device is not None and record.get('device') != device:
+                continue
+            if mode is not None and record.get('mode') != mode:
+                continue
+            if source is not None and record.get('source') != source:
+                continue
+            if isinstance(host, dict):
+                if any(record.get('host', {}).get(k) != v for k, v in host.items()):
+                    continue
+            elif host is not None and record.get('host', {}).get('hostname') != host:
+                continue
+            if since is not None and record.get('timestamp', '') < since:
+                continue
+            yield record
+
+    def latest(self, **filters):
+        """Most recent record matching the filters, or None"""
+        best = None
+        for record in self.query(**filters):
+            if best is None or record['timestamp'] >= best['timestamp']:
+                best = record
+        return best
+
+    def latest_by(self, key='model', **filters):
+        """{record[key]: most recent matching record}"""
+        result = {}
+        for record in self.query(**filters):
+            current = result.get(record.get(key))
+            if current is None or record['timestamp'] >= current['timestamp']:
+                result[record.get(key)] = record
+        return result
+
+    def speedup(self, model, accelerated='hailo8l', baseline='cpu', mode='single', baseline_backend=None,
+                host=BASELINE_HOST):
+        """Accelerated FPS / baseline FPS for a model on one host, or None"""
+        fast = self.latest(model=model, device=accelerated, host=host)
+        slow = self.latest(model=model, device=baseline, mode=mode, backend=baseline_backend, host=host)
+        if not fast or not slow or not slow['fps']:
+            return None
+        return fast['fps'] / slow['fps']
+
+
+def hailo_baseline(model, path=PUBLISHED_RESULTS):
+    """Published Hailo-8L HW-only record for a model on the reference Pi 5, or None
+
+    Comparisons and frame budgets use this rather than the newest
+    hailo8l record, so local or off-target runs never replace it.
+    """
+    return ResultStore(path).latest(model=model, device='hailo8l', backend='hailort', mode='hw_only',
+                                    host=BASELINE_HOST)
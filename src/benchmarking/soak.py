@@ -0,0 +1,238 @@
+"""
+Soak benchmark monitor
+Per-window throughput and latency, time-aligned with thermal zones, cpufreq and Pi throttle flags
+"""
+
+import json
+from pathlib import Path
+import shutil
+import statistics
+import subprocess
+import time
+
+import numpy as np
+
+from .latency import LatencyHistogram
+
+THERMAL_ROOT = Path('/sys/class/thermal')
+CPU_ROOT = Path('/sys/devices/system/cpu')
+
+# `vcgencmd get_throttled` bits: 0-3 are current state, 16-19 "has occurred since boot"
+THROTTLE_BITS = {
+    0: 'under-voltage',
+    1: 'arm-freq-capped',
+    2: 'throttled',
+    3: 'soft-temp-limit',
+}
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class SystemSensors:
+    """Thermal, CPU frequency and firmware throttle readings; None where unavailable
+
+    Sensors are discovered once. On machines without /sys/class/thermal
+    zones, cpufreq or vcgencmd the corresponding readings are None and the
+    soak report marks them unavailable instead of failing.
+    """
+
+    def __init__(self, thermal_root=THERMAL_ROOT, cpu_root=CPU_ROOT, vcgencmd=None):
+        self.zones = []
+        for zone in sorted(Path(thermal_root).glob('thermal_zone*')):
+            if _read_int(zone / 'temp') is not None:
+                kind = (zone / 'type').read_text().strip() if (zone / 'type').exists() else zone.name
+                self.zones.append((kind, zone / 'temp'))
+
+        self.cpus = []
+        for cpufreq in sorted(Path(cpu_root).glob('cpu[0-9]*/cpufreq')):
+            limit = next((p for p in (cpufreq / 'cpuinfo_max_freq', cpufreq / 'scaling_max_freq')
+                          if _read_int(p) is not None), None)
+            if _read_int(cpufreq / 'scaling_cur_freq') is not None and limit is not None:
+                self.cpus.append((cpufreq / 'scaling_cur_freq', limit))
+
+        self.vcgencmd = vcgencmd or shutil.which('vcgencmd')
+
+    def available(self):
+        return {'thermal': bool(self.zones), 'cpufreq': bool(self.cpus),
+                'throttle_flags': bool(self.vcgencmd)}
+
+    def _throttled(self):
+        if not self.vcgencmd:
+            return None
+        try:
+            out = subprocess.run([self.vcgencmd, 'get_throttled'], capture_output=True,
+                                 text=True, timeout=2).stdout
+            return int(out.strip().split('=')[-1], 16)
+        except (OSError, ValueError, subprocess.SubprocessError):
+            return None
+
+    def read(self):
+        """One reading: hottest zone, highest current / maximum CPU clock, throttle bits"""
+        temps = {kind: _read_int(path) for kind, path in self.zones}
+        temps = {kind: t / 1000.0 for kind, t in temps.items() if t is not None}
+        cur = [_read_int(c) for c, _ in self.cpus]
+        top = [_read_int(m) for _, m in self.cpus]
+        cur = [c for c in cur if c is not None]
+        top = [m for m in top if m is not None]
+        return {
+            'temp_c': max(temps.values()) if temps else None,
+            'zones_c': temps,
+            # Cores share a clock on the Pi; idle cores may sit lower under ondemand
+            'freq_mhz': max(cur) / 1000.0 if cur else None,
+            'max_freq_mhz': max(top) / 1000.0 if top else None,
+            'throttled': self._throttled(),
+        }
+
+
+class SoakMonitor:
+    """Window-by-window throughput, latency and sensor log for long runs
+
+    Call record() once per completed frame. Every `window_s` seconds a
+    window is closed: FPS, latency percentiles and a sensor reading are
+    stored (and appended to `log_path` as JSON lines if given, so a run
+    killed after hours still leaves its record). Windows are flagged for
+    high temperature, a CPU clock below its maximum, firmware throttle
+    bits, and FPS below the early-run baseline.
+    """
+
+    def __init__(self, window_s=10.0, sensors=None, temp_limit_c=80.0, freq_tolerance=0.05,
+                 degradation=0.05, baseline_windows=3, log_path=None):
+        self.window_s = window_s
+        self.sensors = sensors or SystemSensors()
+        self.temp_limit_c = temp_limit_c
+        self.freq_tolerance = freq_tolerance
+        self.degradation = degradation
+        self.baseline_windows = baseline_windows
+        self.log_path = Path(log_path) if log_path else None
+        self.windows = []
+        self.total = LatencyHistogram()
+        self._window = LatencyHistogram()
+        self._start = None
+        self._window_start = None
+
+    def start(self):
+        self._start = self._window_start = time.perf_counter()
+        if self.log_path:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def record(self, latency_ms):
+        """Record one frame; closes the window when it is due. Returns the closed window or None"""
+        self._window.record(latency_ms)
+        self.total.record(latency_ms)
+        now = time.perf_counter()
+        if now - self._window_start >= self.window_s:
+            return self._close(now)
+        return None
+
+    def finish(self):
+        """Close the last partial window"""
+        if self._window.count:
+            self._close(time.perf_counter())
+        return self.summary()
+
+    @property
+    def baseline_fps(self):
+        # The first window holds warm-up; the next few define "fresh" throughput
+        early = [w['fps'] for w in self.windows[1:1 + self.baseline_windows]] or \
+                [w['fps'] for w in self.windows[:1]]
+        return statistics.median(early) if early else None
+
+    def _close(self, now):
+        hist = self._window
+        elapsed = now - self._window_start
+        sensors = self.sensors.read()
+        window = {
+            't_s': now - self._start,
+            'frames': hist.count,
+            'fps': hist.count / elapsed if elapsed > 0 else 0.0,
+            'p50_ms': hist.percentile(50),
+            'p99_ms': hist.percentile(99),
+            'max_ms': hist.max,
+            **sensors,
+        }
+        window['flags'] = self._flags(window)
+        self.windows.append(window)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(window, default=float) + '\n')
+        self._window = LatencyHistogram()
+        self._window_start = now
+        return window
+
+    def _flags(self, w):
+        flags = []
+        if w['temp_c'] is not None and w['temp_c'] >= self.temp_limit_c:
+            flags.append('hot')
+        if w['freq_mhz'] and w['max_freq_mhz'] and \
+                w['freq_mhz'] < (1 - self.freq_tolerance) * w['max_freq_mhz']:
+            flags.append('freq-capped')
+        if w['throttled']:
+            flags.extend(name for bit, name in THROTTLE_BITS.items() if w['throttled'] & (1 << bit))
+        baseline = self.baseline_fps
+        if baseline and len(self.windows) > self.baseline_windows and \
+                w['fps'] < (1 - self.degradation) * baseline:
+            flags.append('degraded')
+        return flags
+
+    def summary(self):
+        windows = self.windows
+        fps = [w['fps'] for w in windows]
+        tail = fps[-max(1, len(fps) // 4):]
+        baseline = self.baseline_fps
+        steady = statistics.median(tail) if tail else None
+        trend = None
+        if len(windows) >= 3:
+            hours = np.array([w['t_s'] for w in windows]) / 3600.0
+            trend = float(np.polyfit(hours, fps, 1)[0])
+        temps = [w['temp_c'] for w in windows if w['temp_c'] is not None]
+        freqs = [w['freq_mhz'] for w in windows if w['freq_mhz'] is not None]
+        return {
+            'duration_s': windows[-1]['t_s'] if windows else 0.0,
+            'windows': len(windows),
+            'frames': self.total.count,
+            'baseline_fps': baseline,
+            'steady_fps': steady,
+            'degradation_pct': (1 - steady / baseline) * 100 if baseline and steady else None,
+            'trend_fps_per_hour': trend,
+            'throttled_windows': sum(1 for w in windows if set(w['flags']) - {'degraded'}),
+            'degraded_windows': sum(1 for w in windows if 'degraded' in w['flags']),
+            'max_temp_c': max(temps) if temps else None,
+            'min_freq_mhz': min(freqs) if freqs else None,
+            'sensors': self.sensors.available(),
+            **{k: v for k, v in self.total.summary().items() if k in ('p50_ms', 'p99_ms', 'max_ms')},
+        }
+
+    def print_report(self):
+        """Time-aligned window table followed by the steady-state summary"""
+        def fmt(value, spec, missing='n/a'):
+            return format(value, spec) if value is not None else format(missing, spec.split('.')[0] + 's')
+
+        print(f"{'t (s)':>8} {'FPS':>8} {'p50 ms':>8} {'p99 ms':>8} {'Temp C':>7} {'MHz':>6}  Flags")
+        for w in self.windows:
+            print(f"{w['t_s']:>8.0f} {w['fps']:>8.2f} {w['p50_ms']:>8.2f} {w['p99_ms']:>8.2f} "
+                  f"{fmt(w['temp_c'], '>7.1f')} {fmt(w['freq_mhz'], '>6.0f')}  {' '.join(w['flags'])}")
+
+        s = self.summary()
+        missing = [name for name, ok in s['sensors'].items() if not ok]
+        print()
+        print(f"Duration:            {s['duration_s'] / 60:.1f} min in {s['windows']} windows")
+        print(f"Baseline FPS:        {fmt(s['baseline_fps'], '.2f')}  (windows 2-{1 + self.baseline_windows})")
+        print(f"Steady-state FPS:    {fmt(s['steady_fps'], '.2f')}  (median of last quarter)")
+        print(f"Degradation:         {fmt(s['degradation_pct'], '.1f')}%")
+        print(f"Trend:               {fmt(s['trend_fps_per_hour'], '+.2f')} FPS/hour")
+        print(f"Max temperature:     {fmt(s['max_temp_c'], '.1f')} °C")
+        print(f"Min CPU clock:       {fmt(s['min_freq_mhz'], '.0f')} MHz")
+        print(f"Throttled windows:   {s['throttled_windows']}")
+        print(f"Degraded windows:    {s['degraded_windows']}")
+        if missing:
+            print(f"⚠️  Sensors unavailable: {', '.join(missing)}")
+        if s['throttled_windows'] == 0 and s['degraded_windows'] == 0:
+            print("✅ No throttling or throughput degradation detected")
+        else:
+            print("⚠️  Throttling or degradation detected - see flagged windows")
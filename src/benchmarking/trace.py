@@ -0,0 +1,62 @@
+"""
+Chrome trace recorder
+Complete ('X') events in the Trace Event Format, viewable in chrome://tracing and ui.perfetto.dev
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+
+class ChromeTrace:
+    """Collects timed spans and writes them as a Chrome trace JSON file
+
+    Timestamps are microseconds since the trace was created, on the
+    perf_counter clock. Spans on the same tid nest by time, so per-layer
+    events placed inside an 'infer' span render as its children.
+    """
+
+    def __init__(self, process_name='benchmark'):
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+        self.events = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                        'args': {'name': process_name}}]
+
+    def now_us(self):
+        return (time.perf_counter_ns() - self._origin) / 1000.0
+
+    def complete(self, name, start_us, dur_us, cat='stage', tid=0, **args):
+        """Add one span that started at start_us and lasted dur_us"""
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': self.pid, 'tid': tid,
+                 'ts': round(start_us, 3), 'dur': round(dur_us, 3)}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+        return event
+
+    @contextmanager
+    def span(self, name, cat='stage', tid=0, **args):
+        """Time the enclosed block; yields the event dict once it is closed over"""
+        start = self.now_us()
+        span = {}
+        try:
+            yield span
+        finally:
+            span.update(self.complete(name, start, self.now_us() - start, cat=cat, tid=tid, **args))
+
+    def thread_name(self, tid, name):
+        with self._lock:
+            self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                                'args': {'name': name}})
+
+    def spans(self, cat=None):
+        return [e for e in self.events if e['ph'] == 'X' and (cat is None or e['cat'] == cat)]
+
+    def save(self, path, **metadata):
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms', 'otherData': metadata}, f)
+        return path
@@ -0,0 +1 @@
+"""Inference backends module"""
@@ -0,0 +1,161 @@
+"""
+Interchangeable CPU inference engines
+Every backend loads an ONNX model and runs an NCHW float32 blob through it,
+so benchmark loops can be pointed at any engine and produce comparable numbers
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+class InferenceBackend:
+    """Base class: load() an ONNX model once, then infer() blobs"""
+
+    name = 'base'
+
+    def __init__(self, **options):
+        self.options = options
+        self.model_path = None
+
+    def load(self, model_path):
+        """Load the model; must be called before infer()"""
+        raise NotImplementedError
+
+    def infer(self, blob):
+        """Run one forward pass and return the first output as an ndarray"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the loaded model"""
+        self.model_path = None
+
+    def describe(self):
+        """Short human-readable description including non-default options"""
+        if not self.options:
+            return self.name
+        opts = ", ".join(f"{k}={v}" for k, v in sorted(self.options.items()))
+        return f"{self.name} ({opts})"
+
+
+class OpenCVDNNBackend(InferenceBackend):
+    """OpenCV DNN module, CPU target"""
+
+    name = 'opencv'
+
+    def __init__(self, num_threads=None):
+        super().__init__(**({'num_threads': num_threads} if num_threads else {}))
+        self.num_threads = num_threads
+        self.net = None
+
+    def load(self, model_path):
+        import cv2
+        if self.num_threads:
+            cv2.setNumThreads(self.num_threads)
+        self.net = cv2.dnn.readNetFromONNX(str(model_path))
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.model_path = model_path
+        return self
+
+    def infer(self, blob):
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def close(self):
+        self.net = None
+        super().close()
+
+
+class ONNXRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPUExecutionProvider with configurable thread pools"""
+
+    name = 'onnxruntime'
+
+    def __init__(self, intra_op_threads=None, inter_op_threads=None, parallel=False, profile=False):
+        options = {}
+        if intra_op_threads:
+            options['intra_op_threads'] = intra_op_threads
+        if inter_op_threads:
+            options['inter_op_threads'] = inter_op_threads
+        if parallel:
+            options['parallel'] = True
+        if profile:
+            options['profile'] = True
+        super().__init__(**options)
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.parallel = parallel
+        self.profile = profile
+        self.session = None
+        self.input_name = None
+
+    def load(self, model_path):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime backend requires the onnxruntime package. "
+                              "Install with: pip install onnxruntime --break-system-packages")
+
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            sess_options.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads:
+            sess_options.inter_op_num_threads = self.inter_op_threads
+        sess_options.execution_mode = (ort.ExecutionMode.ORT_PARALLEL if self.parallel
+                                       else ort.ExecutionMode.ORT_SEQUENTIAL)
+        if self.profile:
+            # Per-node kernel timings, collected with end_profiling()
+            import tempfile
+            sess_options.enable_profiling = True
+            sess_options.profile_file_prefix = str(Path(tempfile.gettempdir()) / 'ort_profile')
+
+        self.session = ort.InferenceSession(str(model_path), sess_options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.model_path = model_path
+        return self
+
+    def infer(self, blob):
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(blob)})[0]
+
+    def end_profiling(self):
+        """Stop profiling and return ONNX Runtime's trace events (requires profile=True)"""
+        if not self.profile:
+            raise RuntimeError("ONNX Runtime profiling is off; create the backend with profile=True")
+        path = Path(self.session.end_profiling())
+        with open(path) as f:
+            events = json.load(f)
+        path.unlink()
+        return events
+
+    def close(self):
+        self.session = None
+        super().close()
+
+
+BACKENDS = {
+    OpenCVDNNBackend.name: OpenCVDNNBackend,
+    ONNXRuntimeBackend.name: ONNXRuntimeBackend,
+}
+
+
+def register_backend(cls):
+    """Register an InferenceBackend subclass under its `name` (usable as a decorator)"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def create_backend(name, **options):
+    """Instantiate a registered backend by name; None-valued options are dropped"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available: {', '.join(sorted(BACKENDS))}")
+    options = {k: v for k, v in options.items() if v is not None}
+    return BACKENDS[name](**options)
+
+
+def load_backend(name, model_path, **options):
+    """create_backend() followed by load()"""
+    return create_backend(name, **options).load(model_path)
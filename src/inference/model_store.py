@@ -0,0 +1,231 @@
+"""
+Content-addressed model store and warm model registry
+Models are stored by SHA-256, verified on use, versioned by name, and usable fully offline
+"""
+
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+
+from .backends import load_backend
+
+DEFAULT_STORE = Path(os.environ.get('HAILO_BENCH_MODEL_STORE',
+                                    Path.home() / '.cache' / 'hailo-bench' / 'models'))
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    """Streaming SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """Versioned model files stored under their content hash
+
+    Layout::
+
+        <root>/objects/<sha[:2]>/<sha><suffix>   immutable model blobs
+        <root>/index.json                        name -> version -> metadata
+
+    A blob is re-hashed only when its size or mtime no longer matches what
+    was recorded at the last successful verification, so warm starts do not
+    pay to re-read 100 MB models.
+    """
+
+    def __init__(self, root=DEFAULT_STORE, offline=False):
+        self.root = Path(root).expanduser()
+        self.offline = offline
+        self.objects = self.root / 'objects'
+        self.index_path = self.root / 'index.json'
+        self._lock = threading.Lock()
+
+    # -- index -------------------------------------------------------------
+
+    def _read_index(self):
+        if not self.index_path.exists():
+            return {}
+        with open(self.index_path) as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        # mkstemp creates 0600; the index must be as readable as the blobs it describes
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.index_path)
+
+    def _object_path(self, sha256, suffix):
+        return self.objects / sha256[:2] / f"{sha256}{suffix}"
+
+    def versions(self, name):
+        """Known versions of a model, oldest first"""
+        entries = self._read_index().get(name, {})
+        return sorted(entries, key=lambda v: entries[v]['added'])
+
+    def list(self):
+        """{name: {version: metadata}} for every stored model"""
+        return self._read_index()
+
+    # -- writing -----------------------------------------------------------
+
+    def add(self, path, name, version, source=None, expected_sha256=None):
+        """Copy a local model file into the store and register name/version"""
+        path = Path(path)
+        sha256 = sha256_file(path)
+        if expected_sha256 and sha256 != expected_sha256:
+            raise ValueError(f"Checksum mismatch for {path}: expected {expected_sha256}, got {sha256}")
+
+        target = self._object_path(sha256, path.suffix)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent)
+            os.close(fd)
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+
+        stat = target.stat()
+        with self._lock:
+            index = self._read_index()
+            index.setdefault(name, {})[version] = {
+                'sha256': sha256,
+                'suffix': path.suffix,
+                'size': stat.st_size,
+                'source': source or str(path),
+                'added': datetime.now().isoformat(timespec='seconds'),
+                'verified_mtime': stat.st_mtime,
+            }
+            self._write_index(index)
+        return target
+
+    def fetch(self, url, name, version, expected_sha256=None):
+        """Return the stored model, downloading it first if it is not present"""
+        try:
+            return self.resolve(name, version)
+        except FileNotFoundError:
+            if self.offline:
+                raise FileNotFoundError(f"Model {name}:{version} is not in the store at {self.root} "
+                                        f"and offline mode is enabled")
+
+        suffix = Path(url.split('?')[0]).suffix
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=suffix)
+        os.close(fd)
+        try:
+            urllib.request.urlretrieve(url, tmp)
+            return self.add(tmp, name, version, source=url, expected_sha256=expected_sha256)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # -- reading -----------------------------------------------------------
+
+    def entry(self, name, version=None):
+        """Metadata for name:version (latest version when version is None)"""
+        entries = self._read_index().get(name)
+        if not entries:
+            raise FileNotFoundError(f"Model '{name}' is not in the store at {self.root}")
+        if version is None:
+            version = max(entries, key=lambda v: entries[v]['added'])
+        if version not in entries:
+            raise FileNotFoundError(f"Model {name}:{version} is not in the store "
+                                    f"(known versions: {', '.join(sorted(entries))})")
+        return version, entries[version]
+
+    def resolve(self, name, version=None, verify=True):
+        """Path to a stored model, verifying its checksum if the file changed"""
+        version, meta = self.entry(name, version)
+        path = self._object_path(meta['sha256'], meta['suffix'])
+        if not path.exists():
+            raise FileNotFoundError(f"Blob for {name}:{version} is missing: {path}")
+        if verify:
+            stat = path.stat()
+            if stat.st_size != meta['size'] or stat.st_mtime != meta.get('verified_mtime'):
+                actual = sha256_file(path)
+                if actual != meta['sha256']:
+                    raise ValueError(f"Stored model {name}:{version} is corrupt "
+                                     f"(expected {meta['sha256']}, got {actual})")
+                with self._lock:
+                    index = self._read_index()
+                    index[name][version]['verified_mtime'] = stat.st_mtime
+                    index[name][version]['size'] = stat.st_size
+                    self._write_index(index)
+        return path
+
+
+class ModelRegistry:
+    """In-process registry of loaded backends, keyed by content hash
+
+    Repeated requests for the same model/backend/options return the already
+    loaded engine, so model switches after the first load cost a dict
+    lookup. Every request's resolve and load time is recorded.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._engines = {}
+        self._lock = threading.Lock()
+        self.events = []
+
+    @staticmethod
+    def _key(sha256, backend, options):
+        return (sha256, backend, tuple(sorted(options.items())))
+
+    def get(self, name, version=None, backend='opencv', **options):
+        """Loaded engine for name:version on backend, loading it on first use"""
+        start = time.perf_counter()
+        version, meta = self.store.entry(name, version)
+        key = self._key(meta['sha256'], backend, options)
+
+        with self._lock:
+            engine = self._engines.get(key)
+        if engine is not None:
+            self._record(name, version, backend, True, start, start, time.perf_counter())
+            return engine
+
+        path = self.store.resolve(name, version)
+        resolved = time.perf_counter()
+        engine = load_backend(backend, path, **options)
+        loaded = time.perf_counter()
+        with self._lock:
+            engine = self._engines.setdefault(key, engine)
+        self._record(name, version, backend, False, start, resolved, loaded)
+        return engine
+
+    def _record(self, name, version, backend, warm, start, resolved, loaded):
+        self.events.append({
+            'model': f"{name}:{version}",
+            'backend': backend,
+            'warm': warm,
+            'resolve_ms': (resolved - start) * 1000,
+            'load_ms': (loaded - resolved) * 1000,
+            'total_ms': (loaded - start) * 1000,
+        })
+
+    def evict(self, name, version=None):
+        """Drop every loaded engine for name:version"""
+        _, meta = self.store.entry(name, version)
+        with self._lock:
+            for key in [k for k in self._engines if k[0] == meta['sha256']]:
+                self._engines.pop(key).close()
+
+    def __len__(self):
+        return len(self._engines)
+
+    def print_report(self):
+        """Print the startup / switch timing of every registry request"""
+        print(f"{'Model':<28} {'Backend':<12} {'State':<6} {'Resolve ms':>11} {'Load ms':>9} {'Total ms':>9}")
+        for e in self.events:
+            print(f"{e['model']:<28} {e['backend']:<12} {'warm' if e['warm'] else 'cold':<6} "
+                  f"{e['resolve_ms']:>11.2f} {e['load_ms']:>9.2f} {e['total_ms']:>9.2f}")
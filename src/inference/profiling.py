@@ -0,0 +1,87 @@
+"""
+Per-layer inference profiling
+Layer timings from OpenCV DNN (getPerfProfile) and ONNX Runtime (session profiler) in one format
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+PROFILED_BACKENDS = ('opencv', 'onnxruntime')
+
+
+class LayerProfiler:
+    """Wraps a loaded backend and keeps per-layer timings of every recorded infer()
+
+    Each recorded run is a list of (layer, op_type, offset_ms, ms), with
+    offset_ms measured from the start of the forward pass. OpenCV only
+    reports durations, so its layers are laid out back to back; ONNX
+    Runtime reports real start times. ONNX Runtime timings arrive when
+    profiling ends, so call finish() before reading `runs`.
+    """
+
+    def __init__(self, engine):
+        if engine.name not in PROFILED_BACKENDS:
+            raise ValueError(f"No layer profiler for backend '{engine.name}'. "
+                             f"Available: {', '.join(PROFILED_BACKENDS)}")
+        if engine.name == 'onnxruntime' and not engine.profile:
+            raise ValueError("Create the onnxruntime backend with profile=True to profile layers")
+        self.engine = engine
+        self.runs = []
+        self._recorded = []
+        if engine.name == 'opencv':
+            import cv2
+            net = engine.net
+            self._layers = [(name, net.getLayer(name).type) for name in net.getLayerNames()]
+            self._tick_ms = 1000.0 / cv2.getTickFrequency()
+
+    def infer(self, blob, record=True):
+        """engine.infer(), keeping the layer timings unless record=False (warmup)"""
+        output = self.engine.infer(blob)
+        self._recorded.append(record)
+        if record and self.engine.name == 'opencv':
+            self.runs.append(self._opencv_layers())
+        return output
+
+    def _opencv_layers(self):
+        _, ticks = self.engine.net.getPerfProfile()
+        ms = np.asarray(ticks, dtype=np.float64).reshape(-1) * self._tick_ms
+        offsets = np.cumsum(ms) - ms
+        # Layers fused into their neighbour report zero ticks
+        return [(name, op, float(off), float(t))
+                for (name, op), off, t in zip(self._layers, offsets, ms) if t > 0]
+
+    def finish(self):
+        """Collect outstanding timings (ONNX Runtime); returns `runs`"""
+        if self.engine.name != 'onnxruntime' or not self._recorded:
+            return self.runs
+        events = sorted(self.engine.end_profiling(), key=lambda e: e.get('ts', 0))
+        model_runs = [e for e in events if e.get('name') == 'model_run']
+        nodes = [e for e in events if e.get('cat') == 'Node']
+        for run, record in zip(model_runs, self._recorded):
+            if not record:
+                continue
+            start, end = run['ts'], run['ts'] + run['dur']
+            self.runs.append([(e['name'].replace('_kernel_time', ''), e.get('args', {}).get('op_name', '?'),
+                               (e['ts'] - start) / 1000.0, e['dur'] / 1000.0)
+                              for e in nodes if start <= e['ts'] <= end])
+        self._recorded = []
+        return self.runs
+
+    def summary(self):
+        """(per-layer rows, per-op rows), each sorted by mean ms descending"""
+        runs = max(len(self.runs), 1)
+        layers = defaultdict(float)
+        ops = defaultdict(lambda: [0.0, set()])
+        for run in self.runs:
+            for name, op, _, ms in run:
+                layers[(name, op)] += ms
+                ops[op][0] += ms
+                ops[op][1].add(name)
+        total = sum(layers.values()) or 1.0
+        layer_rows = [{'layer': name, 'op': op, 'mean_ms': ms / runs, 'share': ms / total}
+                      for (name, op), ms in layers.items()]
+        op_rows = [{'op': op, 'layers': len(names), 'mean_ms': ms / runs, 'share': ms / total}
+                   for op, (ms, names) in ops.items()]
+        return (sorted(layer_rows, key=lambda r: -r['mean_ms']),
+                sorted(op_rows, key=lambda r: -r['mean_ms']))
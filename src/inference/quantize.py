@@ -0,0 +1,113 @@
+"""
+Static INT8 quantization of ONNX models
+Activation ranges are calibrated on a small local image set with ONNX Runtime; results are cached in the model store
+"""
+
+import hashlib
+from pathlib import Path
+import tempfile
+
+import numpy as np
+
+from .model_store import sha256_file
+
+CALIBRATION_METHODS = ('minmax', 'entropy', 'percentile')
+
+
+def calibration_blobs(image_dir=None, count=32, size=224, seed=0, skip=0):
+    """Preprocessed (1, 3, size, size) float32 blobs from image_dir, or synthetic ones
+
+    Uses the same resize/crop/normalization as the benchmarks. Synthetic
+    blobs only exercise the pipeline: ranges calibrated on noise do not
+    represent real images, so pass a directory of representative frames.
+    `skip` leaves out the first images in sorted order, so one directory
+    can give disjoint calibration and evaluation sets.
+    """
+    from src.preprocessing.images import BatchBlobBuilder, list_images
+    import cv2
+
+    builder = BatchBlobBuilder(max_batch=1, size=size)
+    if image_dir:
+        paths = list_images(image_dir)[skip:skip + count]
+        if not paths:
+            raise FileNotFoundError(f"No images found in {image_dir} after skipping the first {skip}")
+        images = [cv2.imread(str(p)) for p in paths]
+    else:
+        rng = np.random.default_rng(seed)
+        images = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(count)]
+    return [builder.build([image]).copy() for image in images if image is not None]
+
+
+def calibration_digest(blobs, method, per_channel):
+    """Short hash identifying a calibration set and recipe"""
+    digest = hashlib.sha256(f"{method}:{per_channel}".encode())
+    for blob in blobs:
+        digest.update(blob.tobytes())
+    return digest.hexdigest()[:12]
+
+
+def quantize_int8(model_path, output_path, blobs, method='minmax', per_channel=True):
+    """Write a static INT8 (QDQ, u8 activations / s8 weights) copy of an ONNX model"""
+    try:
+        from onnx.checker import ValidationError
+        from onnx.shape_inference import InferenceError
+        from onnxruntime.capi.onnxruntime_pybind11_state import Fail, InvalidGraph
+        from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat,
+                                              QuantType, quantize_static)
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+    except ImportError:
+        raise ImportError("INT8 quantization requires onnxruntime and onnx. "
+                          "Install with: pip install onnxruntime onnx --break-system-packages")
+    if method not in CALIBRATION_METHODS:
+        raise ValueError(f"Unknown calibration method '{method}'")
+
+    import onnxruntime as ort
+
+    class BlobReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self._feeds = iter({input_name: blob} for blob in blobs)
+
+        def get_next(self):
+            return next(self._feeds, None)
+
+    input_name = ort.InferenceSession(str(model_path), providers=['CPUExecutionProvider']) \
+        .get_inputs()[0].name
+    with tempfile.TemporaryDirectory() as tmp:
+        # Shape inference and graph cleanup first, as ONNX Runtime recommends
+        prepared = Path(tmp) / 'prepared.onnx'
+        try:
+            try:
+                quant_pre_process(str(model_path), str(prepared))
+            except ImportError:
+                # Symbolic shape inference needs sympy; CNN shapes are static without it
+                quant_pre_process(str(model_path), str(prepared), skip_symbolic_shape=True)
+        except (InferenceError, ValidationError, Fail, InvalidGraph, ValueError, RuntimeError) as e:
+            print(f"⚠️  Quantization preprocessing skipped ({type(e).__name__}: {e}); "
+                  f"quantizing the original graph")
+            prepared = Path(model_path)
+        quantize_static(str(prepared), str(output_path), BlobReader(input_name),
+                        quant_format=QuantFormat.QDQ, per_channel=per_channel,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                        calibrate_method={'minmax': CalibrationMethod.MinMax,
+                                          'entropy': CalibrationMethod.Entropy,
+                                          'percentile': CalibrationMethod.Percentile}[method])
+    return Path(output_path)
+
+
+def quantized_model(store, model_path, name, version, blobs, method='minmax', per_channel=True):
+    """(path, built) of the INT8 model for name:version and this calibration, quantizing on first use
+
+    The result is stored as <name>-int8 with a version naming the source
+    version, a prefix of the source model's SHA-256, the calibration method
+    and the calibration-set hash, so later runs (including offline ones)
+    reuse it, and a different FP32 file under the same name never does.
+    """
+    source = sha256_file(model_path)[:12]
+    int8_version = f"{version}-{source}-{method}-{calibration_digest(blobs, method, per_channel)}"
+    try:
+        return store.resolve(f"{name}-int8", int8_version), False
+    except FileNotFoundError:
+        pass
+    with tempfile.TemporaryDirectory() as tmp:
+        output = quantize_int8(model_path, Path(tmp) / f"{name}-int8.onnx", blobs, method, per_channel)
+        return store.add(output, f"{name}-int8", int8_version, source=f"quantized from {model_path}"), True
@@ -0,0 +1 @@
+"""Pipeline runtime module"""
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead benchmark
+Per-operation cost of the live metrics layer, and per-frame cost inside a running pipeline
+
+Run from the repository root:
+    python -m src.pipeline.benchmark_metrics --threads 1 4 --frames 3000
+"""
+
+import argparse
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from src.pipeline.metrics import MetricsRegistry, MetricsServer
+from src.pipeline.runner import PipelineRunner, Stage
+
+FRAME_BUDGET_US = 1e6 / 60
+
+
+def _ns_per_op(op, threads, ops=200000):
+    """Mean wall ns per call with `threads` threads calling op concurrently"""
+    barrier = threading.Barrier(threads + 1)
+    per_thread = ops // threads
+
+    def worker():
+        barrier.wait()
+        for _ in range(per_thread):
+            op()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for w in workers:
+        w.join()
+    return (time.perf_counter_ns() - start) / (per_thread * threads)
+
+
+def _loop_ns(ops=200000):
+    start = time.perf_counter_ns()
+    for _ in range(ops):
+        pass
+    return (time.perf_counter_ns() - start) / ops
+
+
+def _pipeline_run(frames, work_ms, registry=None, scrape_hz=0.0):
+    """CPU µs per frame of a 3-stage pipeline with fixed busy work, optionally instrumented"""
+    rng = np.random.default_rng(0)
+    payload = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    def busy(x):
+        end = time.perf_counter() + work_ms / 1000
+        while time.perf_counter() < end:
+            pass
+        return x
+
+    stages = [Stage('preprocess', busy), Stage('infer', busy), Stage('postprocess', busy)]
+    runner = PipelineRunner((payload for _ in range(frames)), stages, queue_size=4, policy='block',
+                            metrics=registry)
+    server, scraper, stop = None, None, threading.Event()
+    scrapes = [0]
+    if registry is not None and scrape_hz:
+        server = MetricsServer(registry, port=0).start()
+
+        def scrape():
+            while not stop.wait(1.0 / scrape_hz):
+                urllib.request.urlopen(server.url).read()
+                scrapes[0] += 1
+
+        scraper = threading.Thread(target=scrape, daemon=True)
+        scraper.start()
+    cpu_start = time.process_time()
+    runner.run()
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    if scraper is not None:
+        scraper.join()
+        server.stop()
+    return cpu * 1e6 / runner.completed, scrapes[0]
+
+
+def benchmark_metrics(thread_counts=(1, 4), frames=3000, work_ms=0.2, repeats=5, scrape_hz=5.0):
+    print("=" * 70)
+    print("Metrics Overhead Benchmark")
+    print("=" * 70)
+    print()
+
+    registry = MetricsRegistry()
+    counter = registry.counter('frames_in_total', 'Frames', ('pipeline',)).labels(pipeline='p')
+    gauge = registry.gauge('queue_depth', 'Depth', ('pipeline', 'stage')).labels(pipeline='p', stage='s')
+    hist = registry.histogram('stage_latency_seconds', 'Latency', ('pipeline', 'stage')) \
+        .labels(pipeline='p', stage='s')
+    family = registry.counter('lookups_total', 'Lookups', ('pipeline', 'stage'))
+    loop = _loop_ns()
+
+    ops = {
+        'counter.inc()': counter.inc,
+        'gauge.set(3)': lambda: gauge.set(3),
+        'histogram.observe(0.004)': lambda: hist.observe(0.004),
+        'labels(...) lookup': lambda: family.labels(pipeline='p', stage='s'),
+        'time.perf_counter()': time.perf_counter,
+    }
+    print(f"🎯 ns per call (loop overhead of {loop:.0f} ns subtracted)")
+    print(f"{'Operation':<28}" + ''.join(f" {f'{t} thr':>9}" for t in thread_counts))
+    cost = {}
+    for name, op in ops.items():
+        row = [max(_ns_per_op(op, t) - loop, 0.0) for t in thread_counts]
+        cost[name] = row[0]
+        print(f"{name:<28}" + ''.join(f" {ns:>9.0f}" for ns in row))
+    print()
+
+    # What instrument_pipeline adds per frame for a 3-stage pipeline: 3 stage + 1 end-to-end observe
+    per_frame_ns = 4 * cost['histogram.observe(0.004)']
+    start = time.perf_counter()
+    for _ in range(100):
+        text = registry.render()
+    render_us = (time.perf_counter() - start) * 1e4
+    print(f"Per frame (4 observes):  {per_frame_ns / 1000:.2f} µs = "
+          f"{per_frame_ns / 1000 / FRAME_BUDGET_US * 100:.4f}% of a 60 FPS frame budget")
+    print(f"Scrape render:           {render_us:.0f} µs for {len(text.splitlines())} lines")
+    print()
+
+    print(f"🎯 3-stage pipeline, {frames} frames × {work_ms:g} ms busy work per stage, "
+          f"best of {repeats}, scraped at {scrape_hz:g} Hz when instrumented")
+    plain, instrumented, scrapes = [], [], 0
+    for _ in range(repeats):
+        plain.append(_pipeline_run(frames, work_ms)[0])
+        us, n = _pipeline_run(frames, work_ms, MetricsRegistry(), scrape_hz)
+        instrumented.append(us)
+        scrapes += n
+    base, inst = min(plain), min(instrumented)
+    print(f"CPU per frame, plain:        {base:8.1f} µs")
+    print(f"CPU per frame, instrumented: {inst:8.1f} µs  ({scrapes} scrapes served)")
+    print(f"Overhead:                    {inst - base:+8.1f} µs per frame "
+          f"({(inst - base) / FRAME_BUDGET_US * 100:+.3f}% of a 60 FPS frame budget)")
+    print("=" * 70)
+    return {'ns_per_op': cost, 'per_frame_us': per_frame_ns / 1000, 'render_us': render_us,
+            'pipeline_overhead_us': inst - base}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Live metrics overhead benchmark')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4],
+                        help='Concurrent writer threads for the per-op table (default: 1 4)')
+    parser.add_argument('--frames', type=int, default=3000,
+                        help='Frames per pipeline run (default: 3000)')
+    parser.add_argument('--work-ms', type=float, default=0.2,
+                        help='Busy work per stage per frame (default: 0.2)')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='Pipeline runs per variant; the fastest is reported (default: 5)')
+    parser.add_argument('--scrape-hz', type=float, default=5.0,
+                        help='Scrape rate during instrumented runs (default: 5)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    benchmark_metrics(thread_counts=args.threads, frames=args.frames, work_ms=args.work_ms,
+                      repeats=args.repeats, scrape_hz=args.scrape_hz)
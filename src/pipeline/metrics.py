@@ -0,0 +1,306 @@
+"""
+Live pipeline metrics
+Counters, gauges and histograms with per-thread shards, served in Prometheus text format over HTTP
+"""
+
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import threading
+
+# Seconds, spanning sub-millisecond postprocessing to a stalled ~150 ms CPU inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.0167, 0.025, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class _Shards:
+    """One mutable cell per writing thread, summed at scrape time
+
+    Each thread only ever writes its own cell, so the hot path takes no
+    lock and threads never contend; the lock is only taken the first time
+    a thread writes. Readers copy the cell list, which is atomic under the
+    GIL, and may miss an increment still in flight.
+    """
+
+    def __init__(self, make_cell):
+        self._make_cell = make_cell
+        self._local = threading.local()
+        self._cells = []
+        self._lock = threading.Lock()
+
+    def cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._make_cell()
+            with self._lock:
+                self._cells.append(cell)
+            return cell
+
+    def cells(self):
+        return list(self._cells)
+
+
+class _Value:
+    """Counter or gauge child: sharded increments, a set() value, or a scrape-time callback"""
+
+    def __init__(self):
+        self._shards = _Shards(lambda: [0.0])
+        self._base = 0.0
+        self._fn = None
+
+    def inc(self, amount=1.0):
+        self._shards.cell()[0] += amount
+
+    def set_function(self, fn):
+        """Read the value from fn() at scrape time (no per-frame cost)"""
+        self._fn = fn
+        return self
+
+    def get(self):
+        if self._fn is not None:
+            return float(self._fn())
+        return self._base + sum(cell[0] for cell in self._shards.cells())
+
+
+class _GaugeValue(_Value):
+
+    def set(self, value):
+        # Folding the shards into the base keeps set() followed by inc() consistent
+        for cell in self._shards.cells():
+            cell[0] = 0.0
+        self._base = float(value)
+
+    def dec(self, amount=1.0):
+        self._shards.cell()[0] -= amount
+
+
+class _HistogramValue:
+    """Fixed-bucket histogram child; observe() is a bisect and two adds on the thread's own cell"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        n = len(buckets) + 1
+        self._shards = _Shards(lambda: [[0] * n, 0.0])
+
+    def observe(self, value):
+        cell = self._shards.cell()
+        cell[0][bisect_left(self.buckets, value)] += 1
+        cell[1] += value
+
+    def get(self):
+        """(per-bucket counts incl. +Inf, sum)"""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for bucket_counts, bucket_sum in self._shards.cells():
+            for i, c in enumerate(bucket_counts):
+                counts[i] += c
+            total += bucket_sum
+        return counts, total
+
+
+class Metric:
+    """A named metric family; labels(**values) returns the child to update
+
+    Look children up once and keep them: labels() is a dict lookup plus
+    tuple build, which is cheap but not free on a per-frame path.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=(), **options):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._options = options
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **values):
+        key = tuple(str(values[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def __getattr__(self, attr):
+        # Unlabelled metrics forward inc/set/observe to their single child
+        if attr.startswith('_') or self.labelnames:
+            raise AttributeError(attr)
+        return getattr(self.labels(), attr)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (v.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+    def samples(self):
+        """[(suffix, label text, value)] for the exposition format"""
+        return [('', self._label_text(key), child.get()) for key, child in list(self._children.items())]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeValue()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def _new_child(self):
+        return _HistogramValue(tuple(self._options.get('buckets') or DEFAULT_BUCKETS))
+
+    def samples(self):
+        result = []
+        for key, child in list(self._children.items()):
+            counts, total = child.get()
+            cumulative = 0
+            for upper, count in zip(child.buckets + (math.inf,), counts):
+                cumulative += count
+                le = '+Inf' if upper == math.inf else repr(float(upper))
+                result.append(('_bucket', self._label_text(key, [('le', le)]), cumulative))
+            result.append(('_sum', self._label_text(key), total))
+            result.append(('_count', self._label_text(key), cumulative))
+        return result
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if value != value:
+        return 'NaN'
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Set of metric families rendered together for one scrape"""
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, help_text, labelnames, **options):
+        name = self.prefix + name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric '{name}' already registered with a different type or labels")
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=None):
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Serve registry.render() at http://host:port/metrics from a daemon thread
+
+    Binds to localhost by default; pass host='0.0.0.0' to let a Prometheus
+    server on another machine scrape the node. port=0 picks a free port.
+    """
+
+    def __init__(self, registry, host='127.0.0.1', port=9400):
+        self.registry = registry
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def instrument_pipeline(runner, registry, pipeline='pipeline'):
+    """Export a PipelineRunner's frames, drops, queue depth and per-stage latency
+
+    Totals and queue depth are read from the runner at scrape time, so
+    the only per-frame cost is one histogram observe() per stage plus one
+    for end-to-end latency. Call before runner.run().
+    """
+    frames_in = registry.counter('frames_in_total', 'Frames captured from the source', ('pipeline',))
+    frames_out = registry.counter('frames_completed_total', 'Frames that left the last stage', ('pipeline',))
+    dropped = registry.counter('frames_dropped_total', 'Frames discarded by a full drop-oldest queue',
+                               ('pipeline', 'stage'))
+    depth = registry.gauge('queue_depth', 'Frames waiting in the queue in front of a stage',
+                           ('pipeline', 'stage'))
+    processed = registry.counter('stage_processed_total', 'Frames processed by a stage', ('pipeline', 'stage'))
+    latency = registry.histogram('stage_latency_seconds', 'Per-frame service time of a stage',
+                                 ('pipeline', 'stage'))
+    e2e = registry.histogram('frame_latency_seconds', 'Capture to pipeline exit latency', ('pipeline',))
+
+    frames_in.labels(pipeline=pipeline).set_function(lambda: runner.captured)
+    frames_out.labels(pipeline=pipeline).set_function(lambda: runner.completed)
+    observers = []
+    for stage, q in zip(runner.stages, runner.queues):
+        dropped.labels(pipeline=pipeline, stage=stage.name).set_function(lambda q=q: q.dropped)
+        depth.labels(pipeline=pipeline, stage=stage.name).set_function(lambda q=q: len(q))
+        processed.labels(pipeline=pipeline, stage=stage.name).set_function(lambda s=stage: s.processed)
+        observers.append(latency.labels(pipeline=pipeline, stage=stage.name).observe)
+    runner.observe_stage = observers
+    runner.observe_end_to_end = e2e.labels(pipeline=pipeline).observe
+    return registry
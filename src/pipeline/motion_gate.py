@@ -0,0 +1,115 @@
+"""
+Motion-gated inference
+Skips the model on static scenes using a cheap downscaled block-difference score
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide per frame whether the scene changed enough to run inference
+
+    Frames are reduced to a grayscale thumbnail `scale` times smaller
+    (INTER_AREA, fast at integer factors) and compared with the thumbnail
+    of the last frame that was inferred, so slow drift accumulates until
+    it triggers. The score is the fraction of block x block thumbnail
+    cells whose mean absolute difference exceeds pixel_delta grey levels.
+    Inference runs when score >= threshold, or after max_skip consecutive
+    skipped frames.
+    """
+
+    def __init__(self, threshold=0.02, scale=8, block=4, pixel_delta=12, max_skip=30):
+        self.threshold = threshold
+        self.scale = scale
+        self.block = block
+        self.pixel_delta = pixel_delta
+        self.max_skip = max_skip
+        self.reference = None
+        self.skipped = 0
+        self.last_score = 1.0
+        self._diff = None
+
+    def thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        h, w = gray.shape
+        tw, th = w // self.scale, h // self.scale
+        tw, th = tw - tw % self.block, th - th % self.block
+        return cv2.resize(gray, (tw, th), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def score(self, thumb):
+        """Fraction of blocks that changed against the reference thumbnail"""
+        if self._diff is None or self._diff.shape != thumb.shape:
+            self._diff = np.empty_like(thumb)
+        diff = self._diff
+        np.subtract(thumb, self.reference, out=diff)
+        np.abs(diff, out=diff)
+        b = self.block
+        h, w = diff.shape
+        blocks = diff.reshape(h // b, b, w // b, b).mean(axis=(1, 3))
+        return float(np.count_nonzero(blocks > self.pixel_delta)) / blocks.size
+
+    def __call__(self, frame):
+        """True if this frame should be inferred"""
+        thumb = self.thumbnail(frame)
+        if self.reference is None:
+            self.last_score = 1.0
+        else:
+            self.last_score = self.score(thumb)
+            if self.last_score < self.threshold and self.skipped < self.max_skip:
+                self.skipped += 1
+                return False
+        self.reference = thumb
+        self.skipped = 0
+        return True
+
+    def reset(self):
+        self.reference = None
+        self.skipped = 0
+
+
+def linear_extrapolate(previous, latest, frames_since, frames_between):
+    """Continue the motion between two inferred numeric results (boxes, keypoints)"""
+    if previous is None or frames_between <= 0:
+        return latest
+    latest = np.asarray(latest, dtype=np.float32)
+    step = (latest - np.asarray(previous, dtype=np.float32)) / frames_between
+    return latest + step * frames_since
+
+
+class GatedInference:
+    """Wrap infer(frame) -> result with a MotionGate
+
+    Skipped frames return the last result, or, with extrapolate set (e.g.
+    linear_extrapolate for fixed-shape keypoint arrays), a prediction
+    from the last two inferred results. Calls return (result, inferred).
+    """
+
+    def __init__(self, infer, gate=None, extrapolate=None):
+        self.infer = infer
+        self.gate = gate or MotionGate()
+        self.extrapolate = extrapolate
+        self.frames = 0
+        self.inferred = 0
+        self._last = None
+        self._previous = None
+        self._last_index = 0
+        self._gap = 0
+
+    def __call__(self, frame):
+        index = self.frames
+        self.frames += 1
+        if self.gate(frame) or self._last is None:
+            result = self.infer(frame)
+            self.inferred += 1
+            self._previous, self._last = self._last, result
+            self._gap, self._last_index = index - self._last_index, index
+            return result, True
+        if self.extrapolate is None:
+            return self._last, False
+        return self.extrapolate(self._previous, self._last, index - self._last_index, self._gap), False
+
+    @property
+    def saved(self):
+        """Fraction of frames that skipped inference"""
+        return 1.0 - self.inferred / self.frames if self.frames else 0.0
@@ -0,0 +1,335 @@
+"""
+Multi-stream scheduler
+Multiplexes many camera-like sources onto one shared inference backend, with cross-stream batching
+"""
+
+from itertools import cycle
+from pathlib import Path
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from src.benchmarking.latency import LatencyHistogram
+from .runner import BoundedQueue, Item
+
+VIDEO_SUFFIXES = {'.mp4', '.avi', '.mkv', '.mov', '.h264', '.webm'}
+
+
+def _video_frames(path):
+    cap = cv2.VideoCapture(str(path))
+    try:
+        ok, frame = cap.read()
+        if not ok:
+            raise ValueError(f"Cannot decode any frame from {path}")
+        while True:
+            yield frame
+            ok, frame = cap.read()
+            if not ok:
+                # Loop the clip like a camera that never stops
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = cap.read()
+                if not ok:
+                    return
+    finally:
+        cap.release()
+
+
+def open_source(spec, size=(640, 480), seed=0):
+    """(endless frame iterator, native FPS or None) for a video file, image directory or 'synthetic'"""
+    if spec == 'synthetic':
+        rng = np.random.default_rng(seed)
+        frames = [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(4)]
+        return cycle(frames), None
+
+    path = Path(spec).expanduser()
+    if path.is_dir():
+        from src.preprocessing.images import list_images
+        frames = [cv2.imread(str(p)) for p in list_images(path)]
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            raise ValueError(f"No readable images in {path}")
+        return cycle(frames), None
+    if path.suffix.lower() in VIDEO_SUFFIXES and path.exists():
+        cap = cv2.VideoCapture(str(path))
+        fps = cap.get(cv2.CAP_PROP_FPS) or None
+        cap.release()
+        return _video_frames(path), fps
+    raise ValueError(f"Unknown stream source '{spec}' (video file, image directory or 'synthetic')")
+
+
+class Stream:
+    """One camera: a paced frame source feeding a small drop-oldest queue
+
+    deadline_ms is the end-to-end budget of a frame (one frame interval by
+    default). phase delays the first capture so unsynchronised cameras can
+    be modelled.
+    """
+
+    def __init__(self, name, frames, fps=30.0, weight=1.0, queue_size=2, deadline_ms=None,
+                 phase=0.0):
+        self.name = name
+        self.frames = frames
+        self.fps = fps
+        self.weight = weight
+        self.deadline_ms = deadline_ms if deadline_ms is not None else 1000.0 / fps
+        self.phase = phase
+        self.queue = BoundedQueue(queue_size, 'drop_oldest')
+        self.latency = LatencyHistogram()
+        self.captured = 0
+        self.completed = 0
+        self.late = 0
+
+    def deadline(self, item):
+        return item.captured_at + self.deadline_ms / 1000.0
+
+    def record(self, latency_ms):
+        self.latency.record(latency_ms)
+        self.completed += 1
+        if latency_ms > self.deadline_ms:
+            self.late += 1
+
+
+class RoundRobinPolicy:
+    """Serve ready streams in turn, starting after the last one served"""
+
+    name = 'round_robin'
+
+    def __init__(self):
+        self._next = 0
+
+    def select(self, ready, now, count, service_ms):
+        n = len(ready)
+        start = next((i for i, s in enumerate(ready) if s.index >= self._next), 0)
+        picked = [ready[(start + i) % n] for i in range(min(count, n))]
+        self._next = picked[-1].index + 1
+        return picked
+
+
+class WeightedPolicy:
+    """Smooth weighted round robin: stream i gets weight_i / sum(weights) of the slots"""
+
+    name = 'weighted'
+
+    def __init__(self):
+        self._credit = {}
+
+    def select(self, ready, now, count, service_ms):
+        total = sum(s.weight for s in ready)
+        picked = []
+        for _ in range(min(count, len(ready))):
+            candidates = [s for s in ready if s not in picked]
+            for s in candidates:
+                self._credit[s.index] = self._credit.get(s.index, 0.0) + s.weight
+            best = max(candidates, key=lambda s: self._credit[s.index])
+            self._credit[best.index] -= total
+            picked.append(best)
+        return picked
+
+
+class DeadlinePolicy:
+    """Earliest deadline first over the oldest queued frame of each stream
+
+    Frames that can no longer meet their deadline, given the current
+    service-time estimate, go after those that still can, so one overloaded
+    moment does not make every following frame late as well.
+    """
+
+    name = 'deadline'
+
+    def select(self, ready, now, count, service_ms):
+        finish = now + service_ms / 1000.0
+
+        def key(stream):
+            item = stream.queue.peek()
+            deadline = stream.deadline(item) if item is not None else float('inf')
+            return (deadline < finish, deadline)
+
+        return sorted(ready, key=key)[:count]
+
+
+POLICIES = {p.name: p for p in (RoundRobinPolicy, WeightedPolicy, DeadlinePolicy)}
+
+
+def jain_index(values):
+    """Jain's fairness index: 1.0 when all values are equal, 1/n when one stream gets everything"""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values) or not values.any():
+        return 0.0
+    return float(values.sum() ** 2 / (len(values) * (values ** 2).sum()))
+
+
+class MultiStreamScheduler:
+    """Feed many streams through one batched inference function
+
+    Every stream captures on its own thread at its own FPS into a
+    drop-oldest queue. A single scheduler thread owns the backend: it asks
+    the policy for up to max_batch ready streams, takes the oldest frame of
+    each and runs them as one batch. With batch_window_ms > 0 it waits up
+    to that long after the oldest pending frame for other streams' frames
+    to line up before dispatching a partial batch.
+
+    infer_batch(list of frames) -> list of per-frame results. sink, if
+    given, is called as sink(stream, item, result).
+    """
+
+    def __init__(self, streams, infer_batch, policy='round_robin', max_batch=1,
+                 batch_window_ms=0.0, sink=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}'")
+        self.streams = list(streams)
+        for index, stream in enumerate(self.streams):
+            stream.index = index
+        self.infer_batch = infer_batch
+        self.policy = POLICIES[policy]()
+        self.max_batch = max_batch
+        self.batch_window_ms = batch_window_ms
+        self.sink = sink
+        self.batch_sizes = {}
+        self.service = LatencyHistogram()
+        self.busy_s = 0.0
+        self.elapsed = 0.0
+        self._service_ms = 0.0
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._capturing = 0
+        self._lock = threading.Lock()
+
+    def _capture(self, stream):
+        interval = 1.0 / stream.fps
+        next_tick = time.perf_counter() + stream.phase
+        try:
+            for seq, frame in enumerate(stream.frames):
+                delay = next_tick - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                if self._stop.is_set():
+                    break
+                next_tick += interval
+                stream.queue.put(Item(seq, time.perf_counter(), frame))
+                stream.captured += 1
+                self._wakeup.set()
+        finally:
+            with self._lock:
+                self._capturing -= 1
+            self._wakeup.set()
+
+    def _dispatch(self, picked):
+        items = [(stream, stream.queue.get_nowait()) for stream in picked]
+        items = [(stream, item) for stream, item in items if item is not None]
+        if not items:
+            return
+        start = time.perf_counter()
+        results = self.infer_batch([item.payload for _, item in items])
+        done = time.perf_counter()
+        service_ms = (done - start) * 1000
+        self.busy_s += done - start
+        self.service.record(service_ms)
+        # Per-batch-size estimate drifts with load; a running average is enough for EDF
+        self._service_ms = service_ms if not self._service_ms else 0.8 * self._service_ms + 0.2 * service_ms
+        self.batch_sizes[len(items)] = self.batch_sizes.get(len(items), 0) + 1
+        for (stream, item), result in zip(items, results):
+            stream.record((done - item.captured_at) * 1000)
+            if self.sink is not None:
+                self.sink(stream, item, result)
+
+    def _schedule(self):
+        window = self.batch_window_ms / 1000.0
+        want = min(self.max_batch, len(self.streams))
+        while True:
+            self._wakeup.clear()
+            ready = [s for s in self.streams if len(s.queue)]
+            if not ready:
+                with self._lock:
+                    if self._capturing == 0:
+                        return
+                self._wakeup.wait(0.1)
+                continue
+            now = time.perf_counter()
+            if window and len(ready) < want and not self._stop.is_set():
+                oldest = min(s.queue.peek().captured_at for s in ready if s.queue.peek() is not None)
+                if oldest + window > now:
+                    self._wakeup.wait(oldest + window - now)
+                    continue
+            self._dispatch(self.policy.select(ready, now, self.max_batch, self._service_ms))
+
+    def run(self, duration):
+        """Capture and schedule for `duration` seconds, then drain what is queued"""
+        self._capturing = len(self.streams)
+        captures = [threading.Thread(target=self._capture, args=(s,), name=f"capture-{s.name}",
+                                     daemon=True) for s in self.streams]
+        scheduler = threading.Thread(target=self._schedule, name='scheduler', daemon=True)
+        start = time.perf_counter()
+        for t in captures:
+            t.start()
+        scheduler.start()
+        scheduler.join(duration)
+        self._stop.set()
+        self._wakeup.set()
+        scheduler.join()
+        self.elapsed = time.perf_counter() - start
+        for t in captures:
+            t.join()
+        return self.stats()
+
+    def stats(self):
+        """Per-stream and aggregate statistics as plain dicts"""
+        elapsed = self.elapsed or 1e-9
+        streams = []
+        for s in self.streams:
+            fps = s.completed / elapsed
+            streams.append({
+                'name': s.name,
+                'target_fps': s.fps,
+                'weight': s.weight,
+                'captured': s.captured,
+                'completed': s.completed,
+                'dropped': s.queue.dropped,
+                'late': s.late,
+                'fps': fps,
+                'served': fps / s.fps if s.fps else 0.0,
+                'latency': s.latency.summary() if s.completed else None,
+            })
+        completed = sum(s['completed'] for s in streams)
+        batches = sum(self.batch_sizes.values())
+        all_latency = LatencyHistogram()
+        for s in self.streams:
+            all_latency.merge(s.latency)
+        return {
+            'policy': self.policy.name,
+            'streams': streams,
+            'elapsed': self.elapsed,
+            'completed': completed,
+            'fps': completed / elapsed,
+            'demand_fps': sum(s.fps for s in self.streams),
+            'fairness': jain_index([s['served'] for s in streams]),
+            'min_served': min((s['served'] for s in streams), default=0.0),
+            'late_pct': sum(s['late'] for s in streams) / completed * 100 if completed else 0.0,
+            'mean_batch': completed / batches if batches else 0.0,
+            'batch_sizes': dict(sorted(self.batch_sizes.items())),
+            'utilization': self.busy_s / elapsed,
+            # Throughput while the backend is busy, i.e. what it could sustain if never idle
+            'capacity_fps': completed / self.busy_s if self.busy_s else 0.0,
+            'service_ms': self.service.mean if self.service.count else 0.0,
+            'latency': all_latency.summary() if all_latency.count else None,
+        }
+
+    def print_report(self):
+        """Print the per-stream table and the aggregate summary"""
+        s = self.stats()
+        print(f"{'Stream':<16} {'Target':>7} {'FPS':>7} {'Served':>7} {'Drops':>6} {'Late':>6} "
+              f"{'p50 ms':>8} {'p99 ms':>8}")
+        for st in s['streams']:
+            lat = st['latency'] or {'p50_ms': 0.0, 'p99_ms': 0.0}
+            print(f"{st['name']:<16} {st['target_fps']:>7.1f} {st['fps']:>7.2f} {st['served'] * 100:>6.1f}% "
+                  f"{st['dropped']:>6} {st['late']:>6} {lat['p50_ms']:>8.2f} {lat['p99_ms']:>8.2f}")
+        print()
+        print(f"Policy:              {s['policy']}")
+        print(f"Aggregate FPS:       {s['fps']:.2f} of {s['demand_fps']:.1f} demanded")
+        print(f"Backend capacity:    {s['capacity_fps']:.2f} FPS at {s['utilization'] * 100:.0f}% utilization")
+        print(f"Mean batch:          {s['mean_batch']:.2f}  {s['batch_sizes']}")
+        print(f"Fairness (Jain):     {s['fairness']:.3f}  (worst stream served {s['min_served'] * 100:.1f}%)")
+        print(f"Late frames:         {s['late_pct']:.1f}%")
+        if s['latency']:
+            print(f"E2E latency p50/p99: {s['latency']['p50_ms']:.2f} / {s['latency']['p99_ms']:.2f} ms")
@@ -0,0 +1,291 @@
+"""
+Pipelined stage runner
+Runs capture -> preprocess -> infer -> postprocess stages concurrently, joined by bounded queues
+"""
+
+from collections import deque
+import threading
+import time
+
+from src.benchmarking.latency import LatencyHistogram
+
+_STOP = object()
+
+
+class Item:
+    """One frame travelling through the pipeline"""
+
+    __slots__ = ('seq', 'captured_at', 'payload')
+
+    def __init__(self, seq, captured_at, payload):
+        self.seq = seq
+        self.captured_at = captured_at
+        self.payload = payload
+
+
+class BoundedQueue:
+    """Bounded FIFO between stages
+
+    policy='drop_oldest' never blocks the producer: when full, the oldest
+    queued item is discarded and counted as a drop, so downstream stages
+    always work on the freshest frames. policy='block' applies plain
+    backpressure instead.
+    """
+
+    def __init__(self, maxsize, policy='drop_oldest'):
+        if policy not in ('drop_oldest', 'block'):
+            raise ValueError(f"Unknown queue policy '{policy}'")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self.dropped = 0
+        self.puts = 0
+        self.depth_sum = 0
+        self.max_depth = 0
+
+    def put(self, item, force=False):
+        """Enqueue; `force` blocks regardless of policy (used for stop markers)"""
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                if self.policy == 'drop_oldest' and not force:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._items) >= self.maxsize:
+                        self._not_full.wait()
+            self._items.append(item)
+            depth = len(self._items)
+            self.puts += 1
+            self.depth_sum += depth
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._not_empty.notify()
+
+    def get(self):
+        with self._lock:
+            while not self._items:
+                self._not_empty.wait()
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def get_nowait(self):
+        """Dequeue the oldest item, or None when empty"""
+        with self._lock:
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def peek(self):
+        """The oldest item without removing it, or None when empty"""
+        with self._lock:
+            return self._items[0] if self._items else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def mean_depth(self):
+        return self.depth_sum / self.puts if self.puts else 0.0
+
+
+class Stage:
+    """A named processing step: fn(payload) -> payload, run by `workers` threads
+
+    Returning None from fn filters the item out of the pipeline.
+    """
+
+    def __init__(self, name, fn, workers=1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.service = LatencyHistogram()
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def record(self, service_ms):
+        with self._lock:
+            self.service.record(service_ms)
+            self.processed += 1
+
+
+class PipelineRunner:
+    """Run a frame source and a chain of stages, each on its own thread(s)
+
+    Throughput approaches that of the slowest stage instead of the sum of
+    all stage times. Per-stage service time, queue depth and drops, plus
+    end-to-end latency and sustained FPS, are collected while running.
+    source_fps paces capture like a camera; without it the source is read
+    as fast as the first queue accepts items, which only makes sense with
+    policy='block'. Pass a MetricsRegistry as `metrics` to export live
+    counters and latency histograms (see metrics.instrument_pipeline).
+    If a stage raises, capture stops, the pipeline drains and run()
+    re-raises the first exception.
+    """
+
+    def __init__(self, source, stages, queue_size=4, policy='drop_oldest', sink=None,
+                 source_fps=None, metrics=None, name='pipeline'):
+        self.source = source
+        self.source_fps = source_fps
+        self.stages = list(stages)
+        self.sink = sink
+        self.queues = [BoundedQueue(queue_size, policy) for _ in self.stages]
+        self.end_to_end = LatencyHistogram()
+        self.captured = 0
+        self.completed = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self.error = None
+        self._error_lock = threading.Lock()
+        self._final = BoundedQueue(queue_size, 'block')
+        self.observe_stage = None
+        self.observe_end_to_end = None
+        if metrics is not None:
+            from .metrics import instrument_pipeline
+            instrument_pipeline(self, metrics, pipeline=name)
+
+    def _capture(self, max_items):
+        inbox = self.queues[0] if self.queues else self._final
+        interval = 1.0 / self.source_fps if self.source_fps else 0.0
+        next_tick = time.perf_counter()
+        for seq, payload in enumerate(self.source):
+            if self._stop.is_set() or (max_items is not None and seq >= max_items):
+                break
+            if interval:
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_tick += interval
+            inbox.put(Item(seq, time.perf_counter(), payload))
+            self.captured += 1
+        inbox.put(_STOP, force=True)
+
+    def _work(self, index, remaining, remaining_lock):
+        stage = self.stages[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.queues) else self._final
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                # Let sibling workers see the marker; the last one forwards it
+                inbox.put(_STOP, force=True)
+                with remaining_lock:
+                    remaining[index] -= 1
+                    last = remaining[index] == 0
+                if last:
+                    outbox.put(_STOP, force=True)
+                return
+            if self.error is not None:
+                # A stage failed: keep consuming so upstream puts never block, until _STOP arrives
+                continue
+            start = time.perf_counter()
+            try:
+                result = stage.fn(item.payload)
+            except Exception as e:
+                with self._error_lock:
+                    if self.error is None:
+                        self.error = e
+                self._stop.set()
+                continue
+            elapsed = time.perf_counter() - start
+            stage.record(elapsed * 1000)
+            if self.observe_stage is not None:
+                self.observe_stage[index](elapsed)
+            if result is not None:
+                item.payload = result
+                outbox.put(item)
+
+    def _drain(self):
+        while True:
+            item = self._final.get()
+            if item is _STOP:
+                return
+            latency = time.perf_counter() - item.captured_at
+            self.end_to_end.record(latency * 1000)
+            if self.observe_end_to_end is not None:
+                self.observe_end_to_end(latency)
+            self.completed += 1
+            if self.sink is not None:
+                self.sink(item)
+
+    def run(self, max_items=None, duration=None):
+        """Run until the source is exhausted, max_items captured or duration (s) elapsed"""
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        threads = [threading.Thread(target=self._capture, args=(max_items,), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self._work, args=(index, remaining, remaining_lock),
+                                         name=f"{stage.name}-{w}", daemon=True)
+                        for w in range(stage.workers)]
+        drain = threading.Thread(target=self._drain, daemon=True)
+
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        drain.start()
+        if duration is not None:
+            drain.join(duration)
+            self._stop.set()
+        drain.join()
+        self.elapsed = time.perf_counter() - start
+        for t in threads:
+            t.join()
+        if self.error is not None:
+            raise self.error
+        return self.stats()
+
+    @property
+    def dropped(self):
+        return sum(q.dropped for q in self.queues)
+
+    def stats(self):
+        """Per-stage and overall statistics as plain dicts"""
+        stages = []
+        for stage, queue in zip(self.stages, self.queues):
+            mean = stage.service.mean if stage.processed else 0.0
+            stages.append({
+                'name': stage.name,
+                'workers': stage.workers,
+                'processed': stage.processed,
+                'service_ms': mean,
+                'service_p99_ms': stage.service.percentile(99) if stage.processed else 0.0,
+                'capacity_fps': stage.workers * 1000.0 / mean if mean > 0 else float('inf'),
+                'queue_mean_depth': queue.mean_depth,
+                'queue_max_depth': queue.max_depth,
+                'dropped': queue.dropped,
+            })
+        sequential_ms = sum(s['service_ms'] for s in stages)
+        return {
+            'captured': self.captured,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'elapsed': self.elapsed,
+            'fps': self.completed / self.elapsed if self.elapsed > 0 else 0.0,
+            'bottleneck_fps': min((s['capacity_fps'] for s in stages), default=float('inf')),
+            'sequential_fps': 1000.0 / sequential_ms if sequential_ms > 0 else float('inf'),
+            'latency': self.end_to_end.summary(),
+            'stages': stages,
+        }
+
+    def print_report(self):
+        """Print the per-stage table and pipeline summary"""
+        s = self.stats()
+        print(f"{'Stage':<14} {'Workers':>7} {'Items':>7} {'Svc ms':>8} {'p99 ms':>8} "
+              f"{'Cap FPS':>8} {'Q avg':>6} {'Q max':>6} {'Drops':>6}")
+        for st in s['stages']:
+            print(f"{st['name']:<14} {st['workers']:>7} {st['processed']:>7} {st['service_ms']:>8.2f} "
+                  f"{st['service_p99_ms']:>8.2f} {st['capacity_fps']:>8.1f} "
+                  f"{st['queue_mean_depth']:>6.1f} {st['queue_max_depth']:>6} {st['dropped']:>6}")
+        print()
+        print(f"Frames captured:     {s['captured']}")
+        print(f"Frames completed:    {s['completed']} ({s['dropped']} dropped)")
+        print(f"Sustained FPS:       {s['fps']:.2f}")
+        print(f"Slowest stage cap:   {s['bottleneck_fps']:.2f} FPS")
+        print(f"Sequential estimate: {s['sequential_fps']:.2f} FPS (sum of stage times)")
+        print(f"E2E latency p50/p99: {s['latency']['p50_ms']:.2f} / {s['latency']['p99_ms']:.2f} ms")
@@ -0,0 +1,108 @@
+"""
+Shared-memory frame ring
+Fixed-shape frame slots in multiprocessing.shared_memory; processes exchange only (slot, seq) pairs
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Slot stamp while the producer is writing into it
+WRITING = -1
+
+
+class FrameRing:
+    """Ring of fixed-shape frame slots shared between processes
+
+    The producer writes frame n into slot n % slots and passes (slot, seq)
+    to consumers over any small-message channel. Consumers get the slot as
+    a NumPy view of shared memory, without copying or pickling the frame.
+    Each slot carries the sequence number of the frame it holds, so a
+    consumer can tell when the producer has lapped it: read() returns None
+    if the slot already holds a newer frame, and valid() after processing
+    confirms the frame was not overwritten while in use. The producer
+    never waits for consumers, like a camera.
+
+    One producer per ring; any number of consumers.
+    """
+
+    def __init__(self, shm, slots, shape, dtype, owner=False):
+        self._shm = shm
+        self.owner = owner
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        header = np.ndarray((slots + 1,), dtype=np.int64, buffer=shm.buf)
+        self._counter = header[:1]
+        self.stamps = header[1:]
+        offset = -(-header.nbytes // 64) * 64
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=shm.buf, offset=offset)
+        self.overwrites = 0
+
+    @staticmethod
+    def nbytes(slots, shape, dtype=np.uint8):
+        header = -(-(slots + 1) * 8 // 64) * 64
+        return header + slots * int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    @classmethod
+    def create(cls, slots, shape, dtype=np.uint8, name=None):
+        """Allocate a new ring; the creating process should unlink() it when done"""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.nbytes(slots, shape, dtype))
+        ring = cls(shm, slots, shape, dtype, owner=True)
+        ring._counter[0] = 0
+        ring.stamps[:] = WRITING
+        return ring
+
+    @classmethod
+    def attach(cls, name, slots, shape, dtype):
+        """Open a ring created by another process (pass it ring.spec)"""
+        return cls(shared_memory.SharedMemory(name=name), slots, shape, dtype)
+
+    @property
+    def spec(self):
+        """Picklable arguments for attach()"""
+        return {'name': self._shm.name, 'slots': self.slots, 'shape': self.shape,
+                'dtype': self.dtype.str}
+
+    def claim(self):
+        """(slot, seq, view) of the next slot to fill; publish() it once written"""
+        seq = int(self._counter[0])
+        slot = seq % self.slots
+        self.stamps[slot] = WRITING
+        self._counter[0] = seq + 1
+        return slot, seq, self.frames[slot]
+
+    def publish(self, slot, seq):
+        self.stamps[slot] = seq
+
+    def write(self, frame):
+        """Copy a frame into the next slot; returns (slot, seq)"""
+        slot, seq, view = self.claim()
+        view[...] = frame
+        self.publish(slot, seq)
+        return slot, seq
+
+    def read(self, slot, seq):
+        """Zero-copy view of frame `seq`, or None if the slot was already overwritten"""
+        if self.stamps[slot] != seq:
+            self.overwrites += 1
+            return None
+        return self.frames[slot]
+
+    def valid(self, slot, seq):
+        """True if the slot still holds frame `seq` (check after using a view)"""
+        if self.stamps[slot] != seq:
+            self.overwrites += 1
+            return False
+        return True
+
+    def close(self):
+        """Detach from the shared memory; views handed out must no longer be used"""
+        del self.frames, self.stamps, self._counter
+        self._shm.close()
+
+    def unlink(self):
+        """Close and free the shared memory (creating process only)"""
+        self.close()
+        if self.owner:
+            self._shm.unlink()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+YOLOv8-pose postprocessing microbenchmark
+Times the vectorized decoder on synthetic head outputs against the Hailo inference budget
+
+Run from the repository root:
+    python -m src.pose_estimation.benchmark_postprocess --people 1 5 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.benchmarking.latency import LatencyHistogram
+from src.benchmarking.results_store import hailo_baseline
+from src.pose_estimation.postprocess import NUM_KEYPOINTS, YOLOv8PosePostprocessor
+
+
+def synthetic_outputs(num_people, batch=1, input_size=640, strides=(8, 16, 32), reg_max=16, seed=0,
+                      boxes=None, keypoints=None):
+    """Hailo-layout head outputs with `num_people` confident clusters per image
+
+    Background anchors get low person logits. Each planted person lights up
+    a 3x3 neighbourhood on every stride whose DFL logits peak at the bins
+    that decode to that person's box, as a trained head does. Pass `boxes`
+    (one (K, 4) xyxy array per image) to plant given people instead of
+    random ones, and `keypoints` ((K, 17, 3) per image, visibility 0/1) to
+    plant their keypoints as well. Given boxes span any size, so each is
+    planted only on the stride whose DFL range fits it best.
+    """
+    rng = np.random.default_rng(seed)
+    outputs = []
+    planted = boxes is not None
+    if boxes is None:
+        centres = rng.uniform(0.15, 0.85, (batch, num_people, 2)) * input_size
+        sizes = rng.uniform(0.1, 0.3, (batch, num_people, 2)) * input_size
+        boxes = [np.concatenate([c - s / 2, c + s / 2], axis=1) for c, s in zip(centres, sizes)]
+    boxes = [np.asarray(b, dtype=np.float32).reshape(-1, 4) for b in boxes]
+    if planted:
+        # Half the larger side should span about half of the DFL bins, keeping rounding error small
+        fit = [np.abs(np.log(np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]) / 2
+                             / (np.array(strides)[:, None] * reg_max * 0.45))).argmin(axis=0) for b in boxes]
+    for level, stride in enumerate(strides):
+        cells = input_size // stride
+        box = rng.normal(0, 1, (batch, cells, cells, 4, reg_max)).astype(np.float32)
+        score = rng.normal(-8, 1, (batch, cells, cells, 1)).astype(np.float32)
+        kpts = rng.normal(0, 0.5, (batch, cells, cells, NUM_KEYPOINTS * 3)).astype(np.float32)
+        for b in range(batch):
+            for k, (x1, y1, x2, y2) in enumerate(boxes[b]):
+                if planted and fit[b][k] != level:
+                    continue
+                x, y = int((x1 + x2) / 2 / stride), int((y1 + y2) / 2 / stride)
+                for gy in range(max(0, y - 1), min(cells, y + 2)):
+                    for gx in range(max(0, x - 1), min(cells, x + 2)):
+                        ax, ay = (gx + 0.5) * stride, (gy + 0.5) * stride
+                        ltrb = np.array([ax - x1, ay - y1, x2 - ax, y2 - ay]) / stride
+                        bins = np.clip(np.round(ltrb), 0, reg_max - 1).astype(int)
+                        score[b, gy, gx, 0] = rng.uniform(0, 4)
+                        box[b, gy, gx] = -4.0
+                        box[b, gy, gx, np.arange(4), bins] = 8.0
+                        if keypoints is not None:
+                            # Inverse of (raw * 2 + anchor - 0.5) * stride, visibility as a logit
+                            kp = np.asarray(keypoints[b][k], dtype=np.float32)
+                            raw = kpts[b, gy, gx].reshape(NUM_KEYPOINTS, 3)
+                            raw[:, 0] = (kp[:, 0] / stride - gx) / 2
+                            raw[:, 1] = (kp[:, 1] / stride - gy) / 2
+                            raw[:, 2] = np.where(kp[:, 2] > 0, 6.0, -6.0)
+        outputs.append((box.reshape(batch, cells, cells, 4 * reg_max), score, kpts))
+    return outputs
+
+
+def benchmark_pose_postprocess(people_counts=(0, 1, 5, 20, 50), frames=200, batch=1, exact_nms=True):
+    """Postprocess time per frame for several person counts"""
+
+    print("=" * 70)
+    print("YOLOv8s-Pose Postprocessing Microbenchmark (vectorized NumPy)")
+    print("=" * 70)
+    print()
+
+    hailo = hailo_baseline('yolov8s_pose')
+    budget_ms = hailo['latency_ms'] if hailo else None
+    if budget_ms:
+        print(f"Inference budget:    {budget_ms:.2f} ms (Hailo-8L HW latency, recorded {hailo['timestamp']})")
+    else:
+        print("Inference budget:    no hailo8l result recorded for yolov8s_pose")
+    print(f"🎯 {frames} frames per setting, batch {batch}, {'exact' if exact_nms else 'fast'} NMS")
+    print()
+
+    post = YOLOv8PosePostprocessor(exact_nms=exact_nms)
+    results = []
+    for people in people_counts:
+        outputs = synthetic_outputs(people, batch=batch)
+        for _ in range(5):
+            detections = post(outputs)
+
+        hist = LatencyHistogram()
+        for _ in range(frames):
+            start = time.perf_counter()
+            detections = post(outputs)
+            hist.record((time.perf_counter() - start) * 1000 / batch)
+
+        found = np.mean([len(d['scores']) for d in detections])
+        results.append({'people': people, 'detections': found, 'mean_ms': hist.mean,
+                        'p99_ms': hist.percentile(99)})
+
+    print(f"{'People':>7} {'Dets':>6} {'Mean ms':>9} {'p99 ms':>8} {'% budget':>9}")
+    for r in results:
+        share = f"{r['mean_ms'] / budget_ms * 100:>8.1f}%" if budget_ms else f"{'n/a':>9}"
+        print(f"{r['people']:>7} {r['detections']:>6.1f} {r['mean_ms']:>9.3f} {r['p99_ms']:>8.3f} {share}")
+    print("=" * 70)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='YOLOv8-pose postprocessing microbenchmark')
+    parser.add_argument('--people', type=int, nargs='+', default=[0, 1, 5, 20, 50],
+                        help='Planted people per frame (default: 0 1 5 20 50)')
+    parser.add_argument('--frames', type=int, default=200,
+                        help='Timed frames per setting (default: 200)')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='Images per postprocess call (default: 1)')
+    parser.add_argument('--fast-nms', action='store_true',
+                        help='Single-pass Fast-NMS instead of exact greedy NMS')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    benchmark_pose_postprocess(people_counts=args.people, frames=args.frames, batch=args.batch,
+                               exact_nms=not args.fast_nms)
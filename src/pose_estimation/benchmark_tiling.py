@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tiled inference benchmark
+Recall and throughput of tile layouts for a 1296x972 camera frame against the single 640x640 lores view
+
+Run from the repository root:
+    python -m src.pose_estimation.benchmark_tiling --layouts lores 2x2 3x2 3x2+full
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.benchmarking.latency import LatencyHistogram
+from src.benchmarking.results_store import hailo_baseline
+from src.pose_estimation.benchmark_postprocess import synthetic_outputs
+from src.pose_estimation.postprocess import NUM_KEYPOINTS, YOLOv8PosePostprocessor, box_iou_matrix
+from src.pose_estimation.tiling import TileLayout, merge_detections
+
+# Sensor mode picked in results/pose_hailo_run1.log
+FRAME_SIZE = (1296, 972)
+
+# Joint positions as (x, y) fractions of the person box, COCO order
+SKELETON = np.array([
+    (0.50, 0.06), (0.45, 0.04), (0.55, 0.04), (0.38, 0.06), (0.62, 0.06),
+    (0.25, 0.20), (0.75, 0.20), (0.15, 0.38), (0.85, 0.38), (0.10, 0.52), (0.90, 0.52),
+    (0.32, 0.55), (0.68, 0.55), (0.32, 0.77), (0.68, 0.77), (0.32, 0.97), (0.68, 0.97),
+], dtype=np.float32)
+
+
+def synthetic_scene(num_people, seed=0, min_height=16, max_height=480):
+    """(frame, boxes, keypoints) with people of log-uniform height scattered over the frame"""
+    rng = np.random.default_rng(seed)
+    width, height = FRAME_SIZE
+    h = np.exp(rng.uniform(np.log(min_height), np.log(max_height), num_people))
+    w = 0.4 * h
+    x1 = rng.uniform(0, width - w)
+    y1 = rng.uniform(0, height - h)
+    boxes = np.stack([x1, y1, x1 + w, y1 + h], axis=1).astype(np.float32)
+    keypoints = np.ones((num_people, NUM_KEYPOINTS, 3), dtype=np.float32)
+    keypoints[..., 0] = x1[:, None] + SKELETON[:, 0] * w[:, None]
+    keypoints[..., 1] = y1[:, None] + SKELETON[:, 1] * h[:, None]
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return frame, boxes, keypoints
+
+
+def simulated_detector(layout, boxes, keypoints, min_model_px=24, min_visible=0.3):
+    """Per-view (boxes, keypoints) a detector would report
+
+    A person is detected in a view when the part inside the tile is at
+    least min_model_px tall in model pixels and at least min_visible of
+    the box; people cut by a tile edge come back as the visible part.
+    """
+    per_view_boxes, per_view_kpts = [], []
+    for scale, offset in zip(layout.scales, layout.offsets):
+        model = boxes * scale - np.tile(offset, 2)
+        clipped = np.clip(model, 0, layout.tile)
+        area = (model[:, 2] - model[:, 0]) * (model[:, 3] - model[:, 1])
+        visible = (clipped[:, 2] - clipped[:, 0]) * (clipped[:, 3] - clipped[:, 1])
+        seen = ((clipped[:, 3] - clipped[:, 1]) >= min_model_px) & (visible >= min_visible * area)
+        kp = keypoints[seen].copy()
+        kp[..., :2] = kp[..., :2] * scale - offset
+        kp[..., 2] = np.all((kp[..., :2] >= 0) & (kp[..., :2] < layout.tile), axis=-1)
+        per_view_boxes.append(clipped[seen])
+        per_view_kpts.append(kp)
+    return per_view_boxes, per_view_kpts
+
+
+def evaluate(detections, boxes, keypoints, iou_threshold=0.5):
+    """(matched people, unmatched detections, matched keypoints within 5% of person height)"""
+    if len(detections['boxes']) == 0 or len(boxes) == 0:
+        return 0, len(detections['boxes']), 0
+    iou = box_iou_matrix(np.concatenate([boxes, detections['boxes']]))[:len(boxes), len(boxes):]
+    matched, used, kp_ok = 0, set(), 0
+    for g in np.argsort(-(boxes[:, 3] - boxes[:, 1])):
+        candidates = [d for d in np.argsort(-iou[g]) if iou[g, d] >= iou_threshold and d not in used]
+        if not candidates:
+            continue
+        d = candidates[0]
+        used.add(d)
+        matched += 1
+        pred = detections['keypoints'][d]
+        tolerance = max(3.0, 0.05 * (boxes[g, 3] - boxes[g, 1]))
+        error = np.linalg.norm(pred[:, :2] - keypoints[g, :, :2], axis=1)
+        kp_ok += int(np.sum((pred[:, 2] > 0.5) & (error <= tolerance)))
+    return matched, len(detections['boxes']) - matched, kp_ok
+
+
+def _onnx_infer(model_path):
+    """Batched infer for an ultralytics YOLOv8-pose ONNX export (B, 56, N) on ONNX Runtime"""
+    from src.inference.backends import load_backend
+    engine = load_backend('onnxruntime', model_path)
+    shape = engine.session.get_inputs()[0].shape
+    dynamic = not isinstance(shape[0], int)
+
+    def infer(batch):
+        blob = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+        if dynamic:
+            return engine.infer(blob)
+        return np.concatenate([engine.infer(blob[i:i + 1]) for i in range(len(blob))])
+
+    return infer
+
+
+def benchmark_tiling(layouts=('lores', '2x2', '3x2', '3x2+full'), people=30, frames=20, min_overlap=64,
+                     min_model_px=24, model_path=None):
+    """Recall, duplicates and per-frame cost for each tile layout"""
+
+    print("=" * 70)
+    print("Tiled Inference Benchmark: YOLOv8s-Pose on 1296x972 Frames")
+    print("=" * 70)
+    print()
+
+    hailo = hailo_baseline('yolov8s_pose')
+    budget_ms = hailo['latency_ms'] if hailo else None
+    infer = _onnx_infer(model_path) if model_path else None
+    if infer:
+        print(f"Inference:           {model_path} on ONNX Runtime (measured per batch)")
+    elif budget_ms:
+        print(f"Inference:           {budget_ms:.2f} ms per view (Hailo-8L HW latency, recorded "
+              f"{hailo['timestamp']})")
+    else:
+        print("Inference:           no hailo8l result for yolov8s_pose; CPU stages only")
+    print(f"🎯 {frames} scenes × {people} people (16-480 px tall), detector sees people ≥ {min_model_px} "
+          f"model px and ≥ 30% visible in a view")
+    print("   Detections are simulated from the scene geometry; recall reflects downscaling and merging,")
+    print("   not a trained network")
+    print()
+
+    post = YOLOv8PosePostprocessor()
+    scenes = [synthetic_scene(people, seed=i) for i in range(frames)]
+    results = []
+    for spec in layouts:
+        layout = TileLayout.parse(spec, FRAME_SIZE, min_overlap=min_overlap)
+        outputs = []
+        for _, boxes, keypoints in scenes:
+            view_boxes, view_kpts = simulated_detector(layout, boxes, keypoints, min_model_px)
+            outputs.append(synthetic_outputs(0, batch=layout.num_views, boxes=view_boxes,
+                                             keypoints=view_kpts))
+        for frame, _, _ in scenes[:2]:
+            layout.cut(frame)
+
+        timing = {stage: LatencyHistogram() for stage in ('cut', 'infer', 'postprocess', 'merge')}
+        matched = extra = kp_ok = kp_total = naive_extra = 0
+        for (frame, boxes, keypoints), head in zip(scenes, outputs):
+            start = time.perf_counter()
+            batch = layout.cut(frame)
+            timing['cut'].record((time.perf_counter() - start) * 1000)
+            if infer:
+                start = time.perf_counter()
+                infer(batch)
+                timing['infer'].record((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            per_view = post(head)
+            timing['postprocess'].record((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            merged = merge_detections(per_view, layout)
+            timing['merge'].record((time.perf_counter() - start) * 1000)
+
+            m, e, k = evaluate(merged, boxes, keypoints)
+            matched, extra, kp_ok = matched + m, extra + e, kp_ok + k
+            kp_total += NUM_KEYPOINTS * len(boxes)
+            # Reference: the same detections with plain IoU NMS only (no edge handling)
+            plain = merge_detections(per_view, layout, seam_iou_threshold=np.inf)
+            naive_extra += evaluate(plain, boxes, keypoints)[1]
+
+        cpu_ms = sum(timing[s].mean for s in ('cut', 'postprocess', 'merge'))
+        infer_ms = timing['infer'].mean if infer else (budget_ms * layout.num_views if budget_ms else None)
+        results.append({
+            'layout': spec, 'views': layout.num_views, 'scale': layout.grid_scale,
+            'min_height_px': layout.min_visible_height(min_model_px),
+            'recall': matched / (frames * people), 'extra_per_frame': extra / frames,
+            'plain_nms_extra_per_frame': naive_extra / frames, 'keypoint_recall': kp_ok / kp_total,
+            'cut_ms': timing['cut'].mean, 'postprocess_ms': timing['postprocess'].mean,
+            'merge_ms': timing['merge'].mean, 'cpu_ms': cpu_ms, 'infer_ms': infer_ms,
+            # Inference and CPU stages overlap in a pipeline; the slower one sets the frame rate
+            'fps': 1000.0 / max(infer_ms or 0.0, cpu_ms),
+        })
+
+    print(f"{'Layout':<10} {'Views':>5} {'Scale':>5} {'Min px':>6} {'Recall':>7} {'KP rec':>7} "
+          f"{'Extra':>6} {'Plain':>6} {'Cut':>6} {'Post':>6} {'Merge':>6} {'Infer':>7} {'FPS':>6}")
+    for r in results:
+        infer_col = f"{r['infer_ms']:>7.1f}" if r['infer_ms'] else f"{'n/a':>7}"
+        print(f"{r['layout']:<10} {r['views']:>5} {r['scale']:>5.2f} {r['min_height_px']:>6.0f} "
+              f"{r['recall'] * 100:>6.1f}% {r['keypoint_recall'] * 100:>6.1f}% "
+              f"{r['extra_per_frame']:>6.2f} {r['plain_nms_extra_per_frame']:>6.2f} "
+              f"{r['cut_ms']:>6.2f} {r['postprocess_ms']:>6.2f} {r['merge_ms']:>6.2f} {infer_col} "
+              f"{r['fps']:>6.1f}")
+    print()
+    print("Min px: smallest detectable person height in frame pixels; Extra: unmatched detections per")
+    print("frame after the tile merge (Plain: with IoU-only NMS); stage columns in ms per frame")
+    base = results[0]
+    for r in results[1:]:
+        print(f"💡 {r['layout']}: {(r['recall'] - base['recall']) * 100:+.1f} pts recall for "
+              f"{base['fps'] / r['fps']:.1f}× the frame time of {base['layout']}")
+    print("=" * 70)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Tiled high-resolution inference benchmark')
+    parser.add_argument('--layouts', nargs='+', default=['lores', '2x2', '3x2', '3x2+full'],
+                        help="Tile layouts: 'lores', 'CxR' or 'CxR+full' (default: lores 2x2 3x2 3x2+full)")
+    parser.add_argument('--people', type=int, default=30, help='People per scene (default: 30)')
+    parser.add_argument('--frames', type=int, default=20, help='Scenes per layout (default: 20)')
+    parser.add_argument('--overlap', type=int, default=64,
+                        help='Minimum overlap between neighbouring tiles in pixels (default: 64)')
+    parser.add_argument('--min-model-px', type=int, default=24,
+                        help='Smallest person height the detector finds, in model pixels (default: 24)')
+    parser.add_argument('--model', default=None,
+                        help='YOLOv8-pose ONNX export to time real batched inference on the CPU')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    benchmark_tiling(layouts=args.layouts, people=args.people, frames=args.frames,
+                     min_overlap=args.overlap, min_model_px=args.min_model_px, model_path=args.model)
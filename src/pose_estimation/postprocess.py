@@ -0,0 +1,216 @@
+"""
+Vectorized YOLOv8-pose postprocessing
+Anchor-free DFL box decode, confidence filtering, batched NMS and keypoint decode in NumPy
+"""
+
+import warnings
+
+import numpy as np
+
+NUM_KEYPOINTS = 17
+
+# COCO keypoint order used by YOLOv8-pose
+KEYPOINT_NAMES = (
+    'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
+    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+    'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle',
+)
+
+
+def make_anchors(input_size, strides):
+    """Anchor centres (N, 2) in grid units and per-anchor stride (N,)"""
+    points, stride_col = [], []
+    for stride in strides:
+        cells = input_size // stride
+        ys, xs = np.meshgrid(np.arange(cells, dtype=np.float32) + 0.5,
+                             np.arange(cells, dtype=np.float32) + 0.5, indexing='ij')
+        points.append(np.stack([xs.ravel(), ys.ravel()], axis=1))
+        stride_col.append(np.full(cells * cells, stride, dtype=np.float32))
+    return np.concatenate(points), np.concatenate(stride_col)
+
+
+def box_iou_matrix(boxes):
+    """Pairwise IoU of (K, 4) xyxy boxes"""
+    inter, union = intersection_union(boxes)
+    return inter / (union + 1e-9)
+
+
+def intersection_union(boxes):
+    """Pairwise intersection and union areas of (K, 4) xyxy boxes, built from 2-D outer ops in place"""
+    x1, y1, x2, y2 = boxes.T
+    inter = np.minimum.outer(x2, x2)
+    inter -= np.maximum.outer(x1, x1)
+    np.maximum(inter, 0, out=inter)
+    h = np.minimum.outer(y2, y2)
+    h -= np.maximum.outer(y1, y1)
+    np.maximum(h, 0, out=h)
+    inter *= h
+    area = (x2 - x1) * (y2 - y1)
+    union = np.add.outer(area, area)
+    union -= inter
+    return inter, union
+
+
+def batched_nms(boxes, scores, groups, iou_threshold, exact=True, max_iterations=100):
+    """Greedy NMS over all candidates of all groups (images/classes) at once
+
+    Boxes of different groups are shifted apart by more than the extent
+    of all boxes (negative, unclipped coordinates included) so they never
+    overlap, then a single IoU matrix is built. Fast-NMS (one vectorized pass) lets
+    an already-suppressed box suppress others; with exact=True the keep
+    mask is refined by fixed-point iteration until it equals the greedy
+    result. Each iteration is one vectorized matrix op, and the number of
+    iterations is bounded by the longest suppression chain, not by the
+    number of detections. Returns kept indices ordered by score.
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    order = np.argsort(-scores, kind='stable')
+    low = boxes.min()
+    offset = groups[order].astype(np.float32)[:, None] * (boxes.max() - low + 1.0)
+    inter, union = intersection_union(boxes[order] - low + offset)
+    # suppresses[j, i]: higher-scored j overlaps lower-scored i (IoU > t without the divide)
+    suppresses = np.triu(inter > iou_threshold * union, k=1)
+
+    return order[greedy_keep(suppresses, exact, max_iterations)]
+
+
+def greedy_keep(suppresses, exact=True, max_iterations=100):
+    """Keep mask for score-ordered candidates; suppresses[j, i] means j (ranked first) removes i
+
+    With exact=True a suppression chain longer than max_iterations does not
+    return an unconverged mask: it warns and finishes with a sequential
+    greedy pass.
+    """
+    keep = ~suppresses.any(axis=0)  # Fast-NMS
+    if exact:
+        # Count surviving suppressors per box with one BLAS mat-vec per iteration
+        weights = suppresses.astype(np.float32)
+        for _ in range(max_iterations):
+            refined = (keep.astype(np.float32) @ weights) == 0
+            if np.array_equal(refined, keep):
+                break
+            keep = refined
+        else:
+            warnings.warn(f"NMS fixed-point iteration did not converge in {max_iterations} iterations; "
+                          f"falling back to sequential greedy NMS", RuntimeWarning, stacklevel=2)
+            keep = np.ones(len(suppresses), dtype=bool)
+            for j in range(len(suppresses)):
+                if keep[j]:
+                    keep[j + 1:] &= ~suppresses[j, j + 1:]
+    return keep
+
+
+class YOLOv8PosePostprocessor:
+    """Decode YOLOv8-pose head outputs into person boxes and 17 keypoints
+
+    Accepts either the raw per-stride head tensors produced by the Hailo
+    HEF (NHWC: DFL box logits with 4*reg_max channels, 1 person logit,
+    17*3 keypoint channels) via __call__, or the ultralytics ONNX export
+    layout (B, 56, N) with already-decoded boxes via decode_onnx().
+    All candidates of all images are processed together; there are no
+    per-detection Python loops.
+    """
+
+    def __init__(self, input_size=640, strides=(8, 16, 32), reg_max=16,
+                 score_threshold=0.25, iou_threshold=0.7, max_candidates=1000,
+                 max_detections=100, exact_nms=True):
+        self.input_size = input_size
+        self.strides = strides
+        self.reg_max = reg_max
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self.max_candidates = max_candidates
+        self.max_detections = max_detections
+        self.exact_nms = exact_nms
+        self.anchors, self.anchor_strides = make_anchors(input_size, strides)
+        self._bins = np.arange(reg_max, dtype=np.float32)
+        # Compare logits against logit(threshold) so sigmoid runs only on survivors
+        self._logit_threshold = np.log(score_threshold / (1.0 - score_threshold))
+
+    @staticmethod
+    def _sigmoid(x):
+        return 1.0 / (1.0 + np.exp(-x))
+
+    def _flatten(self, outputs):
+        """[(box, score, kpts) per stride] NHWC -> (B, N, C) arrays"""
+        boxes, scores, kpts = [], [], []
+        for box, score, kpt in outputs:
+            batch = box.shape[0]
+            boxes.append(box.reshape(batch, -1, 4 * self.reg_max))
+            scores.append(score.reshape(batch, -1))
+            kpts.append(kpt.reshape(batch, -1, NUM_KEYPOINTS * 3))
+        return np.concatenate(boxes, 1), np.concatenate(scores, 1), np.concatenate(kpts, 1)
+
+    def _top_candidates(self, mask, scores):
+        """(image, anchor) indices of candidates, capped per batch by score"""
+        image_idx, anchor_idx = np.nonzero(mask)
+        if len(image_idx) > self.max_candidates:
+            top = np.argpartition(-scores[image_idx, anchor_idx], self.max_candidates)[:self.max_candidates]
+            image_idx, anchor_idx = image_idx[top], anchor_idx[top]
+        return image_idx, anchor_idx
+
+    def __call__(self, outputs):
+        """Decode raw Hailo-layout outputs; returns one dict per image"""
+        box_logits, score_logits, kpt_raw = self._flatten(outputs)
+        batch = score_logits.shape[0]
+
+        image_idx, anchor_idx = self._top_candidates(score_logits > self._logit_threshold, score_logits)
+        scores = self._sigmoid(score_logits[image_idx, anchor_idx])
+
+        # DFL: softmax over reg_max bins, expectation -> ltrb distances in grid units
+        dfl = box_logits[image_idx, anchor_idx].reshape(-1, 4, self.reg_max)
+        dfl = np.exp(dfl - dfl.max(axis=2, keepdims=True))
+        dist = (dfl @ self._bins) / dfl.sum(axis=2)
+
+        centres = self.anchors[anchor_idx]
+        stride = self.anchor_strides[anchor_idx][:, None]
+        boxes = np.concatenate([centres - dist[:, :2], centres + dist[:, 2:]], axis=1) * stride
+
+        # Keypoints: (raw * 2 + anchor - 0.5) * stride, visibility through sigmoid
+        raw = kpt_raw[image_idx, anchor_idx].reshape(-1, NUM_KEYPOINTS, 3)
+        keypoints = np.empty_like(raw)
+        keypoints[..., :2] = (raw[..., :2] * 2.0 + (centres[:, None, :] - 0.5)) * stride[:, None]
+        keypoints[..., 2] = self._sigmoid(raw[..., 2])
+
+        return self._select(batch, image_idx, boxes, scores, keypoints)
+
+    def decode_onnx(self, output):
+        """Decode the ultralytics ONNX layout (B, 56, N): cx, cy, w, h, score, 17 x (x, y, v)"""
+        pred = output.transpose(0, 2, 1)
+        batch = pred.shape[0]
+        image_idx, anchor_idx = self._top_candidates(pred[..., 4] > self.score_threshold, pred[..., 4])
+        cand = pred[image_idx, anchor_idx]
+
+        xy, wh = cand[:, :2], cand[:, 2:4] / 2.0
+        boxes = np.concatenate([xy - wh, xy + wh], axis=1)
+        keypoints = cand[:, 5:].reshape(-1, NUM_KEYPOINTS, 3).copy()
+        return self._select(batch, image_idx, boxes, cand[:, 4], keypoints)
+
+    def _select(self, batch, image_idx, boxes, scores, keypoints):
+        keep = batched_nms(boxes, scores, image_idx, self.iou_threshold, exact=self.exact_nms)
+
+        # Split per image while preserving score order and capping detections
+        keep = keep[np.argsort(image_idx[keep], kind='stable')]
+        counts = np.bincount(image_idx[keep], minlength=batch)
+        results = []
+        start = 0
+        for count in counts:
+            sel = keep[start:start + min(count, self.max_detections)]
+            start += count
+            results.append({
+                'boxes': boxes[sel],
+                'scores': scores[sel],
+                'keypoints': keypoints[sel],
+            })
+        return results
+
+
+def scale_to_original(detections, scale, pad):
+    """Map model-input coordinates back through a letterbox (scale, (pad_x, pad_y))"""
+    pad = np.asarray(pad, dtype=np.float32)
+    boxes = (detections['boxes'] - np.tile(pad, 2)) / scale
+    keypoints = detections['keypoints'].copy()
+    keypoints[..., :2] = (keypoints[..., :2] - pad) / scale
+    return {'boxes': boxes, 'scores': detections['scores'], 'keypoints': keypoints}
@@ -0,0 +1,248 @@
+"""
+Tiled high-resolution inference
+Cuts a full-resolution frame into overlapping model-sized tiles, runs them as one batch
+and merges the per-tile detections with cross-tile NMS and keypoint deduplication
+"""
+
+import re
+
+import cv2
+import numpy as np
+
+from src.pose_estimation.postprocess import greedy_keep, intersection_union
+from src.preprocessing.images import PAD_VALUE
+
+
+class TileLayout:
+    """Placement of model-input views over a frame
+
+    `grid=(cols, rows)` places cols x rows tiles of tile x tile pixels,
+    evenly spread with at least `min_overlap` pixels shared between
+    neighbours. The frame is downscaled only as far as needed for the grid
+    to cover it, so a grid that fits at native resolution sees every pixel.
+    grid=(1, 1) is the single letterboxed view the model normally gets.
+    `full_frame=True` adds that letterboxed whole-frame view to a grid, so
+    people larger than a tile are still seen in one piece.
+
+    View i maps model coordinates to frame coordinates as
+    frame = (model + offsets[i]) / scales[i]. Downscaling uses bilinear
+    interpolation like the YOLO letterbox; INTER_AREA costs several times
+    more at these sizes.
+    """
+
+    def __init__(self, frame_size, grid=(1, 1), tile=640, min_overlap=64, full_frame=False,
+                 interpolation=cv2.INTER_LINEAR):
+        width, height = frame_size
+        cols, rows = grid
+        self.frame_size = (width, height)
+        self.grid = (cols, rows)
+        self.tile = tile
+        self.full_frame = full_frame and grid != (1, 1)
+        self.interpolation = interpolation
+
+        def fit(n, length):
+            return (n * tile - (n - 1) * min_overlap) / length
+
+        scale = min(1.0, fit(cols, width), fit(rows, height))
+        self.grid_scale = scale
+        scaled = (int(round(width * scale)), int(round(height * scale)))
+        xs = np.linspace(0, max(scaled[0] - tile, 0), cols).round().astype(int)
+        ys = np.linspace(0, max(scaled[1] - tile, 0), rows).round().astype(int)
+
+        # Per view: scale, offset of the tile inside the scaled frame, scaled frame size
+        self.scales = [scale] * (cols * rows)
+        self.offsets = [(x, y) for y in ys for x in xs]
+        self.scaled_sizes = [scaled] * (cols * rows)
+        if self.full_frame:
+            full = min(tile / width, tile / height)
+            self.scales.append(full)
+            self.offsets.append((0, 0))
+            self.scaled_sizes.append((int(round(width * full)), int(round(height * full))))
+        self.scales = np.array(self.scales, dtype=np.float32)
+        self.offsets = np.array(self.offsets, dtype=np.float32)
+        # Frame region each view covers, xyxy in frame pixels
+        ends = np.minimum(self.offsets + tile, np.array(self.scaled_sizes, dtype=np.float32))
+        self.footprints = np.concatenate([self.offsets, ends], axis=1) / self.scales[:, None]
+        self._batch = None
+
+    @classmethod
+    def parse(cls, spec, frame_size, tile=640, min_overlap=64):
+        """Layout from a spec: 'lores' (one letterboxed view), 'CxR' or 'CxR+full'"""
+        if spec in ('lores', '1x1'):
+            return cls(frame_size, (1, 1), tile, min_overlap)
+        match = re.fullmatch(r'(\d+)x(\d+)(\+full)?', spec)
+        if not match:
+            raise ValueError(f"Unknown tile layout '{spec}'; use 'lores', 'CxR' or 'CxR+full'")
+        return cls(frame_size, (int(match.group(1)), int(match.group(2))), tile, min_overlap,
+                   full_frame=bool(match.group(3)))
+
+    @property
+    def num_views(self):
+        return len(self.scales)
+
+    def describe(self):
+        cols, rows = self.grid
+        if self.grid == (1, 1):
+            return f"lores 1 view at {self.grid_scale:.2f}x"
+        extra = ' + full frame' if self.full_frame else ''
+        return f"{cols}x{rows} tiles at {self.grid_scale:.2f}x{extra}"
+
+    def min_visible_height(self, min_model_px):
+        """Smallest object height in frame pixels that reaches min_model_px in some view"""
+        return min_model_px / float(self.scales.max())
+
+    def cut(self, frame):
+        """(views, tile, tile, 3) uint8 batch; the buffer is reused between calls"""
+        if self._batch is None:
+            self._batch = np.full((self.num_views, self.tile, self.tile) + frame.shape[2:], PAD_VALUE,
+                                  dtype=frame.dtype)
+        resized = {}
+        for i, (scale, (ox, oy), size) in enumerate(zip(self.scales, self.offsets.astype(int),
+                                                        self.scaled_sizes)):
+            image = resized.get(size)
+            if image is None:
+                image = frame if size == self.frame_size else cv2.resize(frame, size,
+                                                                         interpolation=self.interpolation)
+                resized[size] = image
+            view = image[oy:oy + self.tile, ox:ox + self.tile]
+            self._batch[i, :view.shape[0], :view.shape[1]] = view
+        return self._batch
+
+    def truncated(self, view, boxes, margin=16):
+        """True for boxes within margin of an edge of view that lies inside the frame (a cut object)
+
+        The margin absorbs box regression error (up to half a stride); a
+        whole object flagged by mistake only becomes eligible for the seam
+        test, which its neighbour-tile twin passes anyway.
+        """
+        ox, oy = self.offsets[view]
+        width, height = self.scaled_sizes[view]
+        x1, y1, x2, y2 = boxes.T
+        return (((x1 < margin) & (ox > 0)) | ((y1 < margin) & (oy > 0))
+                | ((x2 > self.tile - margin) & (ox + self.tile < width))
+                | ((y2 > self.tile - margin) & (oy + self.tile < height)))
+
+
+def _clip(boxes, regions):
+    """(M, M, 4) boxes[i] clipped to regions[i, j] (empty where they do not meet)"""
+    lo = np.maximum(boxes[:, None, :2], regions[..., :2])
+    hi = np.maximum(np.minimum(boxes[:, None, 2:], regions[..., 2:]), lo)
+    return np.concatenate([lo, hi], axis=-1)
+
+
+def _pair_iou(a, b):
+    """Elementwise IoU of two (..., 4) box arrays"""
+    inter = (np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+             * np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None))
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter + 1e-9)
+
+
+def merge_detections(results, layout, iou_threshold=0.5, seam_iou_threshold=0.5, edge_margin=16):
+    """Merge per-view detections (postprocessor output, one dict per view) into frame coordinates
+
+    Detections of the same view never suppress each other; the model's
+    own NMS already handled them. Across views, two detections are the
+    same object when their IoU exceeds iou_threshold or, if either is cut
+    by a tile edge, when the parts of both boxes inside the region the two
+    views share overlap by more than seam_iou_threshold: within that region
+    both views see the object whole, so fragments of one person line up
+    there even though the full boxes barely overlap. Uncut detections rank
+    before cut ones. A cut survivor grows to the union of its fragments,
+    and every keypoint is taken from whichever duplicate sees it with the
+    highest visibility. Optional 'classes' keep different classes apart;
+    masks are not merged.
+    """
+    views = np.concatenate([np.full(len(r['scores']), i) for i, r in enumerate(results)]).astype(int)
+    has_kpts = 'keypoints' in results[0]
+    has_classes = 'classes' in results[0]
+    empty = {'boxes': np.zeros((0, 4), np.float32), 'scores': np.zeros(0, np.float32),
+             'views': views[:0]}
+    if has_kpts:
+        empty['keypoints'] = np.zeros((0,) + results[0]['keypoints'].shape[1:], np.float32)
+    if has_classes:
+        empty['classes'] = np.zeros(0, np.int64)
+    if len(views) == 0:
+        return empty
+
+    cut = np.concatenate([layout.truncated(i, r['boxes'], edge_margin) for i, r in enumerate(results)])
+    scale = layout.scales[views][:, None]
+    offset = layout.offsets[views]
+    boxes = (np.concatenate([r['boxes'] for r in results]) + np.tile(offset, 2)) / scale
+    scores = np.concatenate([r['scores'] for r in results])
+    keypoints = classes = None
+    if has_kpts:
+        keypoints = np.concatenate([r['keypoints'] for r in results]).copy()
+        keypoints[..., :2] = (keypoints[..., :2] + offset[:, None]) / scale[:, None]
+    if has_classes:
+        classes = np.concatenate([r['classes'] for r in results])
+
+    order = np.lexsort((-scores, cut))
+    boxes, scores, views, cut = boxes[order], scores[order], views[order], cut[order]
+    inter, union = intersection_union(boxes)
+    duplicate = inter > iou_threshold * union
+    seam = np.flatnonzero(cut)
+    if len(seam):
+        # Shared region of each (any, cut) view pair; only the cut columns need the seam test
+        fp = layout.footprints[views]
+        shared = np.concatenate([np.maximum(fp[:, None, :2], fp[None, seam, :2]),
+                                 np.minimum(fp[:, None, 2:], fp[None, seam, 2:])], axis=-1)
+        within = _pair_iou(_clip(boxes, shared), _clip(boxes[seam], shared.transpose(1, 0, 2)).transpose(1, 0, 2))
+        duplicate[:, seam] |= within > seam_iou_threshold
+        duplicate[seam, :] |= (within > seam_iou_threshold).T
+    duplicate &= views[:, None] != views[None, :]
+    if has_classes:
+        classes = classes[order]
+        duplicate &= classes[:, None] == classes[None, :]
+    suppresses = np.triu(duplicate, k=1)
+    keep = greedy_keep(suppresses)
+
+    # Cluster every detection with the first surviving detection that suppresses it
+    owner = np.where(keep, np.arange(len(keep)), np.argmax(suppresses & keep[:, None], axis=0))
+    merged = boxes.copy()
+    grow = cut[owner]
+    np.minimum.at(merged[:, 0], owner[grow], boxes[grow, 0])
+    np.minimum.at(merged[:, 1], owner[grow], boxes[grow, 1])
+    np.maximum.at(merged[:, 2], owner[grow], boxes[grow, 2])
+    np.maximum.at(merged[:, 3], owner[grow], boxes[grow, 3])
+
+    result = {'boxes': merged[keep], 'scores': scores[keep], 'views': views[keep]}
+    if has_kpts:
+        keypoints = keypoints[order]
+        # Per (cluster, joint), the member with the highest visibility (ties: the best ranked):
+        # sort by (joint, cluster, visibility, -rank) and take the last row of each group
+        count, joints = keypoints.shape[:2]
+        member = np.repeat(np.arange(count), joints)
+        joint = np.tile(np.arange(joints), count)
+        cluster = np.repeat(owner, joints)
+        rows = np.lexsort((-member, keypoints[..., 2].ravel(), cluster, joint))
+        last = np.append((cluster[rows[1:]] != cluster[rows[:-1]]) | (joint[rows[1:]] != joint[rows[:-1]]), True)
+        rows = rows[last]
+        best = np.zeros((count, joints), dtype=np.int64)
+        best[cluster[rows], joint[rows]] = member[rows]
+        result['keypoints'] = keypoints[best[keep], np.arange(joints)[None, :]]
+    if has_classes:
+        result['classes'] = classes[keep]
+    return result
+
+
+class TiledDetector:
+    """frame -> merged detections: cut tiles, one batched infer call, postprocess, merge
+
+    infer(batch) receives the (views, tile, tile, 3) uint8 batch and
+    returns whatever postprocess() consumes; postprocess returns one dict
+    per view in model-input coordinates, like YOLOv8PosePostprocessor.
+    """
+
+    def __init__(self, layout, infer, postprocess, iou_threshold=0.5, seam_iou_threshold=0.5):
+        self.layout = layout
+        self.infer = infer
+        self.postprocess = postprocess
+        self.iou_threshold = iou_threshold
+        self.seam_iou_threshold = seam_iou_threshold
+
+    def __call__(self, frame):
+        batch = self.layout.cut(frame)
+        results = self.postprocess(self.infer(batch))
+        return merge_detections(results, self.layout, self.iou_threshold, self.seam_iou_threshold)
@@ -0,0 +1,134 @@
+"""
+Image decode and batch blob preparation
+Background decoding plus vectorized resize / normalize / HWC->NCHW into preallocated buffers
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff'}
+
+# torchvision / ONNX model zoo ImageNet statistics (RGB, 0-1 range)
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+# Letterbox grey used by the YOLO exports (whole-frame letterbox, tiles, YUV fast path)
+PAD_VALUE = 114
+
+
+def list_images(directory):
+    """Sorted list of image files directly inside `directory`"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Image directory not found: {directory}")
+    paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not paths:
+        raise FileNotFoundError(f"No images ({', '.join(sorted(IMAGE_EXTENSIONS))}) in {directory}")
+    return paths
+
+
+def _decode(path):
+    start = time.perf_counter()
+    image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Could not decode image: {path}")
+    return image, (time.perf_counter() - start) * 1000
+
+
+class BackgroundDecoder:
+    """Decode image files on a thread pool, keeping `prefetch` batches in flight
+
+    cv2.imread releases the GIL, so decoding overlaps with preprocessing and
+    inference on the calling thread. Iterating yields
+    (images, decode_ms_per_image) batches in input order.
+    """
+
+    def __init__(self, paths, batch_size, workers=2, prefetch=2):
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.prefetch = prefetch
+
+    def __iter__(self):
+        batches = [self.paths[i:i + self.batch_size]
+                   for i in range(0, len(self.paths), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append([pool.submit(_decode, p) for p in batch])
+                if len(in_flight) > self.prefetch:
+                    yield self._collect(in_flight.popleft())
+            while in_flight:
+                yield self._collect(in_flight.popleft())
+
+    @staticmethod
+    def _collect(futures):
+        results = [f.result() for f in futures]
+        return [image for image, _ in results], [ms for _, ms in results]
+
+
+class BatchBlobBuilder:
+    """Build normalized NCHW float32 batches into a preallocated buffer
+
+    Each image is center-cropped (by `crop_fraction`, as a view) and resized
+    straight into a preallocated uint8 NHWC staging buffer; normalization,
+    BGR->RGB and HWC->NCHW then happen in two vectorized passes that write
+    into the preallocated output blob. method='opencv' uses
+    cv2.dnn.blobFromImages instead, for comparison.
+    """
+
+    def __init__(self, max_batch, size=224, mean=IMAGENET_MEAN, std=IMAGENET_STD,
+                 crop_fraction=0.875, swap_rb=True, method='numpy'):
+        if method not in ('numpy', 'opencv'):
+            raise ValueError(f"Unknown preprocessing method '{method}'")
+        self.max_batch = max_batch
+        self.size = size
+        self.crop_fraction = crop_fraction
+        self.swap_rb = swap_rb
+        self.method = method
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+
+        # x_norm = x_uint8 * scale - offset, per channel
+        self._scale = (1.0 / (255.0 * self.std)).reshape(1, 3, 1, 1)
+        self._offset = (self.mean / self.std).reshape(1, 3, 1, 1)
+
+        self.staging = np.empty((max_batch, size, size, 3), dtype=np.uint8)
+        self.blob = np.empty((max_batch, 3, size, size), dtype=np.float32)
+
+    def _center_crop(self, image):
+        h, w = image.shape[:2]
+        side = int(min(h, w) * self.crop_fraction)
+        y0 = (h - side) // 2
+        x0 = (w - side) // 2
+        return image[y0:y0 + side, x0:x0 + side]
+
+    def build(self, images):
+        """Return a (len(images), 3, size, size) view of the preallocated blob"""
+        n = len(images)
+        if n > self.max_batch:
+            raise ValueError(f"Batch of {n} exceeds preallocated max_batch={self.max_batch}")
+
+        if self.method == 'opencv':
+            crops = [self._center_crop(image) for image in images]
+            blob = cv2.dnn.blobFromImages(crops, scalefactor=1.0 / 255.0,
+                                          size=(self.size, self.size),
+                                          mean=tuple(float(m) for m in self.mean * 255.0),
+                                          swapRB=self.swap_rb, crop=False)
+            np.divide(blob, self.std.reshape(1, 3, 1, 1), out=self.blob[:n])
+            return self.blob[:n]
+
+        for i, image in enumerate(images):
+            cv2.resize(self._center_crop(image), (self.size, self.size),
+                       dst=self.staging[i], interpolation=cv2.INTER_LINEAR)
+
+        nhwc = self.staging[:n, :, :, ::-1] if self.swap_rb else self.staging[:n]
+        out = self.blob[:n]
+        np.multiply(nhwc.transpose(0, 3, 1, 2), self._scale, out=out, casting='unsafe')
+        out -= self._offset
+        return out
@@ -0,0 +1,135 @@
+"""
+Fused YUV420 -> letterboxed model input
+Camera I420 buffers are resized plane by plane and colour-converted once,
+straight into a preallocated letterboxed tensor
+"""
+
+import cv2
+import numpy as np
+
+from src.preprocessing.images import PAD_VALUE
+
+
+def _full_to_video_range_lut():
+    """uint8 LUTs taking full-range (sYCC/JPEG) Y and UV to the video range cvtColor expects"""
+    x = np.arange(256, dtype=np.float32)
+    y = np.clip(np.round(16 + x * 219 / 255), 0, 255).astype(np.uint8)
+    uv = np.clip(np.round(128 + (x - 128) * 224 / 255), 0, 255).astype(np.uint8)
+    return y, uv
+
+
+class YUV420Letterbox:
+    """Map an I420 frame (Y plane, then U and V at half resolution) into a letterboxed model input
+
+    The naive path converts the full frame to BGR, resizes, then pastes
+    into a padded canvas, which is three full-size intermediate images per
+    frame. Here the three planes are resized straight to the output size
+    into a small I420 buffer (1.5 bytes per output pixel), and one
+    cvtColor writes BGR/RGB into the content rows of the preallocated
+    output. The padding is filled once at construction. Nothing is
+    allocated per frame. Resampling uses cv2.resize rather than cv2.remap
+    with cached 2-D maps: for an axis-aligned scale resize keeps separable
+    per-axis tables and is about 3x faster on the Y plane.
+
+    `stride` is the Y row pitch of the camera buffer when rows are padded
+    (the chroma pitch is half of it); `roi=(x, y, w, h)` letterboxes only
+    that part of the frame, e.g. one tile (origin and size must be even so
+    the chroma planes line up). `full_range=True` treats the input as
+    full-range BT.601 (the sYCC colour space rpicam reports) by mapping it
+    to video range with a LUT on the small buffer before conversion; set
+    False for video-range input.
+    """
+
+    def __init__(self, frame_size, size=640, stride=None, roi=None, order='bgr', full_range=True,
+                 interpolation=cv2.INTER_LINEAR, pad_value=PAD_VALUE):
+        if order not in ('bgr', 'rgb'):
+            raise ValueError(f"Unknown channel order '{order}'")
+        width, height = frame_size
+        if width % 2 or height % 2:
+            raise ValueError("I420 frames need even width and height")
+        self.frame_size = (width, height)
+        self.stride = stride or width
+        self.size = size
+        self.full_range = full_range
+        self._code = cv2.COLOR_YUV2BGR_I420 if order == 'bgr' else cv2.COLOR_YUV2RGB_I420
+
+        x0, y0, roi_w, roi_h = roi or (0, 0, width, height)
+        if x0 % 2 or y0 % 2 or roi_w % 2 or roi_h % 2:
+            raise ValueError("I420 ROI needs an even origin and size")
+        self.roi = (x0, y0, roi_w, roi_h)
+        # Even content size so the staging buffer is valid I420
+        self.scale = min(size / roi_w, size / roi_h)
+        out_w = min(size, int(round(roi_w * self.scale / 2)) * 2)
+        out_h = min(size, int(round(roi_h * self.scale / 2)) * 2)
+        self.content = (out_w, out_h)
+        self.pad = ((size - out_w) // 2, (size - out_h) // 2)
+        self.interpolation = interpolation
+
+        # I420 staging buffer at output size, with plane views into it
+        self.staging = np.empty((out_h * 3 // 2, out_w), dtype=np.uint8)
+        flat = self.staging.reshape(-1)
+        chroma = (out_h // 2) * (out_w // 2)
+        self._y = self.staging[:out_h]
+        self._u = flat[out_h * out_w:out_h * out_w + chroma].reshape(out_h // 2, out_w // 2)
+        self._v = flat[out_h * out_w + chroma:].reshape(out_h // 2, out_w // 2)
+        if full_range:
+            self._lut_y, self._lut_uv = _full_to_video_range_lut()
+
+        self.output = np.full((size, size, 3), pad_value, dtype=np.uint8)
+        left, top = self.pad
+        self._content_view = self.output[top:top + out_h, left:left + out_w]
+        # Full rows are contiguous, so cvtColor can write there directly; otherwise go via a buffer
+        self._direct = out_w == size
+        self._converted = None if self._direct else np.empty((out_h, out_w, 3), dtype=np.uint8)
+        self.blob = None
+
+    def planes(self, buffer):
+        """(Y, U, V) views of the ROI in a camera buffer: flat, or (rows, stride) shaped"""
+        width, height = self.frame_size
+        x0, y0, roi_w, roi_h = self.roi
+        flat = np.asarray(buffer).reshape(-1)
+        stride, half = self.stride, self.stride // 2
+        y_end = height * stride
+        chroma = (height // 2) * half
+        y = flat[:y_end].reshape(height, stride)[y0:y0 + roi_h, x0:x0 + roi_w]
+        cy, cx, ch, cw = y0 // 2, x0 // 2, roi_h // 2, roi_w // 2
+        u = flat[y_end:y_end + chroma].reshape(height // 2, half)[cy:cy + ch, cx:cx + cw]
+        v = flat[y_end + chroma:y_end + 2 * chroma].reshape(height // 2, half)[cy:cy + ch, cx:cx + cw]
+        return y, u, v
+
+    def __call__(self, buffer):
+        """(size, size, 3) uint8 letterboxed frame; the same array every call"""
+        y, u, v = self.planes(buffer)
+        width, height = self.content
+        cv2.resize(y, (width, height), dst=self._y, interpolation=self.interpolation)
+        cv2.resize(u, (width // 2, height // 2), dst=self._u, interpolation=self.interpolation)
+        cv2.resize(v, (width // 2, height // 2), dst=self._v, interpolation=self.interpolation)
+        if self.full_range:
+            cv2.LUT(self._y, self._lut_y, dst=self._y)
+            cv2.LUT(self._u, self._lut_uv, dst=self._u)
+            cv2.LUT(self._v, self._lut_uv, dst=self._v)
+        if self._direct:
+            cv2.cvtColor(self.staging, self._code, dst=self._content_view)
+        else:
+            cv2.cvtColor(self.staging, self._code, dst=self._converted)
+            self._content_view[...] = self._converted
+        return self.output
+
+    def to_blob(self, buffer, swap_rb=False):
+        """(1, 3, size, size) float32 in 0-1 (the YOLO ONNX input); the same array every call
+
+        Only the content rows are rewritten per frame; the padding is
+        normalized once. swap_rb flips the channel order set by `order`.
+        """
+        image = self(buffer)
+        if self.blob is None:
+            self.blob = np.empty((1, 3, self.size, self.size), dtype=np.float32)
+            src = image[..., ::-1] if swap_rb else image
+            np.multiply(src.transpose(2, 0, 1), 1.0 / 255.0, out=self.blob[0], casting='unsafe')
+            return self.blob
+        left, top = self.pad
+        width, height = self.content
+        content = self._content_view[..., ::-1] if swap_rb else self._content_view
+        np.multiply(content.transpose(2, 0, 1), 1.0 / 255.0,
+                    out=self.blob[0, :, top:top + height, left:left + width], casting='unsafe')
+        return self.blob
@@ -0,0 +1,100 @@
+"""
+Print-resolution image derivatives for PDF reports
+Resamples figures to the size they are printed at, in parallel, cached by source content hash
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+
+from PIL import Image
+
+DEFAULT_CACHE = Path(os.environ.get('HAILO_BENCH_IMAGE_CACHE',
+                                    Path.home() / '.cache' / 'hailo-bench' / 'images'))
+
+# Bump when the resampling recipe changes so old derivatives are not reused
+RECIPE_VERSION = 1
+
+
+def derivative_key(source, width_px, height_px):
+    """Cache key: source content hash plus the target pixel size and recipe"""
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return f"{digest.hexdigest()[:24]}_{width_px}x{height_px}_r{RECIPE_VERSION}"
+
+
+def _resample(source, target, width_px, height_px, dpi):
+    """Write a flattened, Lanczos-resampled, palette-free PNG derivative"""
+    with Image.open(source) as img:
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, 'white')
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        img = img.resize((width_px, height_px), Image.LANCZOS, reducing_gap=3.0)
+        # '.png.tmp' so clear() never mistakes a half-written file for a derivative
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix='.png.tmp')
+        os.close(fd)
+        try:
+            img.save(tmp, format='PNG', optimize=True, dpi=(dpi, dpi))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    os.replace(tmp, target)
+    return target
+
+
+class ImageCache:
+    """Resolution-appropriate derivatives of report images
+
+    prepare() maps each source image to a copy resampled to
+    width_in x height_in at `dpi`. Derivatives are stored under
+    <root>/<sha256-prefix>_<w>x<h>_r<recipe>.png, so an unchanged graph is
+    never resampled twice and a regenerated one gets a fresh entry.
+    Missing derivatives are built in a process pool.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE, workers=None):
+        self.root = Path(root).expanduser()
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, sources, width_in, height_in, dpi):
+        """{source path: derivative path} for every existing source"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        width_px, height_px = round(width_in * dpi), round(height_in * dpi)
+        result, todo = {}, []
+        for source in map(Path, sources):
+            if not source.exists():
+                continue
+            target = self.root / f"{derivative_key(source, width_px, height_px)}.png"
+            result[source] = target
+            if target.exists():
+                self.hits += 1
+            else:
+                self.misses += 1
+                todo.append((source, target))
+
+        workers = min(self.workers or os.cpu_count() or 1, len(todo))
+        if workers <= 1:
+            for source, target in todo:
+                _resample(source, target, width_px, height_px, dpi)
+        elif todo:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_resample, source, target, width_px, height_px, dpi)
+                           for source, target in todo]
+                for future in futures:
+                    future.result()
+        return result
+
+    def clear(self):
+        """Delete every cached derivative"""
+        for path in self.root.glob('*.png'):
+            path.unlink()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+YOLOv5-seg mask postprocessing microbenchmark
+Per-frame time and memory of mask assembly as a function of instance count
+
+Run from the repository root:
+    python -m src.segmentation.benchmark_postprocess --instances 1 10 50
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.benchmarking.latency import LatencyHistogram
+from src.benchmarking.results_store import hailo_baseline
+from src.segmentation.postprocess import MASK_FORMATS, YOLOv5SegPostprocessor
+
+
+def synthetic_outputs(num_instances, input_size=640, num_classes=80, num_protos=32, seed=0):
+    """One image of YOLOv5-seg outputs with `num_instances` separated objects
+
+    Objects sit on a grid so NMS keeps all of them; every other anchor is
+    background. Prototypes are smooth random fields, as a trained head
+    produces.
+    """
+    rng = np.random.default_rng(seed)
+    anchors = 3 * sum((input_size // s) ** 2 for s in (8, 16, 32))
+    pred = np.zeros((1, anchors, 5 + num_classes + num_protos), dtype=np.float32)
+    pred[0, :, 4] = rng.uniform(0, 0.1, anchors)
+
+    grid = int(np.ceil(np.sqrt(max(num_instances, 1))))
+    cell = input_size / grid
+    for i, idx in enumerate(rng.choice(anchors, num_instances, replace=False)):
+        row, col = divmod(i, grid)
+        size = cell * rng.uniform(0.5, 0.9, 2)
+        pred[0, idx, :4] = [(col + 0.5) * cell, (row + 0.5) * cell, size[0], size[1]]
+        pred[0, idx, 4] = rng.uniform(0.6, 1.0)
+        pred[0, idx, 5 + rng.integers(num_classes)] = 0.9
+        pred[0, idx, 5 + num_classes:] = rng.normal(0, 1, num_protos)
+
+    proto_size = input_size // 4
+    small = rng.normal(0, 1, (num_protos, 20, 20)).astype(np.float32)
+    protos = np.stack([cv2.resize(p, (proto_size, proto_size)) for p in small])[None]
+    return pred, protos
+
+
+def naive_masks(post, detections, protos):
+    """Reference assembly: sigmoid, full-frame upsample and crop for every instance"""
+    size = post.input_size
+    coefs_all = detections['coefs']
+    probs = 1.0 / (1.0 + np.exp(-(coefs_all @ protos[0].reshape(len(protos[0]), -1))))
+    probs = probs.reshape(len(coefs_all), *protos.shape[2:])
+    masks = np.zeros((len(coefs_all), size, size), dtype=bool)
+    for i, (x0, y0, x1, y1) in enumerate(detections['mask_boxes']):
+        full = cv2.resize(probs[i], (size, size), interpolation=cv2.INTER_LINEAR)
+        masks[i, y0:y1, x0:x1] = full[y0:y1, x0:x1] > 0.5
+    return masks
+
+
+def mask_nbytes(masks, mask_format):
+    """Bytes held by one image's mask output"""
+    if mask_format == 'dense':
+        return masks.nbytes
+    if mask_format == 'packed':
+        return sum(m['bits'].nbytes for m in masks)
+    return sum(m.nbytes for m in masks)
+
+
+def measure(fn, frames):
+    """(latency histogram, peak traced bytes of one extra call)"""
+    for _ in range(3):
+        fn()
+    hist = LatencyHistogram()
+    for _ in range(frames):
+        start = time.perf_counter()
+        fn()
+        hist.record((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return hist, peak
+
+
+def benchmark_seg_postprocess(instance_counts=(1, 5, 10, 20, 50, 100), frames=50,
+                              formats=MASK_FORMATS, compare_naive=True):
+    """Mask postprocessing time and memory for several instance counts"""
+
+    print("=" * 70)
+    print("YOLOv5n-Seg Mask Postprocessing Microbenchmark")
+    print("=" * 70)
+    print()
+
+    hailo = hailo_baseline('yolov5n_seg')
+    budget_ms = hailo['latency_ms'] if hailo else None
+    if budget_ms:
+        print(f"Inference budget:    {budget_ms:.2f} ms (Hailo-8L HW latency, {hailo['fps']:.1f} FPS)")
+    print(f"🎯 {frames} frames per setting; memory = tracemalloc peak of one frame")
+    print()
+
+    results = []
+    print(f"{'Inst':>5} {'Format':<8} {'Mean ms':>9} {'p99 ms':>8} {'Peak MB':>8} "
+          f"{'Masks KB':>9} {'Buffers MB':>11}")
+    for count in instance_counts:
+        pred, protos = synthetic_outputs(count)
+        for fmt in formats:
+            post = YOLOv5SegPostprocessor(mask_format=fmt, max_detections=max(100, count))
+            hist, peak = measure(lambda: post(pred, protos), frames)
+            out = post(pred, protos)[0]
+            row = {'instances': count, 'format': fmt, 'detections': len(out['scores']),
+                   'mean_ms': hist.mean, 'p99_ms': hist.percentile(99), 'peak_bytes': peak,
+                   'mask_bytes': mask_nbytes(out['masks'], fmt), 'buffer_bytes': post.buffer_nbytes()}
+            results.append(row)
+            print(f"{count:>5} {fmt:<8} {row['mean_ms']:>9.2f} {row['p99_ms']:>8.2f} "
+                  f"{peak / 1e6:>8.2f} {row['mask_bytes'] / 1e3:>9.1f} {row['buffer_bytes'] / 1e6:>11.2f}")
+
+        if compare_naive:
+            post = YOLOv5SegPostprocessor(mask_format='dense', max_detections=max(100, count))
+            out = post(pred, protos)[0]
+            # Coefficients of the kept instances, recovered by matching boxes
+            xy, wh = pred[0, :, :2], pred[0, :, 2:4] / 2.0
+            boxes = np.concatenate([xy - wh, xy + wh], axis=1)
+            idx = [int(np.argmin(np.abs(boxes - b).sum(axis=1))) for b in out['boxes']]
+            reference = {'coefs': pred[0, idx, 85:], 'mask_boxes': out['mask_boxes']}
+            hist, peak = measure(lambda: naive_masks(post, reference, protos), frames)
+            mismatch = np.mean(naive_masks(post, reference, protos) != out['masks']) if count else 0.0
+            print(f"{count:>5} {'naive':<8} {hist.mean:>9.2f} {hist.percentile(99):>8.2f} "
+                  f"{peak / 1e6:>8.2f} {'':>9} {'':>11}   (pixel mismatch {mismatch:.1e})")
+        print()
+
+    if budget_ms:
+        fastest = {}
+        for r in results:
+            fastest[r['instances']] = min(fastest.get(r['instances'], r['mean_ms']), r['mean_ms'])
+        print("Share of Hailo inference budget (fastest format):")
+        for count, ms in fastest.items():
+            print(f"   {count:>4} instances: {ms / budget_ms * 100:5.1f}%")
+    print("=" * 70)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='YOLOv5-seg mask postprocessing microbenchmark')
+    parser.add_argument('--instances', type=int, nargs='+', default=[1, 5, 10, 20, 50, 100],
+                        help='Instances per frame (default: 1 5 10 20 50 100)')
+    parser.add_argument('--frames', type=int, default=50,
+                        help='Timed frames per setting (default: 50)')
+    parser.add_argument('--formats', nargs='+', choices=MASK_FORMATS, default=list(MASK_FORMATS),
+                        help='Mask output formats to time (default: all)')
+    parser.add_argument('--no-naive', action='store_true',
+                        help='Skip the full-resolution reference implementation')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    benchmark_seg_postprocess(instance_counts=args.instances, frames=args.frames,
+                              formats=args.formats, compare_naive=not args.no_naive)
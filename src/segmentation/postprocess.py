@@ -0,0 +1,183 @@
+"""
+Memory-efficient YOLOv5-seg postprocessing
+Batched detection decode and NMS, one prototype matmul per image, ROI-only mask upsampling
+"""
+
+import cv2
+import numpy as np
+
+from src.pose_estimation.postprocess import batched_nms
+
+MASK_FORMATS = ('dense', 'roi', 'packed', 'rle')
+
+
+def encode_rle(mask):
+    """Row-major run lengths of a 2-D bool mask, starting with a (possibly empty) run of zeros"""
+    flat = mask.ravel()
+    if flat.size == 0:
+        return np.zeros(1, dtype=np.int32)
+    bounds = np.concatenate([[0], np.flatnonzero(flat[1:] != flat[:-1]) + 1, [flat.size]])
+    counts = np.diff(bounds)
+    if flat[0]:
+        counts = np.concatenate([[0], counts])
+    return counts.astype(np.int32)
+
+
+def decode_rle(counts, shape):
+    """Inverse of encode_rle()"""
+    values = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    return np.repeat(values, counts).reshape(shape)
+
+
+def unpack_mask(packed):
+    """Bool mask from the 'packed' format {'shape': (h, w), 'bits': uint8}"""
+    h, w = packed['shape']
+    return np.unpackbits(packed['bits'], count=h * w).astype(bool).reshape(h, w)
+
+
+class YOLOv5SegPostprocessor:
+    """Decode YOLOv5-seg outputs into boxes, classes and instance masks
+
+    Expects the ultralytics / Hailo model zoo layout: predictions
+    (B, N, 5 + classes + protos) holding cx, cy, w, h, objectness, class
+    scores and mask coefficients, plus prototypes (B, P, H, W) or NHWC.
+
+    Mask assembly for the kept instances of an image is one matmul into a
+    reused buffer. Each instance's proto-resolution logits are then cropped
+    to its box (plus one cell of interpolation support), upsampled, and
+    thresholded in logit space, so no sigmoid runs and no full-frame
+    float mask is ever built. Output formats:
+
+    - 'dense':  (K, S, S) bool views into a reused buffer; copy to keep them
+    - 'roi':    box-local bool arrays, placed at 'mask_boxes'
+    - 'packed': box-local masks as np.packbits, see unpack_mask()
+    - 'rle':    box-local row-major run lengths, see decode_rle()
+    """
+
+    def __init__(self, input_size=640, num_classes=80, num_protos=32, score_threshold=0.25,
+                 iou_threshold=0.45, mask_threshold=0.5, max_candidates=1000, max_detections=100,
+                 mask_format='dense', exact_nms=True):
+        if mask_format not in MASK_FORMATS:
+            raise ValueError(f"Unknown mask format '{mask_format}' (choose from {', '.join(MASK_FORMATS)})")
+        self.input_size = input_size
+        self.num_classes = num_classes
+        self.num_protos = num_protos
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self.max_candidates = max_candidates
+        self.max_detections = max_detections
+        self.mask_format = mask_format
+        self.exact_nms = exact_nms
+        self._mask_logit = np.log(mask_threshold / (1.0 - mask_threshold))
+        # Grown on demand and reused across calls
+        self._proto_buffer = np.empty((0, 0), dtype=np.float32)
+        self._dense = np.zeros((0, input_size, input_size), dtype=bool)
+        self._dirty = []
+
+    def buffer_nbytes(self):
+        """Bytes currently held by the reused matmul and dense mask buffers"""
+        return self._proto_buffer.nbytes + self._dense.nbytes
+
+    def _proto_rows(self, rows, cols):
+        if self._proto_buffer.shape[0] < rows or self._proto_buffer.shape[1] != cols:
+            capacity = max(rows, min(2 * self._proto_buffer.shape[0], self.max_detections))
+            self._proto_buffer = np.empty((capacity, cols), dtype=np.float32)
+        return self._proto_buffer[:rows]
+
+    def _dense_slots(self, count):
+        """Reset the regions written last call and make room for `count` masks"""
+        for slot, y0, y1, x0, x1 in self._dirty:
+            self._dense[slot, y0:y1, x0:x1] = False
+        self._dirty = []
+        if self._dense.shape[0] < count:
+            size = self.input_size
+            self._dense = np.zeros((max(count, 2 * self._dense.shape[0]), size, size), dtype=bool)
+
+    def __call__(self, pred, protos):
+        """Decode one batch; returns one dict per image"""
+        if protos.shape[1] != self.num_protos:
+            protos = protos.transpose(0, 3, 1, 2)
+        batch = pred.shape[0]
+        nc = self.num_classes
+
+        image_idx, anchor_idx = np.nonzero(pred[..., 4] > self.score_threshold)
+        cand = pred[image_idx, anchor_idx]
+        cls_scores = cand[:, 5:5 + nc] * cand[:, 4:5]
+        classes = cls_scores.argmax(axis=1)
+        scores = cls_scores[np.arange(len(cand)), classes]
+
+        ok = np.flatnonzero(scores > self.score_threshold)
+        if len(ok) > self.max_candidates:
+            ok = ok[np.argpartition(-scores[ok], self.max_candidates)[:self.max_candidates]]
+        cand, image_idx, classes, scores = cand[ok], image_idx[ok], classes[ok], scores[ok]
+
+        xy, wh = cand[:, :2], cand[:, 2:4] / 2.0
+        boxes = np.concatenate([xy - wh, xy + wh], axis=1)
+        keep = batched_nms(boxes, scores, image_idx * nc + classes, self.iou_threshold,
+                           exact=self.exact_nms)
+
+        keep = keep[np.argsort(image_idx[keep], kind='stable')]
+        counts = np.minimum(np.bincount(image_idx[keep], minlength=batch), self.max_detections)
+        starts = np.concatenate([[0], np.cumsum(np.bincount(image_idx[keep], minlength=batch))])
+        if self.mask_format == 'dense':
+            self._dense_slots(int(counts.sum()))
+
+        results = []
+        slot = 0
+        for b in range(batch):
+            sel = keep[starts[b]:starts[b] + counts[b]]
+            mask_boxes, masks = self._masks(cand[sel, 5 + nc:], boxes[sel], protos[b], slot)
+            slot += len(sel)
+            results.append({
+                'boxes': boxes[sel],
+                'scores': scores[sel],
+                'classes': classes[sel],
+                'mask_boxes': mask_boxes,
+                'masks': masks,
+            })
+        return results
+
+    def _masks(self, coefs, boxes, protos, slot):
+        """Masks for one image's kept instances"""
+        count = len(coefs)
+        proto_h, proto_w = protos.shape[1:]
+        factor = self.input_size // proto_w
+        mask_boxes = np.clip(np.round(boxes), 0, self.input_size).astype(np.int32)
+        if count == 0:
+            empty = self._dense[slot:slot] if self.mask_format == 'dense' else []
+            return mask_boxes, empty
+
+        logits = self._proto_rows(count, proto_h * proto_w)
+        np.matmul(coefs.astype(np.float32, copy=False),
+                  protos.reshape(len(protos), -1).astype(np.float32, copy=False), out=logits)
+        logits = logits.reshape(count, proto_h, proto_w)
+
+        masks = []
+        for i, (x0, y0, x1, y1) in enumerate(mask_boxes):
+            if x1 <= x0 or y1 <= y0:
+                crop = np.zeros((max(y1 - y0, 0), max(x1 - x0, 0)), dtype=bool)
+            else:
+                # Proto cells covering the box, plus one cell for bilinear support
+                px0, py0 = max(x0 // factor - 1, 0), max(y0 // factor - 1, 0)
+                px1 = min(-(-x1 // factor) + 1, proto_w)
+                py1 = min(-(-y1 // factor) + 1, proto_h)
+                roi = logits[i, py0:py1, px0:px1]
+                up = cv2.resize(roi, ((px1 - px0) * factor, (py1 - py0) * factor),
+                                interpolation=cv2.INTER_LINEAR)
+                oy, ox = y0 - py0 * factor, x0 - px0 * factor
+                crop = up[oy:oy + y1 - y0, ox:ox + x1 - x0] > self._mask_logit
+
+            if self.mask_format == 'dense':
+                self._dense[slot + i, y0:y1, x0:x1] = crop
+                self._dirty.append((slot + i, y0, y1, x0, x1))
+            elif self.mask_format == 'roi':
+                masks.append(crop)
+            elif self.mask_format == 'packed':
+                masks.append({'shape': crop.shape, 'bits': np.packbits(crop)})
+            else:
+                masks.append(encode_rle(crop))
+
+        if self.mask_format == 'dense':
+            return mask_boxes, self._dense[slot:slot + count]
+        return mask_boxes, masks
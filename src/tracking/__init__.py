@@ -0,0 +1 @@
+"""Multi-object tracking module"""
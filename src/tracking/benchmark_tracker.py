@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SORT tracker microbenchmark
+Per-frame tracker cost against track count, and detector invocations saved by tracking between detections
+
+Run from the repository root:
+    python -m src.tracking.benchmark_tracker --tracks 10 100 500 --detect-every 1 3 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.benchmarking.latency import LatencyHistogram
+from src.benchmarking.results_store import hailo_baseline
+from src.tracking.sort import MATCHERS, SortTracker, associate, iou_matrix
+
+
+def synthetic_scene(num_objects, num_frames, size=(1920, 1080), noise_px=1.5, miss_rate=0.05, seed=0):
+    """(ground-truth boxes (F, N, 4), detections per frame) for objects moving at constant speed
+
+    Objects bounce off the frame edges; detections are ground truth with
+    pixel noise and a fraction of missed objects.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    dims = rng.uniform(30, 80, (num_objects, 2)) * np.array([0.6, 1.2])
+    pos = rng.uniform([0, 0], [w, h], (num_objects, 2)) - dims / 2
+    vel = rng.uniform(-3, 3, (num_objects, 2))
+    truth, detections = [], []
+    for _ in range(num_frames):
+        pos += vel
+        bounce = (pos < 0) | (pos + dims > [w, h])
+        vel[bounce] *= -1
+        pos = np.clip(pos, 0, np.array([w, h]) - dims)
+        boxes = np.concatenate([pos, pos + dims], axis=1)
+        truth.append(boxes)
+        seen = rng.random(num_objects) >= miss_rate
+        detections.append(boxes[seen] + rng.normal(0, noise_px, (seen.sum(), 4)))
+    return np.stack(truth), detections
+
+
+def run_tracker(truth, detections, detect_every, matcher='greedy'):
+    """Track a scene, running the 'detector' every detect_every frames"""
+    tracker = SortTracker(min_hits=2, max_age=2, matcher=matcher)
+    update_ms, predict_ms = LatencyHistogram(), LatencyHistogram()
+    last_id = np.zeros(truth.shape[1], dtype=np.int64)
+    switches = covered = 0
+    predicted_iou = []
+    for frame, (gt, dets) in enumerate(zip(truth, detections)):
+        start = time.perf_counter()
+        if frame % detect_every == 0:
+            out = tracker.update(dets)
+            update_ms.record((time.perf_counter() - start) * 1000)
+        else:
+            out = tracker.predict()
+            predict_ms.record((time.perf_counter() - start) * 1000)
+
+        iou = iou_matrix(gt, out['boxes'])
+        matches, _, _ = associate(iou, 0.5)
+        covered += len(matches)
+        objects, tracks = matches[:, 0], matches[:, 1]
+        ids = out['ids'][tracks]
+        switches += int(np.count_nonzero((last_id[objects] != 0) & (last_id[objects] != ids)))
+        last_id[objects] = ids
+        if frame % detect_every:
+            predicted_iou.extend(iou[objects, tracks].tolist())
+    return {
+        'update_ms': update_ms.mean if update_ms.count else 0.0,
+        'update_p99_ms': update_ms.percentile(99) if update_ms.count else 0.0,
+        'predict_ms': predict_ms.mean if predict_ms.count else 0.0,
+        'coverage': covered / truth.shape[0] / truth.shape[1],
+        'id_switches': switches,
+        'predicted_iou': float(np.mean(predicted_iou)) if predicted_iou else None,
+    }
+
+
+def benchmark_tracker(track_counts=(10, 50, 100, 200, 500), detect_every=(1, 3, 5), frames=200,
+                      matcher='greedy'):
+    """Tracker cost per frame and tracking quality for several track counts and detector intervals"""
+
+    print("=" * 70)
+    print("SORT Tracker Microbenchmark")
+    print("=" * 70)
+    print()
+
+    hailo = hailo_baseline('yolov8s_pose')
+    detector_ms = hailo['latency_ms'] if hailo else None
+    if detector_ms:
+        print(f"Detector cost:       {detector_ms:.2f} ms (Hailo-8L yolov8s_pose HW latency)")
+    print(f"🎯 {frames} frames per setting, {matcher} association, 1080p scene")
+    print()
+
+    results = []
+    print(f"{'Tracks':>6} {'Every':>5} {'Upd ms':>8} {'p99 ms':>8} {'Pred ms':>8} {'Cover':>7} "
+          f"{'IDsw':>5} {'Pred IoU':>8} {'Det saved':>9} {'Frame ms':>9}")
+    for count in track_counts:
+        truth, detections = synthetic_scene(count, frames)
+        for k in detect_every:
+            r = run_tracker(truth, detections, k, matcher)
+            r.update({'tracks': count, 'detect_every': k, 'detector_saved': 1 - 1 / k})
+            # Average per-frame cost of detector + tracker when the detector runs every k frames
+            tracker_ms = (r['update_ms'] + (k - 1) * r['predict_ms']) / k
+            r['frame_ms'] = detector_ms / k + tracker_ms if detector_ms else None
+            results.append(r)
+            iou = f"{r['predicted_iou']:>8.3f}" if r['predicted_iou'] is not None else f"{'-':>8}"
+            frame_ms = f"{r['frame_ms']:>9.2f}" if r['frame_ms'] is not None else f"{'-':>9}"
+            print(f"{count:>6} {k:>5} {r['update_ms']:>8.3f} {r['update_p99_ms']:>8.3f} "
+                  f"{r['predict_ms']:>8.3f} {r['coverage'] * 100:>6.1f}% {r['id_switches']:>5} {iou} "
+                  f"{r['detector_saved'] * 100:>8.0f}% {frame_ms}")
+        print()
+
+    print("Cover = ground-truth objects matched by a reported track (IoU ≥ 0.5) per frame")
+    if detector_ms:
+        print("Frame ms = detector latency / k + tracker cost, averaged over frames")
+    print("=" * 70)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='SORT tracker microbenchmark')
+    parser.add_argument('--tracks', type=int, nargs='+', default=[10, 50, 100, 200, 500],
+                        help='Objects in the scene (default: 10 50 100 200 500)')
+    parser.add_argument('--detect-every', type=int, nargs='+', default=[1, 3, 5],
+                        help='Run the detector every k frames (default: 1 3 5)')
+    parser.add_argument('--frames', type=int, default=200,
+                        help='Frames per setting (default: 200)')
+    parser.add_argument('--matcher', choices=MATCHERS, default='greedy',
+                        help='Association method (hungarian needs scipy)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    benchmark_tracker(track_counts=args.tracks, detect_every=args.detect_every, frames=args.frames,
+                      matcher=args.matcher)
@@ -0,0 +1,263 @@
+"""
+Vectorized SORT tracker
+Kalman box prediction and IoU association for all tracks at once, so a detector can run every k frames
+"""
+
+import numpy as np
+
+# Constant-velocity model over [cx, cy, area, aspect, vcx, vcy, varea], as in SORT
+_F = np.eye(7, dtype=np.float64)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 1e-4])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+MATCHERS = ('greedy', 'hungarian')
+
+
+def iou_matrix(a, b):
+    """IoU between every box of a (N, 4) and b (M, 4), xyxy, as an (N, M) array"""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)), dtype=np.float64)
+    inter = np.minimum.outer(a[:, 2], b[:, 2])
+    inter -= np.maximum.outer(a[:, 0], b[:, 0])
+    np.maximum(inter, 0, out=inter)
+    h = np.minimum.outer(a[:, 3], b[:, 3])
+    h -= np.maximum.outer(a[:, 1], b[:, 1])
+    np.maximum(h, 0, out=h)
+    inter *= h
+    union = np.add.outer((a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1]),
+                         (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1]))
+    union -= inter
+    return inter / (union + 1e-9)
+
+
+def boxes_to_z(boxes):
+    """xyxy boxes -> [cx, cy, area, aspect] measurements"""
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w * h, w / np.maximum(h, 1e-6)], axis=1)
+
+
+def x_to_boxes(x):
+    """Kalman states -> xyxy boxes"""
+    area = np.maximum(x[:, 2], 1e-6)
+    w = np.sqrt(area * np.maximum(x[:, 3], 1e-6))
+    h = area / w
+    return np.stack([x[:, 0] - w / 2, x[:, 1] - h / 2, x[:, 0] + w / 2, x[:, 1] + h / 2], axis=1)
+
+
+def overlapping_pairs(a, b):
+    """(rows, cols, iou) for every pair of a (N, 4) and b (M, 4) boxes that overlaps
+
+    Sort-and-sweep on x: b is sorted by x1 once, and for each box of a only
+    the slice of b whose x1 lies in (a.x1 - widest b, a.x2) is considered,
+    so the cost follows the number of nearby pairs rather than N x M.
+    """
+    if not len(a) or not len(b):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0)
+    order = np.argsort(b[:, 0], kind='stable')
+    bx1 = b[order, 0]
+    widest = (b[:, 2] - b[:, 0]).max()
+    lo = np.searchsorted(bx1, a[:, 0] - widest, side='right')
+    hi = np.searchsorted(bx1, a[:, 2], side='left')
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    rows = np.repeat(np.arange(len(a)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    cols = order[np.repeat(lo, counts) + offsets]
+
+    pa, pb = a[rows], b[cols]
+    w = np.minimum(pa[:, 2], pb[:, 2]) - np.maximum(pa[:, 0], pb[:, 0])
+    h = np.minimum(pa[:, 3], pb[:, 3]) - np.maximum(pa[:, 1], pb[:, 1])
+    overlap = (w > 0) & (h > 0)
+    rows, cols, pa, pb = rows[overlap], cols[overlap], pa[overlap], pb[overlap]
+    inter = w[overlap] * h[overlap]
+    union = ((pa[:, 2] - pa[:, 0]) * (pa[:, 3] - pa[:, 1])
+             + (pb[:, 2] - pb[:, 0]) * (pb[:, 3] - pb[:, 1]) - inter)
+    return rows, cols, inter / (union + 1e-9)
+
+
+def match_pairs(rows, cols, iou, n, m, threshold, matcher='greedy'):
+    """(matches (K, 2) of [track, detection], unmatched tracks, unmatched detections)
+
+    Takes candidate pairs as parallel arrays. 'greedy' accepts pairs above
+    threshold in order of falling IoU; tracked objects overlap few others,
+    so this touches only a handful of pairs per track. 'hungarian' solves
+    the optimal assignment with scipy.
+    """
+    keep = iou >= threshold
+    rows, cols, iou = rows[keep], cols[keep], iou[keep]
+
+    if matcher == 'hungarian':
+        try:
+            from scipy.optimize import linear_sum_assignment
+        except ImportError:
+            raise ImportError("matcher='hungarian' requires scipy. "
+                              "Install with: pip install scipy --break-system-packages")
+        cost = np.zeros((n, m))
+        cost[rows, cols] = -iou
+        r, c = linear_sum_assignment(cost)
+        valid = cost[r, c] < 0
+        matches = np.stack([r[valid], c[valid]], axis=1)
+    elif matcher == 'greedy':
+        order = np.argsort(-iou, kind='stable')
+        used_t = np.zeros(n, dtype=bool)
+        used_d = np.zeros(m, dtype=bool)
+        pairs = []
+        for t, d in zip(rows[order].tolist(), cols[order].tolist()):
+            if not used_t[t] and not used_d[d]:
+                used_t[t] = used_d[d] = True
+                pairs.append((t, d))
+        matches = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+    else:
+        raise ValueError(f"Unknown matcher '{matcher}'")
+
+    unmatched_t = np.setdiff1d(np.arange(n), matches[:, 0], assume_unique=True)
+    unmatched_d = np.setdiff1d(np.arange(m), matches[:, 1], assume_unique=True)
+    return matches, unmatched_t, unmatched_d
+
+
+def associate(iou, threshold, matcher='greedy'):
+    """match_pairs() over a dense (N, M) IoU matrix"""
+    rows, cols = np.nonzero(iou >= threshold)
+    return match_pairs(rows, cols, iou[rows, cols], iou.shape[0], iou.shape[1], threshold, matcher)
+
+
+def warp_keypoints(keypoints, src_boxes, dst_boxes):
+    """Map (K, J, 2+) keypoints from the boxes they were detected in to new boxes"""
+    out = keypoints.copy()
+    sw = np.maximum(src_boxes[:, 2] - src_boxes[:, 0], 1e-6)
+    sh = np.maximum(src_boxes[:, 3] - src_boxes[:, 1], 1e-6)
+    sx = ((dst_boxes[:, 2] - dst_boxes[:, 0]) / sw)[:, None]
+    sy = ((dst_boxes[:, 3] - dst_boxes[:, 1]) / sh)[:, None]
+    out[..., 0] = dst_boxes[:, 0:1] + (keypoints[..., 0] - src_boxes[:, 0:1]) * sx
+    out[..., 1] = dst_boxes[:, 1:2] + (keypoints[..., 1] - src_boxes[:, 1:2]) * sy
+    return out
+
+
+class SortTracker:
+    """SORT with every track's Kalman filter held in stacked arrays
+
+    Call update() on frames the detector ran and predict() on the frames in
+    between; both advance every track by one frame and return the tracks
+    to report. Tracks are reported once they have min_hits detections and
+    are dropped after max_age detector runs without a match. Keypoints
+    passed to update() are carried with their track and moved with the
+    predicted box on detector-free frames.
+    """
+
+    def __init__(self, iou_threshold=0.3, min_hits=3, max_age=1, matcher='greedy'):
+        if matcher not in MATCHERS:
+            raise ValueError(f"Unknown matcher '{matcher}'")
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.matcher = matcher
+        self.detections_seen = 0
+        self._next_id = 1
+        self.x = np.zeros((0, 7))
+        self.P = np.zeros((0, 7, 7))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        self.since_update = np.zeros(0, dtype=np.int64)
+        self.scores = np.zeros(0)
+        self.keypoints = None
+        self.keypoint_boxes = np.zeros((0, 4))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _predict(self):
+        # Keep the area positive when it is shrinking fast
+        shrinking = self.x[:, 2] + self.x[:, 6] <= 0
+        self.x[shrinking, 6] = 0.0
+        self.x = self.x @ _F.T
+        self.P = _F @ self.P @ _F.T + _Q
+        self.since_update += 1
+        return x_to_boxes(self.x)
+
+    def _correct(self, tracks, z):
+        P = self.P[tracks]
+        S = P[:, :4, :4] + _R
+        # K = P H^T S^-1, with S symmetric: K^T = S^-1 H P
+        K = np.linalg.solve(S, P[:, :4, :]).transpose(0, 2, 1)
+        residual = z - self.x[tracks, :4]
+        self.x[tracks] += np.einsum('nij,nj->ni', K, residual)
+        self.P[tracks] = P - K @ P[:, :4, :]
+
+    def _spawn(self, boxes, scores, keypoints):
+        n = len(boxes)
+        x = np.zeros((n, 7))
+        x[:, :4] = boxes_to_z(boxes)
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, np.broadcast_to(_P0, (n, 7, 7))])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int64)])
+        self.since_update = np.concatenate([self.since_update, np.zeros(n, dtype=np.int64)])
+        self.scores = np.concatenate([self.scores, scores])
+        self.keypoint_boxes = np.concatenate([self.keypoint_boxes, boxes])
+        if self.keypoints is not None:
+            if keypoints is None:
+                keypoints = np.zeros((n,) + self.keypoints.shape[1:], dtype=self.keypoints.dtype)
+            self.keypoints = np.concatenate([self.keypoints, keypoints])
+
+    def _keep(self, mask):
+        for name in ('x', 'P', 'ids', 'hits', 'misses', 'since_update', 'scores', 'keypoint_boxes'):
+            setattr(self, name, getattr(self, name)[mask])
+        if self.keypoints is not None:
+            self.keypoints = self.keypoints[mask]
+
+    def update(self, boxes, scores=None, keypoints=None):
+        """Advance one frame with detections: (K, 4) xyxy boxes, optional scores and (K, J, 3) keypoints"""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        scores = np.ones(len(boxes)) if scores is None else np.asarray(scores, dtype=np.float64)
+        if keypoints is not None and self.keypoints is None:
+            keypoints = np.asarray(keypoints)
+            self.keypoints = np.zeros((len(self),) + keypoints.shape[1:], dtype=keypoints.dtype)
+        self.detections_seen += 1
+
+        predicted = self._predict()
+        rows, cols, iou = overlapping_pairs(predicted, boxes)
+        matches, unmatched_t, unmatched_d = match_pairs(rows, cols, iou, len(predicted), len(boxes),
+                                                        self.iou_threshold, self.matcher)
+
+        tracks, dets = matches[:, 0], matches[:, 1]
+        if len(matches):
+            self._correct(tracks, boxes_to_z(boxes[dets]))
+            self.hits[tracks] += 1
+            self.misses[tracks] = 0
+            self.since_update[tracks] = 0
+            self.scores[tracks] = scores[dets]
+            self.keypoint_boxes[tracks] = boxes[dets]
+            if keypoints is not None:
+                self.keypoints[tracks] = keypoints[dets]
+        self.misses[unmatched_t] += 1
+
+        self._keep(self.misses <= self.max_age)
+        self._spawn(boxes[unmatched_d], scores[unmatched_d],
+                    keypoints[unmatched_d] if keypoints is not None else None)
+        return self.output()
+
+    def predict(self):
+        """Advance one frame without detections; tracks coast on their Kalman prediction"""
+        self._predict()
+        return self.output()
+
+    def output(self):
+        """{'ids', 'boxes', 'scores', 'predicted', 'keypoints'} for the confirmed tracks"""
+        confirmed = (self.hits >= self.min_hits) | (self.detections_seen <= self.min_hits)
+        boxes = x_to_boxes(self.x[confirmed])
+        keypoints = None
+        if self.keypoints is not None:
+            keypoints = warp_keypoints(self.keypoints[confirmed], self.keypoint_boxes[confirmed], boxes)
+        return {
+            'ids': self.ids[confirmed],
+            'boxes': boxes,
+            'scores': self.scores[confirmed],
+            'predicted': self.since_update[confirmed] > 0,
+            'keypoints': keypoints,
+        }